@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from perf.sqlite import sqlite_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,9 +41,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'bookshelf',
+    'perf',
 ]
 
 MIDDLEWARE = [
+    'perf.middleware.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,11 +78,12 @@ WSGI_APPLICATION = 'LibraryProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite with a busy timeout, immediate transactions and persistent,
+# health-checked connections (see perf.sqlite). On a server, run
+# `manage.py enable_sqlite_wal` once to switch the database file to WAL;
+# synchronous is then relaxed from FULL to NORMAL.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_profile(BASE_DIR / 'db.sqlite3'),
 }
 
 
@@ -121,3 +127,33 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-request performance metrics (see django-perf/ at the repository root).
+# PerfMiddleware records query count, DB time, duplicate queries and render
+# time per view; /metrics/ serves them in Prometheus format to staff users and
+# to requests with "Authorization: Bearer $PERF_METRICS_TOKEN". The test
+# runner switches it off; perf's own tests live in django-perf.
+PERF_ENABLED = True
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN')
+TEST_RUNNER = 'perf.testing.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'perf_file': {
+            'class': 'perf.logs.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'perf.requests': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,239 @@
+# bookshelf/management/commands/import_books.py
+"""
+Bulk-load books from CSV, JSON or NDJSON in checkpointed batches, skipping invalid and duplicate records.
+
+    python manage.py import_books books.csv [--batch-size 5000] [--errors rejected.ndjson] [--resume]
+"""
+import csv
+import json
+import os
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bookshelf.models import Book
+
+FIELDS = ("title", "author", "publication_year")
+FORMATS = {".csv": "csv", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+MAX_RECORD_SIZE = 1 << 20  # a JSON object this long without closing is treated as malformed
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+def read_ndjson(file):
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise CommandError(f"Line {line_number}: invalid JSON ({exc.msg}).")
+
+
+def read_json_array(file, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        # Skip whitespace and separators up to the next value.
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            fill()
+        if position >= len(buffer):
+            raise CommandError("Unexpected end of the JSON document.")
+        if not started:
+            if buffer[position] != "[":
+                raise CommandError("A JSON import file must hold an array of objects.")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        if buffer[position] != "{":
+            raise CommandError("A JSON import file must hold an array of objects.")
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError as exc:
+                if eof or len(buffer) - position > MAX_RECORD_SIZE:
+                    raise CommandError(f"Invalid JSON ({exc.msg}).")
+                fill()
+        position = end
+        yield record
+
+
+READERS = {"csv": read_csv, "json": read_json_array, "ndjson": read_ndjson}
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state):
+        # Written to a temporary file and renamed, so it is never half-written.
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temporary, self.path)
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Command(BaseCommand):
+    help = "Stream books from a CSV, JSON or NDJSON file into the catalogue in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=sorted(READERS),
+                            help="File format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--no-dedupe", dest="dedupe", action="store_false",
+                            help="Insert duplicates of existing (title, author, year) rows.")
+        parser.add_argument("--errors", help="Write rejected records to this NDJSON file.")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.import-checkpoint).")
+        parser.add_argument("--resume", action="store_true", help="Continue an interrupted import.")
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of an earlier run.")
+        parser.add_argument("--progress", type=int, default=100_000,
+                            help="Report progress every N records (0 to disable).")
+
+    def handle(self, path, format, batch_size, dedupe, errors, checkpoint, resume, restart, progress, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        file_format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise CommandError("Cannot tell the format from the file name: use --format.")
+        checkpoint = Checkpoint(checkpoint or f"{path}.import-checkpoint")
+
+        skip = 0
+        state = checkpoint.load()
+        if state is not None and not restart:
+            if not resume:
+                raise CommandError(
+                    f"{checkpoint.path} holds the checkpoint of an interrupted import: "
+                    "use --resume to continue it or --restart to start over.")
+            skip = state["records"]
+            self.stdout.write(f"Resuming after record {skip}.")
+        elif resume:
+            raise CommandError(f"No checkpoint to resume from at {checkpoint.path}.")
+
+        self.stats = {"records": skip, "created": 0, "duplicates": 0, "invalid": 0}
+        self.skipped = skip
+        self.dedupe = dedupe
+        self.progress = progress
+        self.started = time.perf_counter()
+        encoding = "utf-8-sig" if file_format == "csv" else "utf-8"
+        try:
+            file = open(path, newline="", encoding=encoding)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        errors_file = open(errors, "a" if skip else "w", encoding="utf-8") if errors else None
+        try:
+            with file:
+                self.run(READERS[file_format](file), skip, batch_size, checkpoint, errors_file)
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+        checkpoint.delete()
+        self.report(final=True)
+
+    def run(self, records, skip, batch_size, checkpoint, errors_file):
+        batch = []
+        for number, record in enumerate(records, start=1):
+            if number <= skip:
+                continue
+            book = self.validate(number, record, errors_file)
+            if book is not None:
+                batch.append(book)
+            if len(batch) >= batch_size:
+                self.write(batch, number, checkpoint)
+                batch = []
+            self.stats["records"] = number
+            if self.progress and number % self.progress == 0:
+                self.report()
+        self.write(batch, self.stats["records"], checkpoint)
+
+    def validate(self, number, record, errors_file):
+        if not isinstance(record, dict):
+            return self.reject(number, record, {"__all__": ["Expected an object."]}, errors_file)
+        values = {}
+        for name in FIELDS:
+            value = record.get(name)
+            values[name] = value.strip() if isinstance(value, str) else value
+        book = Book(**values)
+        try:
+            # to_python() turns "1999" into 1999; validators enforce max_length.
+            book.full_clean(validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            return self.reject(number, record, exc.message_dict, errors_file)
+        return book
+
+    def reject(self, number, record, messages, errors_file):
+        self.stats["invalid"] += 1
+        if errors_file is not None:
+            errors_file.write(json.dumps({"record": number, "errors": messages, "data": record}, default=str) + "\n")
+        return None
+
+    def write(self, batch, consumed, checkpoint):
+        if self.dedupe:
+            batch = self.drop_duplicates(batch)
+        if batch:
+            with transaction.atomic():
+                Book.objects.bulk_create(batch)
+            self.stats["created"] += len(batch)
+        checkpoint.save({"records": consumed})
+
+    def drop_duplicates(self, batch):
+        existing = set(
+            Book.objects.filter(
+                author__in={book.author for book in batch},
+                title__in={book.title for book in batch},
+            ).values_list(*FIELDS)
+        )
+        unique = []
+        for book in batch:
+            key = (book.title, book.author, book.publication_year)
+            if key in existing:
+                self.stats["duplicates"] += 1
+            else:
+                existing.add(key)
+                unique.append(book)
+        return unique
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        stats = self.stats
+        rate = (stats["records"] - self.skipped) / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"{'Done: ' if final else ''}{stats['records']} records, {stats['created']} created, "
+            f"{stats['duplicates']} duplicates, {stats['invalid']} invalid "
+            f"in {elapsed:.1f}s ({rate:,.0f} records/s)"
+        )
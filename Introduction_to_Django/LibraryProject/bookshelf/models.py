@@ -5,5 +5,12 @@ class Book(models.Model):
     author = models.CharField(max_length=100)
     publication_year = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            # Admin list_filter lookups, newest first (the changelist orders by -pk)
+            models.Index(fields=["author", "-id"], name="bookshelf_book_author_idx"),
+            models.Index(fields=["publication_year", "-id"], name="bookshelf_book_year_idx"),
+        ]
+
     def __str__(self):
         return self.title
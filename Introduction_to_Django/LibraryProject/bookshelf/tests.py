@@ -1,3 +1,95 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
 from django.test import TestCase
 
-# Create your tests here.
+from .management.commands.import_books import read_json_array
+from .models import Book
+
+
+class ImportBooksTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def call(self, path, *args):
+        out = io.StringIO()
+        call_command("import_books", path, *args, "--batch-size", "2", stdout=out)
+        return out.getvalue()
+
+    def test_csv_validates_and_dedupes(self):
+        Book.objects.create(title="Emma", author="Jane Austen", publication_year=1815)
+        path = self.write("books.csv", (
+            "\ufefftitle,author,publication_year,extra\n"
+            "Dune,Frank Herbert,1965,x\n"
+            " Dune ,Frank Herbert,1965,\n"
+            "Emma,Jane Austen,1815,\n"
+            f"{'x' * 101},Someone,2000,\n"
+            "Solaris,Stanisław Lem,nineteen,\n"
+            "Solaris,Stanisław Lem,1961,\n"
+        ))
+        errors = os.path.join(self.directory.name, "rejected.ndjson")
+        output = self.call(path, "--errors", errors)
+        self.assertIn("6 records, 2 created, 2 duplicates, 2 invalid", output)
+        self.assertEqual(
+            sorted(Book.objects.values_list("title", "publication_year")),
+            [("Dune", 1965), ("Emma", 1815), ("Solaris", 1961)],
+        )
+        with open(errors, encoding="utf-8") as file:
+            rejected = [json.loads(line) for line in file]
+        self.assertEqual([row["record"] for row in rejected], [4, 5])
+        self.assertIn("publication_year", rejected[1]["errors"])
+        self.assertFalse(os.path.exists(path + ".import-checkpoint"))
+
+    def test_json_array_is_decoded_incrementally(self):
+        records = [{"title": f"Book {i}", "author": "A", "publication_year": 2000 + i} for i in range(5)]
+        document = json.dumps(records, indent=2)
+        self.assertEqual(list(read_json_array(io.StringIO(document), chunk_size=7)), records)
+        self.assertEqual(list(read_json_array(io.StringIO(" [ ] "))), [])
+        with self.assertRaises(CommandError):
+            list(read_json_array(io.StringIO('[{"title": "x"}, 3]')))
+        self.call(self.write("books.json", document))
+        self.assertEqual(Book.objects.count(), 5)
+
+    def test_resume_after_a_failed_batch(self):
+        lines = [json.dumps({"title": f"Book {i}", "author": "A", "publication_year": 1990}) for i in range(7)]
+        path = self.write("books.ndjson", "\n".join(lines) + "\n")
+        real_bulk_create = Book.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+            return real_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(Book.objects, "bulk_create", failing_bulk_create):
+            with self.assertRaises(DatabaseError):
+                self.call(path)
+        self.assertEqual(Book.objects.count(), 2)
+        with self.assertRaisesMessage(CommandError, "--resume"):
+            self.call(path)
+
+        output = self.call(path, "--resume")
+        self.assertIn("Resuming after record 2.", output)
+        self.assertIn("7 records, 5 created", output)
+        self.assertEqual(Book.objects.count(), 7)
+
+
+class IndexAdvisorTests(TestCase):
+    def test_project_has_no_missing_indexes(self):
+        out = io.StringIO()
+        call_command("index_advisor", "--check", stdout=out)
+        self.assertIn("No missing indexes.", out.getvalue())
@@ -0,0 +1,176 @@
+# api/async_views.py
+"""
+Async-native Book and Author endpoints under /api/async/, using the async ORM
+and the DRF serializers (JSON only; no field filters, export or conditional GET).
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import aprefetch_related_objects
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, filters
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .models import Author, Book
+from .pagination import KeysetPagination
+from .serializers import AuthorSerializer, BookSerializer
+from .throttling import RateLimitThrottle
+from .views import AuthorListView, BookCreateView, BookListView
+
+
+class AsyncAPIView(View):
+    """
+    Base class: JSON rendering, DRF-style error bodies and opt-in
+    authentication for async handlers.
+    """
+    queryset = None
+    serializer_class = None
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    throttle_classes = []
+    renderer = JSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like APIView: CSRF is enforced by SessionAuthentication, not the middleware.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+        )
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    def handle_exception(self, exc):
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.drf_request.authenticators
+            header = authenticators[0].authenticate_header(self.drf_request) if authenticators else None
+            if header:
+                headers["WWW-Authenticate"] = header
+            else:
+                exc.status_code = 403
+        if getattr(exc, "wait", None):
+            headers["Retry-After"] = "%d" % exc.wait
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        return self.render(data, exc.status_code, headers)
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(
+            self.renderer.render(data), status=status,
+            content_type="application/json", headers=headers,
+        )
+
+    async def authenticate(self):
+        """Resolve request.user with the DRF authenticators; refuse anonymous users."""
+        user = await sync_to_async(lambda: self.drf_request.user)()
+        if not user or not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        return user
+
+    def check_throttles(self):
+        """APIView.check_throttles, run in a thread (a shared store may do I/O)."""
+        waits = []
+        for throttle in (throttle_class() for throttle_class in self.throttle_classes):
+            if not throttle.allow_request(self.drf_request, self):
+                waits.append(throttle.wait())
+        if waits:
+            waits = [wait for wait in waits if wait is not None]
+            raise exceptions.Throttled(max(waits, default=None))
+
+    def get_queryset(self):
+        return self.serializer_class.setup_eager_loading(self.queryset.all())
+
+
+class AsyncListView(AsyncAPIView):
+    pagination_class = KeysetPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+
+    async def get(self, request):
+        queryset = self.get_queryset()
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.drf_request, queryset, self)
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, self.drf_request, self)
+        data = self.serializer_class(page, many=True).data
+        return self.render(paginator.get_paginated_response(data).data)
+
+
+class AsyncDetailView(AsyncAPIView):
+    async def get(self, request, pk):
+        model = self.queryset.model
+        try:
+            instance = await self.get_queryset().aget(pk=pk)
+        except model.DoesNotExist:
+            raise exceptions.NotFound(f"No {model._meta.object_name} matches the given query.")
+        return self.render(self.serializer_class(instance).data)
+
+
+class AsyncCreateView(AsyncAPIView):
+    async def post(self, request):
+        await self.authenticate()
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles)()
+        serializer = self.serializer_class(data=self.drf_request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        instance = await self.perform_create(serializer.validated_data)
+        # Load what the serializer reads (e.g. an author's books) without a sync query.
+        _, prefetch = self.serializer_class.get_eager_lookups()
+        if prefetch:
+            await aprefetch_related_objects([instance], *prefetch)
+        return self.render(self.serializer_class(instance).data, status=201)
+
+    async def perform_create(self, validated_data):
+        return await self.queryset.model.objects.acreate(**validated_data)
+
+
+class AsyncBookListView(AsyncListView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    search_fields = ["title"]
+    ordering_fields = BookListView.ordering_fields
+    ordering = BookListView.ordering
+
+
+class AsyncBookDetailView(AsyncDetailView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+
+
+class AsyncBookCreateView(AsyncCreateView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    throttle_classes = BookCreateView.throttle_classes
+    throttle_scope = BookCreateView.throttle_scope
+
+    async def perform_create(self, validated_data):
+        title = validated_data.get("title")
+        if title and await Book.objects.filter(title=title).aexists():
+            # Same rule and message as BookCreateView.perform_create.
+            raise exceptions.ValidationError({"title": "A book with this title already exists."})
+        return await super().perform_create(validated_data)
+
+
+class AsyncAuthorListView(AsyncListView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    search_fields = AuthorListView.search_fields
+    ordering_fields = AuthorListView.ordering_fields
+    ordering = AuthorListView.ordering
+
+
+class AsyncAuthorDetailView(AsyncDetailView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+
+
+class AsyncAuthorCreateView(AsyncCreateView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
@@ -0,0 +1,65 @@
+# api/conditional.py
+"""
+Conditional GET for the book endpoints: a book is versioned by its updated_at,
+a list by a cache stamp that api/signals.py bumps. Use a shared API_CACHE_ALIAS
+with several processes, and call touch_books() after writes that send no signals.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from perf.stamps import bump_stamp, get_stamp
+
+from .models import Book
+
+TABLE_VERSION_KEY = "api:book:table-version"
+
+
+def get_cache():
+    return caches[getattr(settings, "API_CACHE_ALIAS", "default")]
+
+
+def table_version():
+    return get_stamp(get_cache(), TABLE_VERSION_KEY)
+
+
+def bump_table_version():
+    bump_stamp(get_cache(), TABLE_VERSION_KEY)
+
+
+def touch_books(pks=None):
+    """Mark books changed after a bulk write that sent no signals."""
+    if pks is not None:
+        Book.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+    bump_table_version()
+
+
+def make_etag(request, *parts):
+    user = request.user.pk if request.user.is_authenticated else ""
+    raw = "|".join(str(part) for part in (*parts, request.META.get("HTTP_ACCEPT", ""), user))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def book_list_etag(request, *args, **kwargs):
+    return make_etag(request, table_version(), request.get_full_path())
+
+
+def _book_updated_at(request, pk):
+    # condition() asks for the ETag and Last-Modified separately: one query for both.
+    if getattr(request, "_book_updated_at", (None,))[0] != pk:
+        updated_at = Book.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+        request._book_updated_at = (pk, updated_at)
+    return request._book_updated_at[1]
+
+
+def book_etag(request, pk, *args, **kwargs):
+    updated_at = _book_updated_at(request, pk)
+    if updated_at is None:
+        return None  # let the view answer 404
+    return make_etag(request, pk, updated_at.isoformat())
+
+
+def book_last_modified(request, pk, *args, **kwargs):
+    return _book_updated_at(request, pk)
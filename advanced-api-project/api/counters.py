@@ -0,0 +1,7 @@
+# api/counters.py
+"""Counter caches for the api app (see perf.counters). Imported in ApiConfig.ready()."""
+from perf.counters import CounterCache
+
+from .models import Author
+
+author_books = CounterCache(Author.books, "books_count")
@@ -0,0 +1,67 @@
+# api/export.py
+"""
+Streaming export for list views: `?export=ndjson` (or `csv`) streams every
+filtered row through `.iterator()` instead of returning a page.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class Echo:
+    """File-like object whose write() hands back the line (see Django's CSV docs)."""
+    def write(self, value):
+        return value
+
+
+class StreamingExportMixin:
+    export_query_param = "export"
+    export_chunk_size = 2000
+    export_filename = "export"
+    export_content_types = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+
+    def list(self, request, *args, **kwargs):
+        export_format = request.query_params.get(self.export_query_param)
+        if export_format:
+            return self.export(export_format)
+        return super().list(request, *args, **kwargs)
+
+    def export(self, export_format):
+        if export_format not in self.export_content_types:
+            raise ValidationError({
+                self.export_query_param: [
+                    f"Unsupported format. Choose one of: {', '.join(self.export_content_types)}."
+                ]
+            })
+        queryset = self.filter_queryset(self.get_queryset())
+        # One serializer instance is reused for every row.
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(obj)
+            for obj in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+        lines = self.ndjson_lines(rows) if export_format == "ndjson" else self.csv_lines(rows, serializer)
+
+        response = StreamingHttpResponse(lines, content_type=self.export_content_types[export_format])
+        response["Content-Disposition"] = f'attachment; filename="{self.export_filename}.{export_format}"'
+        return response
+
+    @staticmethod
+    def ndjson_lines(rows):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        for row in rows:
+            yield encoder.encode(row) + "\n"
+
+    @staticmethod
+    def csv_lines(rows, serializer):
+        fields = [name for name, field in serializer.fields.items() if not field.write_only]
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([row.get(name) for name in fields])
@@ -0,0 +1,125 @@
+# api/fastpath.py
+"""
+Read-only list fast path: ValuesSerializer renders `.values()` rows to the same
+JSON as the ModelSerializer. Views opt in with FastPathListMixin and `fast_path = True`.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from rest_framework import relations, serializers
+from rest_framework.response import Response
+
+# DRF field -> model fields for which its to_representation() is a no-op.
+IDENTITY_FIELDS = (
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.IntegerField, (models.IntegerField,)),
+    (serializers.BooleanField, (models.BooleanField,)),
+    (serializers.FloatField, (models.FloatField,)),
+)
+
+
+class ValuesSerializer:
+    """
+    Only fields backed by one concrete column are supported; nested
+    serializers, method fields, dotted sources and file fields raise
+    ImproperlyConfigured on first use.
+    """
+
+    _compiled = {}
+
+    def __init__(self, serializer_class):
+        if serializer_class.to_representation is not serializers.Serializer.to_representation:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__} overrides to_representation(); it has no fast path.")
+        model = serializer_class.Meta.model
+        self.columns = []
+        self.extractors = []  # (output name, column, converter or None)
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            column, convert = self.compile_field(model, serializer_class, name, field)
+            if column not in self.columns:
+                self.columns.append(column)
+            self.extractors.append((name, column, convert))
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        compiled = cls._compiled.get(serializer_class)
+        if compiled is None:
+            compiled = cls._compiled[serializer_class] = cls(serializer_class)
+        return compiled
+
+    @staticmethod
+    def compile_field(model, serializer_class, name, field):
+        def unsupported(reason):
+            return ImproperlyConfigured(
+                f"{serializer_class.__name__}.{name} has no fast path: {reason}.")
+
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+            raise unsupported("nested serializers and method fields need the instance")
+        if field.source == "*" or "." in field.source:
+            raise unsupported("only single-column sources are supported")
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise unsupported("the source is not a model field")
+        if not model_field.concrete or model_field.many_to_many or isinstance(model_field, models.FileField):
+            raise unsupported("the source is not a plain column")
+
+        if isinstance(field, relations.RelatedField):
+            if type(field) is not relations.PrimaryKeyRelatedField:
+                raise unsupported("only PrimaryKeyRelatedField is supported among relations")
+            # PrimaryKeyRelatedField renders the key (through pk_field if set).
+            pk_field = field.pk_field
+            return model_field.attname, None if pk_field is None else pk_field.to_representation
+        for drf_class, model_classes in IDENTITY_FIELDS:
+            if (type(field).to_representation is drf_class.to_representation
+                    and isinstance(model_field, model_classes)):
+                return model_field.attname, None
+        return model_field.attname, field.to_representation
+
+    def values(self, queryset, extra_columns=()):
+        """The queryset as `.values()` rows holding every column the fields read."""
+        columns = self.columns + [column for column in extra_columns if column not in self.columns]
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def to_representation(self, row):
+        data = {}
+        for name, column, convert in self.extractors:
+            value = row[column]
+            data[name] = value if value is None or convert is None else convert(value)
+        return data
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class FastPathListMixin:
+    """
+    Serves list() through ValuesSerializer when `fast_path` is True. Filter
+    backends and pagination work as usual; they receive `.values()` rows.
+    """
+    fast_path = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_path:
+            return super().list(request, *args, **kwargs)
+        fast = ValuesSerializer.for_serializer(self.get_serializer_class())
+        queryset = fast.values(self.filter_queryset(self.get_queryset()), self.get_fast_path_columns())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.many(page))
+        return Response(fast.many(queryset))
+
+    def get_fast_path_columns(self):
+        """Columns read besides the serializer's: the orderable ones, for cursor pagination."""
+        model = self.get_serializer_class().Meta.model
+        ordering_fields = getattr(self, "ordering_fields", None)
+        if not isinstance(ordering_fields, (list, tuple)):
+            return []
+        columns = []
+        for name in ordering_fields:
+            try:
+                columns.append(model._meta.get_field(name).attname)
+            except FieldDoesNotExist:
+                pass
+        return columns
@@ -0,0 +1,215 @@
+# api/management/commands/bench_asgi.py
+"""
+Load-test the book endpoints under uvicorn: DRF view on WSGI and ASGI, and the async view.
+
+    python manage.py bench_asgi --connections 1000 --duration 15 --seed 5000
+"""
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.conditional import touch_books
+from api.counters import author_books
+from api.models import Author, Book
+
+SEED_PREFIX = "bench_asgi "
+
+ENDPOINTS = {
+    "books": ("/api/books/?page_size=20", "/api/async/books/?page_size=20"),
+    "authors": ("/api/authors/?page_size=20", "/api/async/authors/?page_size=20"),
+    "book": ("/api/books/{pk}/", "/api/async/books/{pk}/"),
+}
+
+
+class Command(BaseCommand):
+    help = "Compare req/s and p99 latency of the WSGI, ASGI and async-view paths under uvicorn."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="books")
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--duration", type=float, default=15.0)
+        parser.add_argument("--warmup", type=float, default=3.0)
+        parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Insert this many books for the run and delete them afterwards.")
+
+    def handle(self, *args, endpoint, connections, seed, **options):
+        if importlib.util.find_spec("uvicorn") is None:
+            raise CommandError("bench_asgi needs uvicorn: pip install uvicorn")
+        raise_fd_limit(2 * connections + 256)
+
+        project = settings.ROOT_URLCONF.split(".")[0]
+        sync_path, async_path = ENDPOINTS[endpoint]
+        scenarios = [
+            ("wsgi", f"{project}.wsgi:application", sync_path),
+            ("asgi", f"{project}.asgi:application", sync_path),
+            ("async", f"{project}.asgi:application", async_path),
+        ]
+        try:
+            pk = self.seed(seed)
+            if pk is None:
+                pk = Book.objects.values_list("pk", flat=True).first()
+            if pk is None and endpoint == "book":
+                raise CommandError("No books to request: use --seed.")
+            self.stdout.write(f"{'scenario':<8} {'path':<36} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for label, application, path in scenarios:
+                path = path.format(pk=pk)
+                result = self.run_scenario(application, path, connections=connections,
+                                           wsgi=label == "wsgi", **options)
+                self.stdout.write(
+                    f"{label:<8} {path:<36} {result['rps']:>9.0f} {result['p50']:>9.1f} "
+                    f"{result['p99']:>9.1f} {result['errors']:>7}"
+                )
+        finally:
+            if seed:
+                Book.objects.filter(title__startswith=SEED_PREFIX).delete()
+                Author.objects.filter(name__startswith=SEED_PREFIX).delete()
+
+    def seed(self, rows):
+        if not rows:
+            return None
+        self.stdout.write(f"Seeding {rows} books...")
+        authors = Author.objects.bulk_create(Author(name=f"{SEED_PREFIX}{i}") for i in range(50))
+        books = Book.objects.bulk_create(
+            (
+                Book(title=f"{SEED_PREFIX}{i:08d}", publication_year=1900 + i % 120, author=authors[i % 50])
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create() sends no signals.
+        author_books.refresh([author.pk for author in authors])
+        touch_books()
+        return books[0].pk
+
+    def run_scenario(self, application, path, *, host, port, workers, connections, duration, warmup, wsgi):
+        command = [
+            sys.executable, "-m", "uvicorn", application,
+            "--host", host, "--port", str(port), "--workers", str(workers),
+            "--backlog", str(max(2048, connections)),
+            "--log-level", "warning", "--no-access-log",
+        ]
+        if wsgi:
+            command += ["--interface", "wsgi"]
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=os.environ.copy())
+        try:
+            asyncio.run(wait_for_port(host, port, server))
+            return asyncio.run(generate_load(host, port, path, connections, duration, warmup))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+
+def raise_fd_limit(needed):
+    try:
+        import resource
+    except ImportError:  # not POSIX
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        limit = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+async def wait_for_port(host, port, server, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError(f"The server exited with status {server.returncode}.")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        writer.close()
+        return
+    raise CommandError(f"The server did not accept connections on {host}:{port} within {timeout:.0f}s.")
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; return (status, keep_alive)."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)  # chunk and its CRLF
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection") != "close"
+
+
+async def generate_load(host, port, path, connections, duration, warmup):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n\r\n"
+    ).encode("latin-1")
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    deadline = measure_from + duration
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader = writer = None
+        while loop.time() < deadline:
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                start = loop.time()
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await read_response(reader)
+                end = loop.time()
+                if end >= measure_from:
+                    if status == 200:
+                        latencies.append(end - start)
+                    else:
+                        errors += 1
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+            except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                if loop.time() >= measure_from:
+                    errors += 1
+                if writer is not None:
+                    writer.close()
+                    writer = None
+                await asyncio.sleep(0.05)
+        if writer is not None:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(connections)))
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+    return {
+        "rps": len(latencies) / duration,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "errors": errors,
+    }
@@ -0,0 +1,78 @@
+# api/management/commands/bench_export.py
+"""
+Peak memory of the streaming export versus rendering the whole list at once.
+
+    python manage.py bench_export --rows 20000,100000
+"""
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.models import Author, Book
+from api.serializers import BookSerializer
+from api.views import BookListView
+
+
+class Rollback(Exception):
+    pass
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Compare peak memory of the NDJSON streaming export with a full in-memory list."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="20000,100000",
+                            help="Comma-separated table sizes to measure.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, **options):
+        factory = APIRequestFactory(HTTP_HOST="localhost")
+        view = BookListView.as_view()
+        author = Author.objects.create(name="Bench Author")
+        seeded = 0
+
+        self.stdout.write(f"{'rows':>10} {'in-memory MiB':>14} {'streaming MiB':>14} {'stream s':>9}")
+        for target in [int(n) for n in rows.split(",")]:
+            Book.objects.bulk_create(
+                (
+                    Book(title=f"Title {i:08d}", publication_year=1900 + i % 120, author=author)
+                    for i in range(seeded, target)
+                ),
+                batch_size=5000,
+            )
+            seeded = target
+
+            def in_memory():
+                data = BookSerializer(Book.objects.order_by("title"), many=True).data
+                JSONRenderer().render(data)
+
+            def streaming():
+                response = view(factory.get("/api/books/", {"export": "ndjson"}))
+                for _ in response.streaming_content:
+                    pass
+
+            memory_mib, _ = measure(in_memory)
+            stream_mib, stream_s = measure(streaming)
+            self.stdout.write(f"{target:>10} {memory_mib:>14.1f} {stream_mib:>14.1f} {stream_s:>9.2f}")
@@ -0,0 +1,92 @@
+# api/management/commands/bench_pagination.py
+"""
+Benchmark keyset pagination against LIMIT/OFFSET on /api/books/:
+`python manage.py bench_pagination --rows 200000 --page-size 20`.
+Rows are seeded in a transaction rolled back at the end.
+"""
+import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Author, Book
+from api.pagination import KeysetPagination
+from api.views import BookListView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare keyset and OFFSET pagination latency from page 1 to page 10,000."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--pages", default="1,10,100,1000,10000",
+                            help="Comma-separated page numbers to sample.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--ordering", default="title")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, page_size, pages, repeat, ordering, **options):
+        self.stdout.write(f"Seeding {rows} books...")
+        authors = Author.objects.bulk_create(Author(name=f"Author {i}") for i in range(100))
+        Book.objects.bulk_create(
+            (
+                Book(title=f"Title {i:08d}", publication_year=1900 + i % 120, author=authors[i % 100])
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+
+        factory = APIRequestFactory(HTTP_HOST="localhost")
+        view = BookListView()
+        view.format_kwarg = None
+        queryset = Book.objects.all()
+
+        self.stdout.write(f"{'page':>8} {'keyset ms':>12} {'offset ms':>12}")
+        for page in [int(p) for p in pages.split(",")]:
+            offset = (page - 1) * page_size
+            if offset >= rows:
+                self.stdout.write(f"{page:>8} {'(past end)':>12}")
+                continue
+
+            # Build the cursor for this page once, outside the timed section.
+            keyset = KeysetPagination()
+            request = Request(factory.get("/api/books/", {"ordering": ordering, "page_size": page_size}))
+            view.request = request
+            keyset.paginate_queryset(queryset, request, view)
+            ordered = queryset.order_by(*keyset._order_by(False))
+            params = {"ordering": ordering, "page_size": page_size}
+            if offset:
+                boundary = ordered[offset - 1]
+                link = keyset.encode_cursor(boundary, reverse=False)
+                params["cursor"] = parse_qs(urlparse(link).query)["cursor"][0]
+            keyset_request = Request(factory.get("/api/books/", params))
+
+            keyset_ms = self.time(repeat, lambda: KeysetPagination().paginate_queryset(
+                queryset, keyset_request, view))
+            # Only the page query; LimitOffsetPagination would add a COUNT(*) on top.
+            offset_ms = self.time(repeat, lambda: list(ordered[offset:offset + page_size]))
+            self.stdout.write(f"{page:>8} {keyset_ms:>12.2f} {offset_ms:>12.2f}")
+
+    @staticmethod
+    def time(repeat, func):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
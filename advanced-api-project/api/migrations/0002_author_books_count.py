@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:07
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_books_count(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+    Book = apps.get_model('api', 'Book')
+    counted = (
+        Book.objects.filter(author=OuterRef('pk'))
+        .order_by().values('author').annotate(n=Count('*')).values('n')
+    )
+    Author.objects.update(books_count=Coalesce(Subquery(counted, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='books_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_books_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['books_count', 'id'], name='api_author_books_count_idx'),
+        ),
+    ]
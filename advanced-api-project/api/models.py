@@ -15,8 +15,17 @@ class Author(models.Model):
     # The author's full name
     name = models.CharField(max_length=255, help_text="Full name of the author.")
 
+    # Denormalized len(author.books), kept current by api/counters.py
+    books_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Default listing order plus the keyset tie-breaker
+            models.Index(fields=["name", "id"], name="api_author_name_idx"),
+            # ORDER BY books_count, id (keyset pagination adds the id) is an index scan
+            models.Index(fields=["books_count", "id"], name="api_author_books_count_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -37,8 +46,18 @@ class Book(models.Model):
         help_text="The author who wrote this book."
     )
 
+    # Last change to the row; the book detail's ETag/Last-Modified (api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ["title"]
+        # BookListView filters on each column and keyset-paginates on (title, id)
+        # (see api/pagination.py), so every filter index carries the sort key too.
+        indexes = [
+            models.Index(fields=["title", "id"], name="api_book_title_idx"),
+            models.Index(fields=["author", "title", "id"], name="api_book_author_title_idx"),
+            models.Index(fields=["publication_year", "title", "id"], name="api_book_year_title_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
@@ -0,0 +1,241 @@
+# api/pagination.py
+"""
+Keyset ("seek") pagination for list endpoints: each page is fetched with a
+WHERE predicate on the previous page's last row instead of OFFSET, so deep
+pages cost the same as the first. Cursors carry the boundary values and ordering.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination driven by the view's `ordering_fields`.
+    Response shape: {"next": <url|null>, "previous": <url|null>, "results": [...]}.
+    """
+    cursor_query_param = "cursor"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched with the async ORM."""
+        queryset = self.page_queryset(queryset, request, view)
+        # aiterator() only honours prefetch_related() when given a chunk size.
+        return self.set_page([row async for row in queryset.aiterator(chunk_size=self.page_size + 1)])
+
+    def page_queryset(self, queryset, request, view=None):
+        """The (unevaluated) query for the requested page; no database access."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.joins = {}
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor["r"])
+        self.has_cursor = cursor is not None
+
+        if self.joins:
+            queryset = queryset.annotate(**self.joins)
+        queryset = queryset.order_by(*self._order_by(self.reverse))
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(cursor["v"], self.reverse))
+
+        # Fetch one extra row to find out whether there is a further page.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    # ---------------- Ordering ----------------
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the sort key as a tuple of (column, descending) pairs.
+        A relation sorts like order_by() does, on the related model's ordering
+        (`author` -> the author's name, then `author_id`); the joined values are
+        annotated onto the rows so the cursor can carry them.
+        """
+        ordering = None
+        if view is not None and filters.OrderingFilter in getattr(view, "filter_backends", []):
+            ordering = filters.OrderingFilter().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = getattr(view, "ordering", None) or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        keys = []
+        for term in ordering:
+            for column, descending in self._columns(queryset.model, term.lstrip("-"), term.startswith("-")):
+                if column not in [c for c, _ in keys]:
+                    keys.append((column, descending))
+
+        pk_column = queryset.model._meta.pk.attname
+        if pk_column not in [c for c, _ in keys]:
+            keys.append((pk_column, False))
+        return tuple(keys)
+
+    def _columns(self, model, name, descending):
+        if name == "pk":
+            return [(model._meta.pk.attname, descending)]
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return [(name, descending)]
+        if not (field.many_to_one or field.one_to_one) or not field.concrete:
+            return [(field.attname, descending)]
+        related = field.related_model._meta
+        columns = []
+        for term in related.ordering or [related.pk.name]:
+            alias = f"keyset_{name}_{term.lstrip('-')}"
+            self.joins[alias] = F(f"{name}__{term.lstrip('-')}")
+            columns.append((alias, descending != term.startswith("-")))
+        # Rows of related objects sharing a sort value stay grouped per object.
+        columns.append((field.attname, descending))
+        return columns
+
+    def _order_by(self, reverse):
+        terms = []
+        for column, descending in self.ordering:
+            terms.append(column if descending == reverse else "-" + column)
+        return terms
+
+    def seek_filter(self, values, reverse):
+        """
+        Build the lexicographic "row after (v1, v2, ...)" predicate:
+
+            k1 >= v1 AND (k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...)
+
+        The leading `k1 >= v1` lets the database use a range scan on an index
+        whose first column is k1.
+        """
+        predicate = Q()
+        equal_so_far = Q()
+        for (column, descending), value in zip(self.ordering, values):
+            op = "lt" if descending != reverse else "gt"
+            predicate |= equal_so_far & Q(**{f"{column}__{op}": value})
+            equal_so_far &= Q(**{column: value})
+
+        column, descending = self.ordering[0]
+        op = "lte" if descending != reverse else "gte"
+        return Q(**{f"{column}__{op}": values[0]}) & predicate
+
+    # ---------------- Cursors ----------------
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values, reverse, ordering = payload["v"], bool(payload["r"]), payload["o"]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor is only meaningful for the ordering it was issued under.
+        if ordering != self._signature() or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return {"v": values, "r": reverse}
+
+    def encode_cursor(self, row, reverse):
+        payload = {
+            "v": [self._value(row, column) for column, _ in self.ordering],
+            "r": int(reverse),
+            "o": self._signature(),
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _signature(self):
+        return [("-" if descending else "") + column for column, descending in self.ordering]
+
+    @staticmethod
+    def _value(row, column):
+        if isinstance(row, dict):
+            return row[column]
+        return getattr(row, column)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Walked past the end: "previous" is simply the first page again.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,5 +1,7 @@
 # api/serializers.py
+import copy
 from datetime import date
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Author, Book
 
@@ -14,9 +16,58 @@ Nested relationship explanation:
 Because Book.author uses `related_name="books"`, we can access the reverse relation
 as `author.books`. We expose that on AuthorSerializer as a read-only nested field:
 `books = BookSerializer(many=True, read_only=True)`.
+
+Eager loading:
+Serializers declare the relations they traverse (`select_related_fields`,
+`prefetch_related_fields`) via EagerLoadingMixin. Views built on
+`EagerLoadingViewMixin` (api/views.py) apply them to their queryset, so listing
+N authors costs a fixed number of queries instead of N+1.
 """
 
-class BookSerializer(serializers.ModelSerializer):
+
+class EagerLoadingMixin:
+    """
+    Declares the relations a serializer walks so views can load them up front.
+    - select_related_fields: forward FK / one-to-one paths (joined in the same query).
+    - prefetch_related_fields: reverse FK / M2M paths, strings or Prefetch objects
+      (use Prefetch to carry the nested ordering).
+    Nested serializers that also use the mixin contribute their lookups, prefixed
+    with the field's source (e.g. `books__author`).
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_eager_lookups(cls):
+        select = list(cls.select_related_fields)
+        prefetch = list(cls.prefetch_related_fields)
+        for name, field in cls().fields.items():
+            child = getattr(field, "child", field)
+            if not isinstance(child, EagerLoadingMixin):
+                continue
+            source = field.source or name
+            child_select, child_prefetch = type(child).get_eager_lookups()
+            # Anything below a nested serializer is reached through its relation,
+            # so it is prefetched under that path.
+            for lookup in child_select + child_prefetch:
+                if isinstance(lookup, Prefetch):
+                    lookup = copy.copy(lookup)
+                    lookup.add_prefix(source)
+                    prefetch.append(lookup)
+                else:
+                    prefetch.append(f"{source}__{lookup}")
+        return select, prefetch
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select, prefetch = cls.get_eager_lookups()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+class BookSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializes the Book model including the FK to Author.
     Custom validation ensures `publication_year` is not in the future.
@@ -32,15 +83,21 @@ class BookSerializer(serializers.ModelSerializer):
         return value
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """
     Serializes Author and nests all their related books.
     `books` uses the reverse relation created by `related_name="books"` on Book.author.
     It's read-only here; you can post/put books via Book endpoints or a custom create().
+    The books are prefetched in one query, ordered by title.
+    `books_count` is the denormalized counter column (api/counters.py).
     """
     books = BookSerializer(many=True, read_only=True)
 
+    prefetch_related_fields = (
+        Prefetch("books", queryset=Book.objects.order_by("title", "id")),
+    )
+
     class Meta:
         model = Author
-        fields = ["id", "name", "books"]
+        fields = ["id", "name", "books_count", "books"]
 
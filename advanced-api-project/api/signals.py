@@ -0,0 +1,15 @@
+# api/signals.py
+"""Replaces the book table's version stamp (api/conditional.py). Connected in ApiConfig.ready()."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .conditional import bump_table_version
+from .models import Book
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed(sender, **kwargs):
+    # After commit, so a concurrent request cannot pair the new stamp with the old rows.
+    transaction.on_commit(bump_table_version)
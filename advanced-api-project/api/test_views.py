@@ -1,7 +1,7 @@
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Book
+from .models import Author, Book
 
 
 class BookAPITests(APITestCase):
@@ -12,13 +12,15 @@ class BookAPITests(APITestCase):
         # Login the test client (this ensures test DB is used, not dev/prod)
         self.client.login(username="testuser", password="testpass123")
         
-        # Create a sample book
-        self.book = Book.objects.create(title="Test Book", author="Author 1", publication_year=2024)
+        # Create sample authors and a book
+        self.author = Author.objects.create(name="Author 1")
+        self.other_author = Author.objects.create(name="Author 2")
+        self.book = Book.objects.create(title="Test Book", author=self.author, publication_year=2024)
 
     def test_list_books(self):
         response = self.client.get("/api/books/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("title", response.data[0])
+        self.assertIn("title", response.data["results"][0])
 
     def test_retrieve_book(self):
         response = self.client.get(f"/api/books/{self.book.id}/")
@@ -26,18 +28,18 @@ class BookAPITests(APITestCase):
         self.assertEqual(response.data["title"], "Test Book")
 
     def test_create_book(self):
-        data = {"title": "New Book", "author": "Author 2", "publication_year": 2025}
-        response = self.client.post("/api/books/", data)
+        data = {"title": "New Book", "author": self.other_author.pk, "publication_year": 2025}
+        response = self.client.post("/api/books/create/", data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Book.objects.count(), 2)
 
     def test_update_book(self):
-        data = {"title": "Updated Title", "author": "Author 1", "publication_year": 2024}
-        response = self.client.put(f"/api/books/{self.book.id}/", data)
+        data = {"title": "Updated Title", "author": self.author.pk, "publication_year": 2024}
+        response = self.client.put(f"/api/books/{self.book.id}/update/", data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["title"], "Updated Title")
 
     def test_delete_book(self):
-        response = self.client.delete(f"/api/books/{self.book.id}/")
+        response = self.client.delete(f"/api/books/{self.book.id}/delete/")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Book.objects.count(), 0)
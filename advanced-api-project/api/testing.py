@@ -0,0 +1,32 @@
+# api/testing.py
+"""
+Test helpers shared by the API test cases: assertQueryCountConstant() fails
+if a list endpoint's query count grows with the page size (an N+1).
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    page_size_query_param = "page_size"
+
+    def assertQueryCountConstant(self, url, page_sizes=(1, 5, 20), **params):
+        counts = {}
+        captured = {}
+        for size in page_sizes:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, {**params, self.page_size_query_param: size})
+            self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+            counts[size] = len(ctx.captured_queries)
+            captured[size] = ctx.captured_queries
+
+        if len(set(counts.values())) > 1:
+            largest = max(page_sizes)
+            queries = "\n".join(
+                f"{i}. {query['sql']}" for i, query in enumerate(captured[largest], start=1)
+            )
+            self.fail(
+                f"Query count for {url} grows with page size {counts}.\n"
+                f"Queries at page_size={largest}:\n{queries}"
+            )
+        return counts
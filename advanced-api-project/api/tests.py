@@ -1,3 +1,401 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from .models import Author, Book
+from .fastpath import ValuesSerializer
+from .serializers import AuthorSerializer, BookSerializer
+from .throttling import get_store, rate_limit_metrics
+from .views import BookListView
+from .testing import QueryCountAssertionsMixin
+
+
+class BookKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.austen = Author.objects.create(name="Jane Austen")
+        self.orwell = Author.objects.create(name="George Orwell")
+        # Duplicate years on purpose so the `id` tie-breaker is exercised
+        for i in range(25):
+            Book.objects.create(
+                title=f"Book {i:02d}",
+                publication_year=1900 + (i % 5),
+                author=self.austen if i % 2 else self.orwell,
+            )
+
+    def walk(self, url):
+        titles, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(book["title"] for book in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+        return titles, pages
+
+    def test_first_page_shape(self):
+        response = self.client.get("/api/books/?page_size=10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_walk_matches_full_ordering(self):
+        # `author` sorts on Author.Meta.ordering (name), not on author_id.
+        for ordering in ["title", "-publication_year", "author", "-author,title", "publication_year,-title"]:
+            expected = list(
+                Book.objects.order_by(*ordering.split(","), "id")
+                .values_list("title", flat=True)
+            )
+            titles, pages = self.walk(f"/api/books/?ordering={ordering}&page_size=7")
+            self.assertEqual(titles, expected, ordering)
+            self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get("/api/books/?ordering=publication_year&page_size=10")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_previous_link_on_a_relation_ordering(self):
+        first = self.client.get("/api/books/?ordering=author&page_size=10")
+        self.assertEqual({book["author"] for book in first.data["results"]}, {self.orwell.pk})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_cursor_is_bound_to_its_ordering(self):
+        first = self.client.get("/api/books/?ordering=title&page_size=5")
+        cursor = parse_qs(urlparse(first.data["next"]).query)["cursor"][0]
+        response = self.client.get(f"/api/books/?ordering=-title&cursor={cursor}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_garbage_cursor(self):
+        response = self.client.get("/api/books/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AuthorEagerLoadingTests(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        for i in range(25):
+            author = Author.objects.create(name=f"Author {i:02d}")
+            for title in ["Zeta", "Alpha", "Mid"]:
+                Book.objects.create(title=f"{title} {i}", publication_year=2000, author=author)
+
+    def test_author_list_query_count_is_constant(self):
+        counts = self.assertQueryCountConstant("/api/authors/", page_sizes=(1, 5, 20))
+        # One query for the page of authors, one for all of their books.
+        self.assertEqual(set(counts.values()), {2})
+
+    def test_book_list_query_count_is_constant(self):
+        self.assertQueryCountConstant("/api/books/", page_sizes=(1, 5, 20))
+
+    def test_nested_books_keep_prefetch_ordering(self):
+        response = self.client.get("/api/authors/?page_size=1")
+        books = response.data["results"][0]["books"]
+        self.assertEqual([b["title"] for b in books], ["Alpha 0", "Mid 0", "Zeta 0"])
+
+    def test_author_detail(self):
+        author = Author.objects.get(name="Author 03")
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/authors/{author.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["books"]), 3)
+
+    def test_eager_lookups_are_not_mutated_between_calls(self):
+        first = AuthorSerializer.get_eager_lookups()
+        second = AuthorSerializer.get_eager_lookups()
+        self.assertEqual(
+            [p.prefetch_to for p in first[1]], [p.prefetch_to for p in second[1]]
+        )
+
+
+class BookExportTests(APITestCase):
+    def setUp(self):
+        author = Author.objects.create(name="Ursula K. Le Guin")
+        for i, year in enumerate([1969, 1974, 1968]):
+            Book.objects.create(title=f"Book, \"{i}\"", publication_year=year, author=author)
+        self.author = author
+
+    def content(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_export_honours_ordering_and_filters(self):
+        response = self.client.get("/api/books/?export=ndjson&ordering=publication_year")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([r["publication_year"] for r in rows], [1968, 1969, 1974])
+        self.assertEqual(rows[0]["author"], self.author.pk)
+
+        response = self.client.get("/api/books/?export=ndjson&publication_year=1974")
+        self.assertEqual(len(self.content(response).splitlines()), 1)
+
+    def test_csv_export(self):
+        response = self.client.get("/api/books/?export=csv&ordering=-publication_year")
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0], ["id", "title", "publication_year", "author"])
+        self.assertEqual(rows[1][1:3], ['Book, "1"', "1974"])
+        self.assertEqual(len(rows), 4)
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/books/?export=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AuthorBooksCountTests(APITestCase):
+    def setUp(self):
+        self.austen = Author.objects.create(name="Jane Austen")
+        self.orwell = Author.objects.create(name="George Orwell")
+
+    def counts(self):
+        return dict(Author.objects.values_list("name", "books_count"))
+
+    def test_counter_follows_creates_moves_and_deletes(self):
+        emma = Book.objects.create(title="Emma", publication_year=1815, author=self.austen)
+        Book.objects.create(title="Persuasion", publication_year=1817, author=self.austen)
+        self.assertEqual(self.counts(), {"Jane Austen": 2, "George Orwell": 0})
+
+        emma.author = self.orwell
+        emma.save()
+        self.assertEqual(self.counts(), {"Jane Austen": 1, "George Orwell": 1})
+
+        emma.title = "Emma (2nd ed.)"
+        with self.assertNumQueries(1):  # no counter work when the author is untouched
+            emma.save(update_fields=["title"])
+
+        emma.delete()
+        Book.objects.filter(author=self.austen).delete()
+        self.assertEqual(self.counts(), {"Jane Austen": 0, "George Orwell": 0})
+
+    def test_order_authors_by_books_count(self):
+        for i in range(3):
+            Book.objects.create(title=f"Essay {i}", publication_year=1946, author=self.orwell)
+        Book.objects.create(title="Emma", publication_year=1815, author=self.austen)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/authors/?ordering=-books_count")
+        results = response.data["results"]
+        self.assertEqual([a["name"] for a in results], ["George Orwell", "Jane Austen"])
+        self.assertEqual([a["books_count"] for a in results], [3, 1])
+
+    def test_ordering_by_books_count_uses_the_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN output checked for SQLite only")
+        plan = Author.objects.order_by("-books_count", "-id").explain()
+        self.assertIn("api_author_books_count_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_reconcile_counters_fixes_bulk_writes(self):
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=2000, author=self.austen) for i in range(4)
+        )
+        self.assertEqual(self.counts()["Jane Austen"], 0)  # bulk_create sends no signals
+
+        out = io.StringIO()
+        call_command("reconcile_counters", "api.Author.books_count", "--dry-run", stdout=out)
+        self.assertIn("1 row(s) drifted", out.getvalue())
+        self.assertEqual(self.counts()["Jane Austen"], 0)
+
+        call_command("reconcile_counters", stdout=out)
+        self.assertEqual(self.counts()["Jane Austen"], 4)
+
+
+class BookConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        self.book = Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+        self.detail_url = f"/api/books/{self.book.pk}/"
+
+    def test_detail_answers_304_without_loading_the_book(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        etag = response["ETag"]
+        # One single-column lookup of updated_at, shared by ETag and Last-Modified.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book.title = "The Left Hand of Darkness"
+        self.book.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_missing_book_is_still_404(self):
+        self.assertEqual(self.client.get("/api/books/999999/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_etag_follows_table_version_and_query(self):
+        etag = self.client.get("/api/books/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotEqual(self.client.get("/api/books/?ordering=-title")["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="Lathe of Heaven", publication_year=1971, author=self.author)
+        response = self.client.get("/api/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class AsyncEndpointTests(APITestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Octavia E. Butler")
+        for i in range(5):
+            Book.objects.create(title=f"Parable {i}", publication_year=1990 + i, author=self.author)
+        self.book = Book.objects.first()
+        self.user = User.objects.create_user("reader", password="pass12345")
+
+    async def test_detail_bodies_match_the_drf_views(self):
+        for sync_url, async_url in [
+            (f"/api/books/{self.book.pk}/", f"/api/async/books/{self.book.pk}/"),
+            (f"/api/authors/{self.author.pk}/", f"/api/async/authors/{self.author.pk}/"),
+            ("/api/books/999999/", "/api/async/books/999999/"),
+        ]:
+            expected = await self.async_client.get(sync_url, headers={"accept": "application/json"})
+            response = await self.async_client.get(async_url)
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(response.content, expected.content)
+
+    async def test_list_walks_the_same_keyset_pages(self):
+        url, titles = "/api/async/books/?ordering=-publication_year&page_size=2", []
+        while url:
+            body = json.loads((await self.async_client.get(url)).content)
+            titles += [book["title"] for book in body["results"]]
+            url = body["next"]
+        self.assertEqual(titles, [f"Parable {i}" for i in reversed(range(5))])
+
+    def test_author_list_prefetches_books(self):
+        # The sync client runs the async view through async_to_sync; its queries
+        # still run on this thread's connection.
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/async/authors/")
+        self.assertEqual(len(json.loads(response.content)["results"][0]["books"]), 5)
+
+    async def test_create_requires_authentication(self):
+        response = await self.async_client.post(
+            "/api/async/authors/create/", {"name": "N. K. Jemisin"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_create_validates_and_saves(self):
+        await self.async_client.aforce_login(self.user)
+        payload = {"title": "Kindred", "publication_year": 1979, "author": self.author.pk}
+        response = await self.async_client.post("/api/async/books/create/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(response.content)["title"], "Kindred")
+
+        response = await self.async_client.post("/api/async/books/create/", payload, content_type="application/json")
+        self.assertEqual(json.loads(response.content), {"title": "A book with this title already exists."})
+        payload = {**payload, "title": "Fledgling", "publication_year": 3000}
+        response = await self.async_client.post("/api/async/books/create/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("publication_year", json.loads(response.content))
+
+        response = await self.async_client.post(
+            "/api/async/authors/create/", {"name": "N. K. Jemisin"}, content_type="application/json")
+        self.assertEqual(json.loads(response.content)["books"], [])
+
+
+class BookFastPathTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        authors = [Author.objects.create(name=name) for name in ("Le Guin", "Lem")]
+        for i in range(30):
+            Book.objects.create(title=f"Título {i:02d}", publication_year=1950 + i % 7, author=authors[i % 2])
+
+    def get_pages(self, params):
+        bodies, url = [], "/api/books/"
+        while url:
+            response = self.client.get(url, params, HTTP_ACCEPT="application/json")
+            bodies.append(response.content)
+            url, params = response.data["next"], None
+        return bodies
+
+    def test_pages_are_byte_identical_to_the_serializer(self):
+        for params in ({"page_size": 7}, {"ordering": "-publication_year", "page_size": 4}, {"title": "1"}):
+            fast = self.get_pages(params)
+            with mock.patch.object(BookListView, "fast_path", False):
+                cache.clear()  # new ETags, so nothing is answered with 304
+                self.assertEqual(self.get_pages(params), fast)
+
+    def test_page_is_a_single_query_without_instances(self):
+        with self.assertNumQueries(1), mock.patch.object(Book, "from_db", side_effect=AssertionError):
+            self.client.get("/api/books/", {"page_size": 50})
+
+    def test_unsupported_serializers_are_refused(self):
+        self.assertEqual(ValuesSerializer(BookSerializer).columns, ["id", "title", "publication_year", "author_id"])
+        with self.assertRaisesMessage(ImproperlyConfigured, "AuthorSerializer.books has no fast path"):
+            ValuesSerializer(AuthorSerializer)
+
+
+@override_settings(RATE_LIMITS={"book-writes": {"rate": "6/min", "burst": 2, "key": "user"}})
+class BookWriteRateLimitTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        get_store().clear()  # user pks are reused between tests
+        rate_limit_metrics.reset()
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        self.book = Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+        self.user = User.objects.create_user(username="editor", password="pass12345")
+        self.client.force_authenticate(self.user)
+
+    def create(self, title):
+        data = {"title": title, "publication_year": 1970, "author": self.author.pk}
+        return self.client.post("/api/books/create/", data, format="json")
+
+    def test_write_views_share_one_bucket_per_user(self):
+        self.assertEqual(self.create("The Lathe of Heaven").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.client.patch(f"/api/books/{self.book.pk}/update/", {"title": "Dispossessed"}).status_code,
+            status.HTTP_200_OK)
+        response = self.client.delete(f"/api/books/{self.book.pk}/delete/")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "10")  # one request per 10 s
+        self.assertTrue(Book.objects.filter(pk=self.book.pk).exists())
+
+        self.client.force_authenticate(User.objects.create_user(username="other"))
+        self.assertEqual(self.create("Always Coming Home").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(rate_limit_metrics.stats("book-writes"), {"allowed": 3, "throttled": 1})
+
+    async def test_async_create_draws_from_the_same_bucket(self):
+        await self.async_client.aforce_login(self.user)
+        self.assertEqual((await self.acreate("Kindred")).status_code, status.HTTP_201_CREATED)
+        self.assertEqual((await self.acreate("Dawn")).status_code, status.HTTP_201_CREATED)
+        response = await self.acreate("Imago")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "10")
+        self.assertIn("throttled", json.loads(response.content)["detail"])
+        response = await self.async_client.post(
+            "/api/books/create/", {"title": "Imago", "publication_year": 1989, "author": self.author.pk},
+            content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    async def acreate(self, title):
+        data = {"title": title, "publication_year": 1987, "author": self.author.pk}
+        return await self.async_client.post("/api/async/books/create/", data, content_type="application/json")
+
+    def test_reads_are_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(f"/api/books/{self.book.pk}/").status_code, status.HTTP_200_OK)
+        self.assertEqual(rate_limit_metrics.stats("book-writes"), {"allowed": 0, "throttled": 0})
+
+
+class IndexAdvisorTests(TestCase):
+    def test_project_has_no_missing_indexes(self):
+        out = io.StringIO()
+        call_command("index_advisor", "--check", stdout=out)
+        self.assertIn("No missing indexes.", out.getvalue())
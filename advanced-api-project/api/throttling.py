@@ -0,0 +1,261 @@
+# api/throttling.py
+"""
+Rate limiting per view scope (RATE_LIMITS): token buckets or sliding windows kept
+in a bounded, sharded in-process store or a shared cache (RATE_LIMIT_STORE).
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from perf.metrics import Registry
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+def parse_rate(rate):
+    """"60/min" -> (60, 60.0): requests and period in seconds."""
+    try:
+        count, period = rate.split("/")
+        return int(count), float(PERIODS[period.strip()[0].lower()])
+    except (AttributeError, ValueError, KeyError, IndexError):
+        raise ImproperlyConfigured(f"Invalid rate {rate!r}: use '<n>/<s|min|hour|day>'.")
+
+
+# ---------------- Algorithms ----------------
+# Each takes the stored state (None for a new key) and the time, and returns
+# (new state, wait): wait is None when the request is allowed, else the
+# seconds until it would be.
+
+class TokenBucket:
+    def __init__(self, count, period, burst=None):
+        self.rate = count / period  # tokens per second
+        self.capacity = burst or count
+        # After this long without requests the bucket is full again: a
+        # missing record means the same.
+        self.ttl = self.capacity / self.rate
+
+    def __call__(self, state, now):
+        if state is None:
+            tokens = self.capacity
+        else:
+            tokens, last = state
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, now), None
+        return (tokens, now), (1 - tokens) / self.rate
+
+
+class SlidingWindow:
+    def __init__(self, count, period, burst=None):
+        self.limit = count
+        self.window = period
+        self.ttl = 2 * period
+
+    def __call__(self, state, now):
+        index = int(now // self.window)
+        previous = current = 0
+        if state is not None:
+            state_index, state_previous, state_current = state
+            if state_index == index:
+                previous, current = state_previous, state_current
+            elif state_index == index - 1:
+                previous = state_current
+        elapsed = now - index * self.window
+        weight = 1 - elapsed / self.window  # share of the previous window still in the sliding one
+        if previous * weight + current + 1 <= self.limit:
+            return (index, previous, current + 1), None
+        return (index, previous, current), self._wait(previous, current, elapsed)
+
+    def _wait(self, previous, current, elapsed):
+        if current < self.limit:
+            # Only the previous window's share (previous > 0 here) is in the
+            # way: it has to shrink to limit - current - 1.
+            return max(0.0, (1 - (self.limit - current - 1) / previous) * self.window - elapsed)
+        # Wait into the next window, where this one's count is the previous.
+        return self.window - elapsed + (1 - (self.limit - 1) / current) * self.window
+
+
+ALGORITHMS = {"token_bucket": TokenBucket, "sliding_window": SlidingWindow}
+
+
+# ---------------- Stores ----------------
+
+class LocalStore:
+    """Sharded in-process LRU of limiter records, bounded in size."""
+
+    def __init__(self, max_keys=None, shards=None):
+        max_keys = max_keys or getattr(settings, "RATE_LIMIT_LOCAL_MAX_KEYS", 100_000)
+        shards = shards or getattr(settings, "RATE_LIMIT_SHARDS", 16)
+        self.shard_size = max(1, max_keys // shards)
+        self.shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+
+    def update(self, key, func, ttl):
+        lock, records = self.shards[hash(key) % len(self.shards)]
+        now = time.time()
+        with lock:
+            record = records.get(key)
+            state = record[1] if record is not None and record[0] > now else None
+            state, result = func(state, now)
+            records[key] = (now + ttl, state)
+            records.move_to_end(key)
+            if len(records) > self.shard_size:
+                records.popitem(last=False)
+        return result
+
+    def clear(self):
+        for lock, records in self.shards:
+            with lock:
+                records.clear()
+
+    def __len__(self):
+        return sum(len(records) for _, records in self.shards)
+
+
+class CacheStore:
+    """
+    Records in a Django cache, shared by the processes using it. The update is
+    not atomic, so clients racing on one key may get a few requests over the limit.
+    """
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, "RATE_LIMIT_CACHE_ALIAS", "default")]
+
+    def update(self, key, func, ttl):
+        key = f"api:rate-limit:{key}"
+        now = time.time()
+        state, result = func(self.cache.get(key), now)
+        self.cache.set(key, state, math.ceil(ttl))
+        return result
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """The RATE_LIMIT_STORE instance of this process."""
+    path = getattr(settings, "RATE_LIMIT_STORE", "api.throttling.LocalStore")
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = import_string(path)()
+    return store
+
+
+# ---------------- Metrics ----------------
+
+class RateLimitMetrics(Registry):
+    label_names = ("scope", "result")
+
+    def __init__(self):
+        super().__init__()
+        self.decisions = self._family(
+            "api_rate_limit_decisions_total", "Rate-limited requests by scope, allowed or throttled.", "counter")
+
+    def record(self, scope, allowed):
+        with self.lock:
+            self.decisions.child((scope, "allowed" if allowed else "throttled"))[0] += 1
+
+    def stats(self, scope):
+        """Allowed and throttled requests of a scope."""
+        with self.lock:
+            counts = {
+                result: self.decisions.children.get((scope, result), [0])[0]
+                for result in ("allowed", "throttled")
+            }
+        return counts
+
+
+rate_limit_metrics = RateLimitMetrics()
+
+
+# ---------------- Throttle ----------------
+
+class Limit:
+    """
+    A RATE_LIMITS entry: "rate" ("<n>/<s|min|hour|day>"), "algorithm"
+    ("token_bucket", holding "burst" tokens, or "sliding_window"), "key"
+    ("user", "token" or "ip") and "methods" (default the unsafe ones).
+    """
+
+    def __init__(self, scope, config):
+        count, period = parse_rate(config.get("rate"))
+        algorithm = config.get("algorithm", "token_bucket")
+        if algorithm not in ALGORITHMS:
+            raise ImproperlyConfigured(f"RATE_LIMITS[{scope!r}]: unknown algorithm {algorithm!r}.")
+        self.key = config.get("key", "user")
+        if self.key not in ("user", "token", "ip"):
+            raise ImproperlyConfigured(f"RATE_LIMITS[{scope!r}]: key must be 'user', 'token' or 'ip'.")
+        self.algorithm = ALGORITHMS[algorithm](count, period, config.get("burst"))
+        self.methods = frozenset(method.upper() for method in config.get("methods", UNSAFE_METHODS))
+        self.config = config
+
+
+_limits = {}
+
+
+def get_limit(scope):
+    """The scope's compiled limit; recompiled when RATE_LIMITS changes."""
+    config = getattr(settings, "RATE_LIMITS", {}).get(scope)
+    if config is None:
+        raise ImproperlyConfigured(f"No RATE_LIMITS entry for the throttle scope {scope!r}.")
+    limit = _limits.get(scope)
+    if limit is None or limit.config is not config:
+        limit = _limits[scope] = Limit(scope, config)
+    return limit
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Applies RATE_LIMITS[view.throttle_scope] to the view's requests; a ViewSet
+    can give actions their own scope with `throttle_scopes` ({action: scope}).
+    """
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+        scope = scope or getattr(view, "throttle_scope", None)
+        if scope is None:
+            raise ImproperlyConfigured(f"{type(view).__name__} uses RateLimitThrottle without a throttle_scope.")
+        limit = get_limit(scope)
+        if request.method not in limit.methods:
+            return True
+        key = f"{scope}:{self.get_key(request, limit.key)}"
+        self.retry_after = get_store().update(key, limit.algorithm, limit.algorithm.ttl)
+        allowed = self.retry_after is None
+        rate_limit_metrics.record(scope, allowed)
+        return allowed
+
+    def get_key(self, request, kind):
+        if kind == "token":
+            token = getattr(request.auth, "key", None) or (request.auth if isinstance(request.auth, str) else None)
+            if token:
+                return "token:" + hashlib.sha256(token.encode()).hexdigest()[:32]
+            kind = "user"
+        if kind == "user" and request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def wait(self):
+        return self.retry_after
+
+
+@receiver(setting_changed)
+def reset_rate_limits(setting, **kwargs):
+    """Drop the compiled limits and the stores when a test overrides their settings."""
+    if setting.startswith("RATE_LIMIT"):
+        _limits.clear()
+        with _stores_lock:
+            _stores.clear()
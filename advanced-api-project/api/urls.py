@@ -5,6 +5,16 @@ from .views import (
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    AuthorListView,
+    AuthorDetailView,
+)
+from .async_views import (
+    AsyncBookListView,
+    AsyncBookDetailView,
+    AsyncBookCreateView,
+    AsyncAuthorListView,
+    AsyncAuthorDetailView,
+    AsyncAuthorCreateView,
 )
 
 urlpatterns = [
@@ -15,4 +25,13 @@ urlpatterns = [
     path("books/delete/", BookDeleteView.as_view(), name="book-delete"),
     path("books/<int:pk>/update/", BookUpdateView.as_view(), name="book-update-pk"),
     path("books/<int:pk>/delete/", BookDeleteView.as_view(), name="book-delete-pk"),
+    path("authors/", AuthorListView.as_view(), name="author-list"),
+    path("authors/<int:pk>/", AuthorDetailView.as_view(), name="author-detail"),
+    # Async-native versions (api/async_views.py)
+    path("async/books/", AsyncBookListView.as_view(), name="async-book-list"),
+    path("async/books/<int:pk>/", AsyncBookDetailView.as_view(), name="async-book-detail"),
+    path("async/books/create/", AsyncBookCreateView.as_view(), name="async-book-create"),
+    path("async/authors/", AsyncAuthorListView.as_view(), name="async-author-list"),
+    path("async/authors/<int:pk>/", AsyncAuthorDetailView.as_view(), name="async-author-detail"),
+    path("async/authors/create/", AsyncAuthorCreateView.as_view(), name="async-author-create"),
 ]
@@ -1,20 +1,47 @@
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics, filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.exceptions import ValidationError
-from .models import Book
+from .models import Author, Book
 from django_filters import rest_framework
-from .serializers import BookSerializer
+from .serializers import AuthorSerializer, BookSerializer
+from .pagination import KeysetPagination
+from .export import StreamingExportMixin
+from .fastpath import FastPathListMixin
+from .conditional import book_etag, book_last_modified, book_list_etag
+from .throttling import RateLimitThrottle
+
+class EagerLoadingViewMixin:
+    """
+    Applies the serializer's declared select_related/prefetch_related lookups
+    (see EagerLoadingMixin in serializers.py) to the view's queryset.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, "setup_eager_loading"):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
 
-class BookListView(generics.ListAPIView):
+
+@method_decorator(condition(etag_func=book_list_etag), name="get")
+class BookListView(StreamingExportMixin, FastPathListMixin, EagerLoadingViewMixin, generics.ListAPIView):
     """
     ListView
     GET /api/books/?author=<text>&title=<text>
     Public read-only: lists all books. Supports simple filtering via query params.
+    Results are keyset-paginated (?cursor=<opaque>&page_size=<n>) on the active ordering.
+    GET /api/books/?export=ndjson|csv streams every matching book instead (see api/export.py).
+    Conditional: If-None-Match against a per-table version stamp (see api/conditional.py).
+    Pages are serialized from .values() rows (see api/fastpath.py).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    fast_path = True
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
@@ -27,6 +54,7 @@ class BookListView(generics.ListAPIView):
     # Allow ordering by these fields (and set a sensible default)
     ordering_fields = ['id', 'title', 'publication_year', 'author']
     ordering = ['title']
+    export_filename = "books"
     
     def get_queryset(self):
         qs = super().get_queryset()
@@ -37,11 +65,13 @@ class BookListView(generics.ListAPIView):
         return qs
 
 
-class BookDetailView(generics.RetrieveAPIView):
+@method_decorator(condition(etag_func=book_etag, last_modified_func=book_last_modified), name="get")
+class BookDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     """
     DetailView
     GET /api/books/<int:pk>/
     Public read-only: retrieves a single book by ID.
+    Conditional: ETag/Last-Modified from the row's updated_at (see api/conditional.py).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -54,9 +84,12 @@ class BookCreateView(generics.CreateAPIView):
     CreateView
     POST /api/books/create/
     Auth required: creates a new book.
+    Rate limited per user (RATE_LIMITS["book-writes"], see api/throttling.py).
     """
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = "book-writes"
 
     def get_queryset(self):
         return Book.objects.all()
@@ -73,10 +106,13 @@ class BookUpdateView(generics.UpdateAPIView):
     UpdateView
     PUT/PATCH /api/books/<int:pk>/update/
     Auth required: updates an existing book.
+    Rate limited per user (RATE_LIMITS["book-writes"], see api/throttling.py).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = "book-writes"
     lookup_field = "pk"
 
     def perform_update(self, serializer):
@@ -88,9 +124,42 @@ class BookDeleteView(generics.DestroyAPIView):
     DeleteView
     DELETE /api/books/<int:pk>/delete/
     Auth required: deletes an existing book.
+    Rate limited per user (RATE_LIMITS["book-writes"], see api/throttling.py).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = "book-writes"
     lookup_field = "pk"
 
+
+class AuthorListView(EagerLoadingViewMixin, generics.ListAPIView):
+    """
+    ListView
+    GET /api/authors/
+    Public read-only: lists authors with their books embedded.
+    Books are prefetched in a single query per page (no N+1).
+    """
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['name']
+    # books_count is a stored, indexed counter (api/counters.py), not a COUNT(*).
+    ordering_fields = ['id', 'name', 'books_count']
+    ordering = ['name']
+
+
+class AuthorDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
+    """
+    DetailView
+    GET /api/authors/<int:pk>/
+    Public read-only: retrieves a single author with their books.
+    """
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    lookup_field = "pk"
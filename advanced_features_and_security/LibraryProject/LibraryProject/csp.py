@@ -0,0 +1,197 @@
+# LibraryProject/csp.py
+"""
+Content-Security-Policy: policies compiled once from the CSP_* settings, lazy
+per-request nonces, per-route overrides and batched violation reports.
+"""
+import atexit
+import json
+import logging
+import re
+import secrets
+import threading
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+NONCE = "'nonce'"
+
+DEFAULT_POLICY = {
+    "default-src": ["'self'"],
+    "script-src": ["'self'", NONCE],
+    "style-src": ["'self'", "'unsafe-inline'"],
+    "img-src": ["'self'", "data:"],
+    "font-src": ["'self'", "data:"],
+    "connect-src": ["'self'"],
+}
+
+HEADER = "Content-Security-Policy"
+REPORT_ONLY_HEADER = "Content-Security-Policy-Report-Only"
+
+logger = logging.getLogger("csp.reports")
+
+
+# ---------------- Policies ----------------
+
+class CompiledPolicy:
+    """A policy's header value, split around the nonce if it uses one."""
+
+    def __init__(self, directives):
+        parts = []
+        for name, sources in directives.items():
+            parts.append(" ".join([name, *sources]) if sources else name)
+        value = "; ".join(parts)
+        # Without a nonce the placeholder disappears with the space before it.
+        self.without_nonce = value.replace(f" {NONCE}", "")
+        if NONCE in value:
+            self.prefix, _, self.suffix = value.partition(NONCE)
+        else:
+            self.prefix = None
+
+    def header(self, nonce=None):
+        if nonce is None or self.prefix is None:
+            return self.without_nonce
+        return f"{self.prefix}'nonce-{nonce}'{self.suffix}"
+
+
+def compile_policy(directives, report_uri=None):
+    directives = {name: list(sources) for name, sources in directives.items() if sources is not None}
+    if report_uri:
+        directives["report-uri"] = [report_uri]
+    return CompiledPolicy(directives)
+
+
+class PolicySet:
+    """The default policy and the route overrides from settings, compiled."""
+
+    def __init__(self):
+        base = getattr(settings, "CSP_POLICY", DEFAULT_POLICY)
+        report_uri = getattr(settings, "CSP_REPORT_URI", None)
+        self.header_name = REPORT_ONLY_HEADER if getattr(settings, "CSP_REPORT_ONLY", False) else HEADER
+        self.default = compile_policy(base, report_uri)
+        self.routes = [
+            (re.compile(pattern), compile_policy({**base, **overrides}, report_uri))
+            for pattern, overrides in getattr(settings, "CSP_ROUTES", [])
+        ]
+
+    def for_path(self, path):
+        path = path.lstrip("/")
+        for pattern, policy in self.routes:
+            if pattern.search(path):
+                return policy
+        return self.default
+
+
+class LazyNonce:
+    """A nonce generated the first time it is rendered."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def __str__(self):
+        if self.value is None:
+            self.value = secrets.token_urlsafe(16)
+        return self.value
+
+    def __bool__(self):
+        return True
+
+    __html__ = __str__
+
+
+# ---------------- Violation reports ----------------
+
+class ReportAggregator:
+    """Counts violation reports in memory and logs them in batches."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.timer = None
+        self.received = 0
+
+    def add(self, report):
+        key = (
+            report.get("effective-directive") or report.get("violated-directive") or "",
+            _origin(report.get("blocked-uri") or ""),
+            urlsplit(report.get("document-uri") or "").path,
+        )
+        batch_size = getattr(settings, "CSP_REPORT_BATCH_SIZE", 100)
+        interval = getattr(settings, "CSP_REPORT_FLUSH_INTERVAL", 60)
+        with self.lock:
+            self.received += 1
+            self.counts[key] = self.counts.get(key, 0) + 1
+            due = len(self.counts) >= batch_size
+            if not due and self.timer is None:
+                # First report of the batch: flush it `interval` seconds from now.
+                self.timer = threading.Timer(interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()  # a no-op when the timer itself is flushing
+        for (directive, blocked, page), count in sorted(counts.items()):
+            logger.warning(
+                "CSP violation x%d: %s blocked %s on %s", count, directive, blocked or "(inline)", page,
+                extra={"csp_directive": directive, "csp_blocked": blocked, "csp_page": page, "csp_count": count},
+            )
+        return counts
+
+    def pending(self):
+        with self.lock:
+            return dict(self.counts)
+
+
+def _origin(uri):
+    """Scheme and host of a blocked URI; keywords such as 'inline' or 'eval' as they are."""
+    parts = urlsplit(uri)
+    if parts.scheme in ("http", "https", "ws", "wss") and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return uri
+
+
+report_aggregator = ReportAggregator()
+atexit.register(report_aggregator.flush)
+
+
+@csrf_exempt
+@require_POST
+def csp_report(request):
+    """
+    Receives violation reports: the report-uri format ({"csp-report": {...}})
+    and the Reporting API's list of {"type": "csp-violation", "body": {...}}.
+    """
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid JSON.")
+    if isinstance(payload, dict) and isinstance(payload.get("csp-report"), dict):
+        reports = [payload["csp-report"]]
+    elif isinstance(payload, list):
+        reports = [
+            _from_reporting_api(item["body"]) for item in payload
+            if isinstance(item, dict) and item.get("type") == "csp-violation" and isinstance(item.get("body"), dict)
+        ]
+    else:
+        return HttpResponseBadRequest("Not a CSP report.")
+    for report in reports:
+        report_aggregator.add(report)
+    return HttpResponse(status=204)
+
+
+def _from_reporting_api(body):
+    return {
+        "effective-directive": body.get("effectiveDirective"),
+        "blocked-uri": body.get("blockedURL"),
+        "document-uri": body.get("documentURL"),
+    }
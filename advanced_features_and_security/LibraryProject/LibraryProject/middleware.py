@@ -1,22 +1,24 @@
 # LibraryProject/middleware.py
 """
-Simple middleware to add Content-Security-Policy header.
-Adjust the policy string to allow any CDN or third-party domains you need.
+Adds the Content-Security-Policy header. The policies, per-route overrides,
+nonces and violation reporting are configured in settings; see
+LibraryProject/csp.py.
 """
+from .csp import LazyNonce, PolicySet
+
+
 class ContentSecurityPolicyMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        # Compiled once: each response only picks its header string.
+        self.policies = PolicySet()
 
     def __call__(self, request):
+        nonce = request.csp_nonce = LazyNonce()
         response = self.get_response(request)
-        # conservative default policy - allow only same-origin resources
-        csp_policy = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "font-src 'self' data:; "
-            "connect-src 'self';"
-        )
-        response['Content-Security-Policy'] = csp_policy
+        header = self.policies.header_name
+        if header not in response:  # a view may set its own policy
+            if response.streaming:
+                str(nonce)  # the body renders after the headers are sent
+            response[header] = self.policies.for_path(request.path_info).header(nonce.value)
         return response
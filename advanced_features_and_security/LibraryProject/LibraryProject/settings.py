@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from perf.sqlite import sqlite_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -36,13 +39,13 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 try:
-if DEBUG:
-SECURE_SSL_REDIRECT = False
-SECURE_HSTS_SECONDS = 0
-SESSION_COOKIE_SECURE = False
-CSRF_COOKIE_SECURE = False
+    if DEBUG:
+        SECURE_SSL_REDIRECT = False
+        SECURE_HSTS_SECONDS = 0
+        SESSION_COOKIE_SECURE = False
+        CSRF_COOKIE_SECURE = False
 except NameError:
-pass
+    pass
 
 # ---------------------------------------------------------------------
 # Application definition
@@ -57,13 +60,37 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'bookshelf',
     'relationship_app',
+    'perf',
 ]
 
 # Tell Django to use custom user model
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
 
+# Permission checks read a per-user permission set cached for
+# PERMISSION_CACHE_TIMEOUT seconds (see bookshelf/backends.py).
+AUTHENTICATION_BACKENDS = ['bookshelf.backends.CachedPermissionBackend']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-project',
+    }
+}
+PERMISSION_CACHE_ALIAS = 'default'
+PERMISSION_CACHE_TIMEOUT = 300
+
+# relationship_app role lookups (see relationship_app/roles.py).
+ROLE_CACHE_ALIAS = 'default'
+ROLE_CACHE_TIMEOUT = 300
+
+# Library manifests shown on the library detail page (relationship_app/manifest.py).
+LIBRARY_CACHE_ALIAS = 'default'
+LIBRARY_MANIFEST_TIMEOUT = 600
+
 MIDDLEWARE = [
+    'perf.middleware.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'LibraryProject.middleware.ContentSecurityPolicyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -72,6 +99,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if DEBUG:
+    # Development only: counts each request's queries on the auth tables.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'bookshelf.instrumentation.AuthQueryCountMiddleware',
+    )
+
 ROOT_URLCONF = 'LibraryProject.urls'
 
 TEMPLATES = [
@@ -94,11 +128,12 @@ WSGI_APPLICATION = 'LibraryProject.wsgi.application'
 # ---------------------------------------------------------------------
 # Database
 # ---------------------------------------------------------------------
+# SQLite with a busy timeout, immediate transactions and persistent,
+# health-checked connections (see perf.sqlite). On a server, run
+# `manage.py enable_sqlite_wal` once to switch the database file to WAL;
+# synchronous is then relaxed from FULL to NORMAL.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_profile(BASE_DIR / 'db.sqlite3'),
 }
 
 # ---------------------------------------------------------------------
@@ -160,9 +195,62 @@ SECURE_BROWSER_XSS_FILTER = True
 # If behind a reverse proxy (like Nginx with HTTPS), uncomment:
 # SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
+# Content-Security-Policy (see LibraryProject/csp.py): compiled once at
+# startup. "'nonce'" stands for the per-request nonce, used by inline
+# scripts as <script nonce="{{ request.csp_nonce }}">. CSP_ROUTES overrides
+# directives for the paths matching each regex (first match wins).
+CSP_POLICY = {
+    "default-src": ["'self'"],
+    "script-src": ["'self'", "'nonce'"],
+    "style-src": ["'self'", "'unsafe-inline'"],
+    "img-src": ["'self'", "data:"],
+    "font-src": ["'self'", "data:"],
+    "connect-src": ["'self'"],
+}
+CSP_ROUTES = [
+    # e.g. (r"^books/embed/", {"frame-ancestors": ["https://partner.example"]}),
+]
+# Report-only mode: browsers report violations to CSP_REPORT_URI without
+# blocking. Reports are counted in memory and logged to "csp.reports" in
+# batches of CSP_REPORT_BATCH_SIZE distinct violations, or at the latest
+# CSP_REPORT_FLUSH_INTERVAL seconds after the first report of a batch.
+CSP_REPORT_ONLY = False
+CSP_REPORT_URI = '/csp-report/'
+CSP_REPORT_BATCH_SIZE = 100
+CSP_REPORT_FLUSH_INTERVAL = 60
+
 # Trusted domains for CSRF (update with your actual domain)
 CSRF_TRUSTED_ORIGINS = [
     "https://127.0.0.1",
     "https://localhost",
 ]
 
+# Per-request performance metrics (see django-perf/ at the repository root).
+# PerfMiddleware records query count, DB time, duplicate queries and render
+# time per view; /metrics/ serves them in Prometheus format to staff users and
+# to requests with "Authorization: Bearer $PERF_METRICS_TOKEN". The test
+# runner switches it off; perf's own tests live in django-perf.
+PERF_ENABLED = True
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN')
+TEST_RUNNER = 'perf.testing.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'perf_file': {
+            'class': 'perf.logs.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'perf.requests': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,135 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .csp import NONCE, ReportAggregator, compile_policy, csp_report, report_aggregator
+from .middleware import ContentSecurityPolicyMiddleware
+
+POLICY = {"default-src": ["'self'"], "script-src": ["'self'", NONCE]}
+
+
+def render_with_nonce(request):
+    template = engines["django"].from_string('<script nonce="{{ request.csp_nonce }}"></script>')
+    return HttpResponse(template.render({}, request))
+
+
+@override_settings(CSP_POLICY=POLICY, CSP_ROUTES=[], CSP_REPORT_URI=None, CSP_REPORT_ONLY=False)
+class ContentSecurityPolicyTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def header(self, view, path="/books/", **settings):
+        with self.settings(**settings):
+            middleware = ContentSecurityPolicyMiddleware(view)
+        request = self.factory.get(path)
+        return request, middleware(request)
+
+    def test_policy_without_nonce_when_the_page_uses_none(self):
+        _, response = self.header(lambda request: HttpResponse("ok"))
+        self.assertEqual(response["Content-Security-Policy"], "default-src 'self'; script-src 'self'")
+
+    def test_nonce_matches_the_rendered_page(self):
+        request, response = self.header(render_with_nonce)
+        nonce = str(request.csp_nonce)
+        self.assertIn(f'nonce="{nonce}"', response.content.decode())
+        self.assertEqual(
+            response["Content-Security-Policy"], f"default-src 'self'; script-src 'self' 'nonce-{nonce}'")
+        _, other = self.header(render_with_nonce)
+        self.assertNotEqual(other["Content-Security-Policy"], response["Content-Security-Policy"])
+
+    def test_route_overrides(self):
+        routes = [(r"^embed/", {"frame-ancestors": ["https://partner.example"], "script-src": None})]
+        _, response = self.header(lambda request: HttpResponse("ok"), "/embed/1/", CSP_ROUTES=routes)
+        self.assertEqual(
+            response["Content-Security-Policy"], "default-src 'self'; frame-ancestors https://partner.example")
+        _, response = self.header(lambda request: HttpResponse("ok"), "/books/", CSP_ROUTES=routes)
+        self.assertIn("script-src", response["Content-Security-Policy"])
+
+    def test_report_only_mode(self):
+        _, response = self.header(
+            lambda request: HttpResponse("ok"), CSP_REPORT_ONLY=True, CSP_REPORT_URI="/csp-report/")
+        self.assertNotIn("Content-Security-Policy", response)
+        self.assertEqual(
+            response["Content-Security-Policy-Report-Only"],
+            "default-src 'self'; script-src 'self'; report-uri /csp-report/",
+        )
+
+    def test_views_may_set_their_own_policy(self):
+        def view(request):
+            response = HttpResponse("ok")
+            response["Content-Security-Policy"] = "default-src 'none'"
+            return response
+
+        _, response = self.header(view)
+        self.assertEqual(response["Content-Security-Policy"], "default-src 'none'")
+
+    def test_compiled_policy_only_substitutes_the_nonce(self):
+        policy = compile_policy(POLICY, "/r/")
+        self.assertEqual(policy.header("abc"), "default-src 'self'; script-src 'self' 'nonce-abc'; report-uri /r/")
+
+
+class CSPReportTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        report_aggregator.flush()
+
+    def post(self, payload, content_type="application/csp-report"):
+        request = self.factory.post("/csp-report/", json.dumps(payload), content_type=content_type)
+        return csp_report(request)
+
+    @override_settings(CSP_REPORT_BATCH_SIZE=100, CSP_REPORT_FLUSH_INTERVAL=3600)
+    def test_reports_are_aggregated_and_flushed_in_batches(self):
+        report = {
+            "document-uri": "https://library.example/books/?page=2",
+            "violated-directive": "script-src",
+            "blocked-uri": "https://cdn.example/lib.js?v=1",
+        }
+        with self.assertNoLogs("csp.reports"):
+            for _ in range(3):
+                self.assertEqual(self.post({"csp-report": report}).status_code, 204)
+            self.post([{"type": "csp-violation", "body": {
+                "effectiveDirective": "script-src", "blockedURL": "inline",
+                "documentURL": "https://library.example/books/",
+            }}], content_type="application/reports+json")
+        self.assertEqual(report_aggregator.pending(), {
+            ("script-src", "https://cdn.example", "/books/"): 3,
+            ("script-src", "inline", "/books/"): 1,
+        })
+        with self.assertLogs("csp.reports", "WARNING") as logs:
+            report_aggregator.flush()
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("x3: script-src blocked https://cdn.example on /books/", logs.output[0])
+        self.assertEqual(report_aggregator.pending(), {})
+
+    @override_settings(CSP_REPORT_BATCH_SIZE=2, CSP_REPORT_FLUSH_INTERVAL=3600)
+    def test_flushes_when_the_batch_is_full(self):
+        aggregator = ReportAggregator()
+        aggregator.add({"violated-directive": "img-src", "blocked-uri": "https://a.example/x.png"})
+        with self.assertLogs("csp.reports", "WARNING") as logs:
+            aggregator.add({"violated-directive": "img-src", "blocked-uri": "https://b.example/x.png"})
+        self.assertEqual(len(logs.records), 2)
+
+    @override_settings(CSP_REPORT_BATCH_SIZE=100, CSP_REPORT_FLUSH_INTERVAL=0.05)
+    def test_flushes_after_a_quiet_period(self):
+        aggregator = ReportAggregator()
+        with self.assertLogs("csp.reports", "WARNING") as logs:
+            aggregator.add({"violated-directive": "img-src", "blocked-uri": "https://a.example/x.png"})
+            aggregator.timer.join(5)  # no further report arrives
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual((aggregator.pending(), aggregator.timer), ({}, None))
+
+    def test_rejects_malformed_reports(self):
+        request = self.factory.post("/csp-report/", "not json", content_type="application/csp-report")
+        self.assertEqual(csp_report(request).status_code, 400)
+        self.assertEqual(self.post({"something": "else"}).status_code, 400)
+
+
+class IndexAdvisorTests(TestCase):
+    def test_project_has_no_missing_indexes(self):
+        out = StringIO()
+        call_command("index_advisor", "--check", stdout=out)
+        self.assertIn("No missing indexes.", out.getvalue())
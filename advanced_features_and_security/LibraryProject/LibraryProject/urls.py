@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from .csp import csp_report
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('csp-report/', csp_report, name='csp-report'),
     path('', include('relationship_app.urls')),
+    path('', include('perf.urls')),
 ]
@@ -0,0 +1,71 @@
+# bookshelf/backends.py
+"""
+ModelBackend that keeps each user's permission set in the cache for
+PERMISSION_CACHE_TIMEOUT seconds; bookshelf/signals.py invalidates it.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.db.models import Q
+
+from perf.stamps import bump_stamp, get_stamp
+
+from .instrumentation import permission_stats
+
+VERSION_KEY = "bookshelf:perms:version"
+
+
+def get_cache():
+    return caches[getattr(settings, "PERMISSION_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "PERMISSION_CACHE_TIMEOUT", 300)
+
+
+def permission_cache_key(user_id):
+    return f"bookshelf:perms:{get_stamp(get_cache(), VERSION_KEY)}:{user_id}"
+
+
+def invalidate_user_permissions(user_ids):
+    get_cache().delete_many([permission_cache_key(pk) for pk in user_ids])
+
+
+def invalidate_all_permissions():
+    bump_stamp(get_cache(), VERSION_KEY)
+
+
+class CachedPermissionBackend(ModelBackend):
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        # Same attribute ModelBackend uses for its per-request memo.
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = self._cached_permissions(user_obj)
+        return user_obj._perm_cache
+
+    def _cached_permissions(self, user_obj):
+        cache = get_cache()
+        key = permission_cache_key(user_obj.pk)
+        perms = cache.get(key)
+        if perms is not None:
+            permission_stats.hit()
+            return perms
+        permission_stats.miss()
+        perms = self.load_permissions(user_obj)
+        cache.set(key, perms, get_timeout())
+        return perms
+
+    def load_permissions(self, user_obj):
+        """Direct and group permissions of the user in one query."""
+        if user_obj.is_superuser:
+            queryset = Permission.objects.all()
+        else:
+            queryset = Permission.objects.filter(
+                Q(user=user_obj) | Q(group__user=user_obj)
+            ).distinct()
+        return {
+            f"{app_label}.{codename}"
+            for app_label, codename in queryset.values_list("content_type__app_label", "codename")
+        }
@@ -9,6 +9,15 @@ from django import forms
 from django.utils.html import strip_tags
 import re
 
+from .models import Book
+
+
+class BookForm(forms.ModelForm):
+    """Create/edit form used by the add_book and edit_book views."""
+    class Meta:
+        model = Book
+        fields = ['title', 'author', 'publication_year']
+
 class ExampleForm(forms.Form):
     """
     A simple example form used for searching or accepting short user input.
@@ -0,0 +1,87 @@
+# bookshelf/instrumentation.py
+"""Permission cache hit/miss counters and a DEBUG-only middleware counting auth table queries per request."""
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+
+
+class PermissionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.requests = 0
+            self.auth_queries = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_request(self, auth_queries):
+        with self._lock:
+            self.requests += 1
+            self.auth_queries += auth_queries
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "requests": self.requests,
+                "auth_queries": self.auth_queries,
+                "auth_queries_per_request": self.auth_queries / self.requests if self.requests else 0.0,
+            }
+
+
+permission_stats = PermissionStats()
+
+
+def auth_tables():
+    User = get_user_model()
+    return tuple(
+        model._meta.db_table
+        for model in (
+            Permission,
+            Group,
+            Group.permissions.through,
+            User.groups.through,
+            User.user_permissions.through,
+        )
+    )
+
+
+class AuthQueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.tables = auth_tables()
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            if any(table in sql for table in self.tables):
+                count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+
+        request.auth_query_count = count
+        permission_stats.record_request(count)
+        if settings.DEBUG:
+            response["X-Auth-Queries"] = str(count)
+        return response
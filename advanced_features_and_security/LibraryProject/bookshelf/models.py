@@ -76,6 +76,11 @@ class Book(models.Model):
             ("can_edit", "Can edit book"),
             ("can_delete", "Can delete book"),
         ]
+        indexes = [
+            # Admin list_filter lookups, newest first (the changelist orders by -pk)
+            models.Index(fields=["author", "-id"], name="bookshelf_book_author_idx"),
+            models.Index(fields=["publication_year", "-id"], name="bookshelf_book_year_idx"),
+        ]
 
     def __str__(self):
         return self.title
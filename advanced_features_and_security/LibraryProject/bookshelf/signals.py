@@ -0,0 +1,67 @@
+# bookshelf/signals.py
+"""
+Invalidates cached permission sets (bookshelf/backends.py) when group or
+permission membership changes. Connected in BookshelfConfig.ready().
+"""
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_all_permissions, invalidate_user_permissions
+from .models import CustomUser
+
+CHANGED = ("post_add", "post_remove", "post_clear")
+
+
+def invalidate_users(user_ids):
+    user_ids = list(user_ids)
+    invalidate_user_permissions(user_ids)
+    # Again after commit: a request may have cached the old set in between.
+    transaction.on_commit(lambda: invalidate_user_permissions(user_ids))
+
+
+def invalidate_all():
+    transaction.on_commit(invalidate_all_permissions)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def user_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.groups / user.user_permissions changed (from either side)."""
+    if action not in CHANGED:
+        return
+    if not reverse:
+        invalidate_users([instance.pk])
+    elif pk_set:
+        invalidate_users(pk_set)
+    else:
+        # group.user_set.clear(): the affected users are no longer known.
+        invalidate_all()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, **kwargs):
+    """group.permissions changed: every member of the group is affected."""
+    if action not in CHANGED:
+        return
+    if reverse:
+        invalidate_all()
+    else:
+        invalidate_users(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Only the flags the permission set depends on; last_login updates are ignored.
+    if created:
+        return
+    if update_fields is None or {"is_active", "is_superuser"} & set(update_fields):
+        invalidate_users([instance.pk])
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def auth_object_deleted(sender, **kwargs):
+    invalidate_all()
+
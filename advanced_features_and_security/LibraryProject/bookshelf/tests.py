@@ -1,3 +1,181 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.decorators import permission_required
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from .backends import permission_cache_key
+from .instrumentation import AuthQueryCountMiddleware, permission_stats
+from .management.commands.import_books import read_json_array
+from .models import Book, CustomUser
+
+
+@permission_required('bookshelf.can_view', raise_exception=True)
+def protected_view(request):
+    return HttpResponse("ok")
+
+
+class CachedPermissionBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        permission_stats.reset()
+        self.user = CustomUser.objects.create_user("reader", password="pass12345")
+        self.viewers = Group.objects.create(name="Viewers")
+        self.can_view = Permission.objects.get(codename="can_view")
+        self.can_edit = Permission.objects.get(codename="can_edit")
+        self.middleware = AuthQueryCountMiddleware(protected_view)
+
+    def fresh_user(self):
+        # A new object per "request", like AuthenticationMiddleware provides.
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def request(self):
+        request = RequestFactory().get("/books/")
+        request.user = self.fresh_user()
+        try:
+            self.middleware(request)
+        except PermissionDenied:
+            pass
+        return request.auth_query_count
+
+    def test_permission_set_loaded_in_one_query(self):
+        self.viewers.permissions.add(self.can_view)
+        self.user.groups.add(self.viewers)
+        self.user.user_permissions.add(self.can_edit)
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.get_all_permissions(), {"bookshelf.can_view", "bookshelf.can_edit"})
+
+    def test_warm_requests_make_no_auth_queries(self):
+        self.user.groups.add(self.viewers)
+        self.viewers.permissions.add(self.can_view)
+        self.assertEqual(self.request(), 1)
+        self.assertEqual(self.request(), 0)
+        self.assertEqual(self.request(), 0)
+        stats = permission_stats.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["auth_queries_per_request"], 1 / 3)
+
+    def test_group_membership_change_invalidates(self):
+        self.viewers.permissions.add(self.can_view)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.user.groups.add(self.viewers)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.viewers.user_set.remove(self.user)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+
+    def test_group_permission_change_invalidates_members(self):
+        self.user.groups.add(self.viewers)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_edit"))
+        self.viewers.permissions.add(self.can_edit)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_edit"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.can_edit.group_set.clear()
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_edit"))
+
+    def test_invalidation_is_repeated_after_commit(self):
+        self.viewers.permissions.add(self.can_view)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.viewers)
+            # Another request caches the set before the change is committed.
+            cache.set(permission_cache_key(self.user.pk), set(), 300)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+
+    def test_direct_permission_and_flags_invalidate(self):
+        self.user.user_permissions.add(self.can_view)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.user.user_permissions.clear()
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_delete"))
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_delete"))
+
+
+class ImportBooksTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def call(self, path, *args):
+        out = io.StringIO()
+        call_command("import_books", path, *args, "--batch-size", "2", stdout=out)
+        return out.getvalue()
+
+    def test_csv_validates_and_dedupes(self):
+        Book.objects.create(title="Emma", author="Jane Austen", publication_year=1815)
+        path = self.write("books.csv", (
+            "\ufefftitle,author,publication_year,extra\n"
+            "Dune,Frank Herbert,1965,x\n"
+            " Dune ,Frank Herbert,1965,\n"
+            "Emma,Jane Austen,1815,\n"
+            f"{'x' * 101},Someone,2000,\n"
+            "Solaris,Stanisław Lem,nineteen,\n"
+            "Solaris,Stanisław Lem,1961,\n"
+        ))
+        errors = os.path.join(self.directory.name, "rejected.ndjson")
+        output = self.call(path, "--errors", errors)
+        self.assertIn("6 records, 2 created, 2 duplicates, 2 invalid", output)
+        self.assertEqual(
+            sorted(Book.objects.values_list("title", "publication_year")),
+            [("Dune", 1965), ("Emma", 1815), ("Solaris", 1961)],
+        )
+        with open(errors, encoding="utf-8") as file:
+            rejected = [json.loads(line) for line in file]
+        self.assertEqual([row["record"] for row in rejected], [4, 5])
+        self.assertIn("publication_year", rejected[1]["errors"])
+        self.assertFalse(os.path.exists(path + ".import-checkpoint"))
+
+    def test_json_array_is_decoded_incrementally(self):
+        records = [{"title": f"Book {i}", "author": "A", "publication_year": 2000 + i} for i in range(5)]
+        document = json.dumps(records, indent=2)
+        self.assertEqual(list(read_json_array(io.StringIO(document), chunk_size=7)), records)
+        self.assertEqual(list(read_json_array(io.StringIO(" [ ] "))), [])
+        with self.assertRaises(CommandError):
+            list(read_json_array(io.StringIO('[{"title": "x"}, 3]')))
+        self.call(self.write("books.json", document))
+        self.assertEqual(Book.objects.count(), 5)
+
+    def test_resume_after_a_failed_batch(self):
+        lines = [json.dumps({"title": f"Book {i}", "author": "A", "publication_year": 1990}) for i in range(7)]
+        path = self.write("books.ndjson", "\n".join(lines) + "\n")
+        real_bulk_create = Book.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+            return real_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(Book.objects, "bulk_create", failing_bulk_create):
+            with self.assertRaises(DatabaseError):
+                self.call(path)
+        self.assertEqual(Book.objects.count(), 2)
+        with self.assertRaisesMessage(CommandError, "--resume"):
+            self.call(path)
+
+        output = self.call(path, "--resume")
+        self.assertIn("Resuming after record 2.", output)
+        self.assertIn("7 records, 5 created", output)
+        self.assertEqual(Book.objects.count(), 7)
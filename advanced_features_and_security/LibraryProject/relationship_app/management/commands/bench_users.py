@@ -0,0 +1,89 @@
+# relationship_app/management/commands/bench_users.py
+"""
+Benchmark login throughput and bulk user import, inside a rolled-back transaction.
+
+    python manage.py bench_users --users 100000 --logins 2000 [--legacy]
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client
+
+from relationship_app.models import UserProfile, save_user_profile
+from relationship_app.profiles import bulk_create_users
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_save_user_profile(sender, instance, **kwargs):
+    UserProfile.objects.get_or_create(user=instance)
+    instance.userprofile.save()
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput and bulk user import speed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--logins", type=int, default=2000)
+        parser.add_argument("--sample", type=int, default=2000,
+                            help="Users created one by one for the import baseline.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--legacy", action="store_true",
+                            help="Use the old per-save profile handler for the login run.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, users, logins, sample, batch_size, legacy, **options):
+        user_model = get_user_model()
+
+        start = time.perf_counter()
+        created = bulk_create_users(
+            ({"username": f"bench-{i:07d}"} for i in range(users)), batch_size=batch_size
+        )
+        bulk_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(sample):
+            user_model.objects.create_user(f"bench-single-{i:07d}")
+        single_seconds = time.perf_counter() - start
+
+        self.stdout.write(f"Import of {users} users:")
+        self.stdout.write(f"  bulk_create_users  {bulk_seconds:8.2f} s  ({users / bulk_seconds:,.0f} users/s)")
+        self.stdout.write(
+            f"  create_user loop   {single_seconds / sample * users:8.2f} s  "
+            f"({sample / single_seconds:,.0f} users/s, extrapolated from {sample})"
+        )
+
+        if legacy:
+            post_save.disconnect(save_user_profile, sender=user_model)
+            post_save.connect(legacy_save_user_profile, sender=user_model)
+        try:
+            client = Client()
+            targets = created[:logins]
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+                start = time.perf_counter()
+                for user in targets:
+                    client.force_login(user)
+                login_seconds = time.perf_counter() - start
+        finally:
+            if legacy:
+                post_save.disconnect(legacy_save_user_profile, sender=user_model)
+                post_save.connect(save_user_profile, sender=user_model)
+
+        label = "legacy handler" if legacy else "current handler"
+        self.stdout.write(f"Login ({label}, {len(targets)} logins):")
+        self.stdout.write(f"  {len(targets) / login_seconds:,.0f} logins/s, "
+                          f"{len(queries) / len(targets):.1f} queries per login")
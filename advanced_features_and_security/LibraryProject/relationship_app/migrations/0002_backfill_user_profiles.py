@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # save_user_profile no longer runs get_or_create on every user save, so
+    # users created before the profile signal existed get their profile here.
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserProfile = apps.get_model('relationship_app', 'UserProfile')
+    missing = User.objects.filter(userprofile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.bulk_create(
+        (UserProfile(user_id=pk) for pk in missing.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('relationship_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
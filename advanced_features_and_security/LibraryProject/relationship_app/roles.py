@@ -0,0 +1,57 @@
+# relationship_app/roles.py
+"""
+A user's roles are their groups named after a role (UserProfile.role is not
+consulted); cached for ROLE_CACHE_TIMEOUT seconds, invalidated in signals.py.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from perf.stamps import bump_stamp, get_stamp
+
+from .models import UserProfile
+
+ROLES = frozenset(role for role, _ in UserProfile.ROLE_CHOICES)
+VERSION_KEY = "relationship_app:roles:version"
+
+
+def get_cache():
+    return caches[getattr(settings, "ROLE_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "ROLE_CACHE_TIMEOUT", 300)
+
+
+def role_cache_key(user_id):
+    return f"relationship_app:roles:{get_stamp(get_cache(), VERSION_KEY)}:{user_id}"
+
+
+def invalidate_user_roles(user_ids):
+    get_cache().delete_many([role_cache_key(pk) for pk in user_ids])
+
+
+def invalidate_all_roles():
+    bump_stamp(get_cache(), VERSION_KEY)
+
+
+def load_roles(user):
+    """The role-named groups of the user, in one query."""
+    return frozenset(user.groups.filter(name__in=ROLES).values_list("name", flat=True))
+
+
+def get_roles(user):
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, "_role_cache"):
+        cache = get_cache()
+        key = role_cache_key(user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            roles = load_roles(user)
+            cache.set(key, roles, get_timeout())
+        user._role_cache = roles
+    return user._role_cache
+
+
+def has_role(user, role):
+    return role in get_roles(user)
@@ -1,3 +1,235 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .counters import author_books
+from .manifest import get_manifest, manifest_cache_key
+from .models import Author, Book, Librarian, Library, UserProfile
+from .profiles import bulk_create_users
+from .roles import get_roles, role_cache_key
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("reader", password="pass12345")
+        self.librarians = Group.objects.create(name="Librarian")
+        self.client.force_login(self.user)
+
+    def fresh_user(self):
+        # A new object per "request", like AuthenticationMiddleware provides.
+        return get_user_model().objects.get(pk=self.user.pk)
+
+    def get(self, name):
+        return self.client.get(reverse(name), secure=True)  # SECURE_SSL_REDIRECT is on
+
+    def test_roles_loaded_once_then_cached(self):
+        self.user.groups.add(self.librarians)
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_roles(user), {"Librarian"})
+            get_roles(user)
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_roles(user), {"Librarian"})
+
+    def test_profile_role_is_not_a_grant(self):
+        self.assertEqual(self.user.userprofile.role, "Member")  # the default every profile gets
+        self.assertEqual(self.get("member_view").status_code, 302)
+        self.user.userprofile.role = "Admin"
+        self.user.userprofile.save()
+        self.assertEqual(self.get("admin_view").status_code, 302)
+        self.assertEqual(self.get("librarian_view").status_code, 302)
+
+    def test_new_user_is_denied_the_role_areas(self):
+        # The register view's UserCreationForm does not support the custom
+        # user model here, so the account is created as it would have made it.
+        newcomer = get_user_model().objects.create_user("newcomer", password="Tr1cky-pass-42")
+        self.assertEqual(newcomer.userprofile.role, "Member")
+        self.client.force_login(newcomer)
+        for name in ("member_view", "librarian_view", "admin_view"):
+            self.assertEqual(self.get(name).status_code, 302)
+
+    def test_group_membership_changes_invalidate(self):
+        self.assertEqual(self.get("librarian_view").status_code, 302)
+        self.user.groups.add(self.librarians)
+        self.assertEqual(self.get("librarian_view").status_code, 200)
+        self.librarians.user_set.remove(self.user)
+        self.assertEqual(self.get("librarian_view").status_code, 302)
+        self.librarians.user_set.add(self.user)
+        self.assertEqual(self.get("librarian_view").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.librarians.user_set.clear()
+        self.assertEqual(self.get("librarian_view").status_code, 302)
+
+    def test_invalidation_is_repeated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.librarians)
+            # Another request caches the roles before the change is committed.
+            cache.set(role_cache_key(self.user.pk), frozenset(), 300)
+        self.assertEqual(get_roles(self.fresh_user()), {"Librarian"})
+
+    def test_group_rename_and_delete_invalidate(self):
+        self.user.groups.add(self.librarians)
+        self.assertEqual(self.get("librarian_view").status_code, 200)
+        self.librarians.name = "Former librarians"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.librarians.save()
+        self.assertEqual(self.get("librarian_view").status_code, 302)
+
+        members = Group.objects.create(name="Member")
+        self.user.groups.add(members)
+        self.assertEqual(self.get("member_view").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            members.delete()
+        self.assertEqual(self.get("member_view").status_code, 302)
+
+    def test_anonymous_user_has_no_roles(self):
+        self.client.logout()
+        self.assertEqual(self.get("member_view").status_code, 302)
+
+
+class ProfileProvisioningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("reader", password="pass12345")
+
+    def test_login_does_not_touch_profile(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            user.save(update_fields=["last_login"])
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_loaded_profile_written_only_when_changed(self):
+        user = get_user_model().objects.select_related("userprofile").get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            user.save()
+        user.userprofile.role = "Librarian"
+        with self.assertNumQueries(2):
+            user.save()
+        self.assertEqual(UserProfile.objects.get(user=user).role, "Librarian")
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_bulk_create_users(self):
+        rows = [{"username": f"user{i}", "role": "Librarian" if i % 2 else None} for i in range(25)]
+        rows[0]["password"] = "s3cret-pass"
+        # Per batch of 10: users INSERT + profiles INSERT; plus the savepoint pair.
+        with self.assertNumQueries(2 * 3 + 2):
+            users = bulk_create_users(rows, batch_size=10)
+        self.assertEqual(len(users), 25)
+        self.assertTrue(users[0].check_password("s3cret-pass"))
+        self.assertFalse(users[1].has_usable_password())
+        roles = dict(UserProfile.objects.filter(user__in=users).values_list("user__username", "role"))
+        self.assertEqual(roles["user0"], "Member")
+        self.assertEqual(roles["user1"], "Librarian")
+        with self.assertNumQueries(1):
+            users[1].save()
+
+    def test_bulk_create_users_rejects_unknown_role(self):
+        with self.assertRaises(ValueError):
+            bulk_create_users([{"username": "ok"}, {"username": "bad", "role": "Owner"}])
+        self.assertFalse(get_user_model().objects.filter(username="ok").exists())
+
+
+class LibraryDetailViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authors = [Author.objects.create(name=f"Author {i}") for i in range(3)]
+        self.books = Book.objects.bulk_create(
+            Book(title=f"Book {i:03d}", author=authors[i % 3]) for i in range(120)
+        )
+        author_books.refresh([author.pk for author in authors])  # bulk_create sends no signals
+        self.library = Library.objects.create(name="Central")
+        self.library.books.add(*self.books)
+        Librarian.objects.create(name="Lee", library=self.library)
+        self.url = reverse("library_detail", args=[self.library.pk])
+
+    def get(self, **params):
+        return self.client.get(self.url, params, secure=True)
+
+    def test_page_loads_books_with_authors_in_one_query(self):
+        # library + manifest aggregate + one page of books joined to authors
+        with self.assertNumQueries(3):
+            response = self.get()
+        self.assertEqual(len(response.context["books"]), 50)
+        self.assertContains(response, "Book 000 by Author 0")
+        self.assertContains(response, "120 books by 3 authors")
+        self.assertContains(response, "Librarian: Lee")
+        # warm manifest: library + page
+        with self.assertNumQueries(2):
+            response = self.get(page=3)
+        self.assertEqual(len(response.context["books"]), 20)
+        self.assertEqual(response.context["paginator"].num_pages, 3)
+
+    def test_manifest_invalidated_by_m2m_changes(self):
+        self.get()
+        self.library.books.remove(self.books[0])
+        self.assertContains(self.get(), "119 books")
+        self.books[1].libraries.clear()
+        self.assertContains(self.get(), "118 books")
+        self.books[1].libraries.add(self.library)
+        self.assertContains(self.get(), "119 books")
+        self.library.books.clear()
+        self.assertContains(self.get(), "0 books by 0 authors")
+
+    def test_manifest_invalidated_by_book_and_librarian_changes(self):
+        self.get()
+        self.books[5].delete()
+        self.assertContains(self.get(), "119 books")
+        Book.objects.filter(author__name="Author 2").delete()
+        self.assertContains(self.get(), "80 books by 2 authors")
+        self.library.librarian.delete()
+        self.assertNotContains(self.get(), "Librarian:")
+
+    def test_invalidation_is_repeated_after_commit(self):
+        stale = get_manifest(self.library.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.library.books.remove(self.books[0])
+            # Another request caches the old manifest before the change is committed.
+            cache.set(manifest_cache_key(self.library.pk), stale, 600)
+        self.assertContains(self.get(), "119 books")
+
+
+class BookCounterTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Octavia Butler")
+        self.books = [Book.objects.create(title=f"Book {i}", author=self.author) for i in range(4)]
+        self.central = Library.objects.create(name="Central")
+        self.branch = Library.objects.create(name="Branch")
+
+    def counts(self):
+        return (
+            Library.objects.get(pk=self.central.pk).books_count,
+            Library.objects.get(pk=self.branch.pk).books_count,
+        )
+
+    def test_library_counter_follows_m2m_changes(self):
+        self.central.books.add(*self.books)
+        self.central.books.add(self.books[0])  # already there: not counted twice
+        self.books[0].libraries.add(self.branch)
+        self.assertEqual(self.counts(), (4, 1))
+
+        # Removing absent rows must not decrement.
+        self.branch.books.remove(self.books[1], self.books[2])
+        self.books[3].libraries.remove(self.central, self.branch)
+        self.assertEqual(self.counts(), (3, 1))
+
+        self.books[0].libraries.clear()
+        self.assertEqual(self.counts(), (2, 0))
+        self.books[1].delete()
+        self.assertEqual(self.counts(), (1, 0))
+        self.central.books.clear()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_author_counter(self):
+        self.assertEqual(Author.objects.get(pk=self.author.pk).books_count, 4)
+        self.books[0].delete()
+        self.assertEqual(Author.objects.get(pk=self.author.pk).books_count, 3)
+        self.assertEqual(
+            list(Author.objects.order_by('-books_count', '-id').values_list('name', flat=True)[:1]),
+            ["Octavia Butler"],
+        )
@@ -0,0 +1,204 @@
+# api/authentication.py
+"""
+TokenAuthentication answering from a per-process LRU and a shared cache of
+(user pk, is_active); api/signals.py invalidates. Local entries can outlive a
+revocation in other processes for TOKEN_AUTH_LOCAL_TIMEOUT seconds (0 disables them).
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from perf.metrics import Registry
+
+INVALID = "invalid"
+INACTIVE = "inactive"
+FAILURE_MESSAGES = {
+    INVALID: _("Invalid token."),
+    INACTIVE: _("User inactive or deleted."),
+}
+
+AUTH_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+
+def get_cache():
+    return caches[getattr(settings, "TOKEN_AUTH_CACHE_ALIAS", "default")]
+
+
+def cache_key(token_key):
+    return "api:token-auth:" + hashlib.sha256(token_key.encode()).hexdigest()
+
+
+class LocalCache:
+    """Thread-safe LRU with a per-entry expiry time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires, value)
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, timeout):
+        size = getattr(settings, "TOKEN_AUTH_LOCAL_SIZE", 10000)
+        if timeout <= 0 or size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalCache()
+
+
+def invalidate_tokens(token_keys):
+    """Forget the cached outcome of these token keys."""
+    keys = [cache_key(token_key) for token_key in token_keys]
+    if keys:
+        local_cache.delete_many(keys)
+        get_cache().delete_many(keys)
+
+
+class TokenAuthMetrics(Registry):
+    label_names = ("tier", "result")
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = self._family(
+            "api_token_auth_lookups_total",
+            "Token authentications by the tier that answered (local, shared, database) and outcome.",
+            "counter")
+        self.duration = self._family(
+            "api_token_auth_duration_seconds", "Time spent authenticating the token of a request.",
+            "histogram", AUTH_BUCKETS)
+
+    def record(self, tier, result, duration):
+        labels = (tier, result)
+        with self.lock:
+            self.lookups.child(labels)[0] += 1
+            self.duration.child(labels).observe(duration)
+
+    def stats(self):
+        """Hits (either cache tier), misses (database) and the hit ratio."""
+        with self.lock:
+            per_tier = {}
+            for (tier, _result), counter in self.lookups.children.items():
+                per_tier[tier] = per_tier.get(tier, 0) + counter[0]
+            durations = list(self.duration.children.values())
+            total_time = sum(histogram.sum for histogram in durations)
+        misses = per_tier.get("database", 0)
+        hits = sum(per_tier.values()) - misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "tiers": per_tier,
+            "mean_auth_time": total_time / total if total else 0.0,
+        }
+
+
+token_auth_metrics = TokenAuthMetrics()
+
+
+def token_auth_stats():
+    return token_auth_metrics.stats()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication answering from the local and shared caches when it can."""
+
+    def authenticate_credentials(self, key):
+        start = time.perf_counter()
+        entry_key = cache_key(key)
+        tier = "local"
+        entry = local_cache.get(entry_key)  # the token with its user, or a failure
+        if entry is None:
+            tier = "shared"
+            identity = get_cache().get(entry_key)  # (user pk, is_active), or a failure
+            if identity is None:
+                tier = "database"
+                entry = self.load_token(key)
+                self.store_identity(entry_key, entry)
+            else:
+                entry = self.load_user(key, identity)
+                if isinstance(entry, str) and entry != identity:
+                    self.store_identity(entry_key, entry)  # the user went away since
+            local_cache.set(entry_key, entry, self.timeout(entry, "TOKEN_AUTH_LOCAL_TIMEOUT", 5))
+
+        result = entry if isinstance(entry, str) else "ok"
+        token_auth_metrics.record(tier, result, time.perf_counter() - start)
+        if result != "ok":
+            raise exceptions.AuthenticationFailed(FAILURE_MESSAGES[result])
+        # A private copy: the cached objects are shared by every request of the process.
+        token = copy.copy(entry)
+        token.user = copy.copy(entry.user)
+        return (token.user, token)
+
+    def load_token(self, key):
+        """The token with its user, or the reason it is refused."""
+        model = self.get_model()
+        try:
+            token = model.objects.select_related("user").get(key=key)
+        except model.DoesNotExist:
+            return INVALID
+        if not token.user.is_active:
+            return INACTIVE
+        return token
+
+    def load_user(self, key, identity):
+        """
+        The token rebuilt around a fresh copy of its user, from a shared entry;
+        a failure cached there is returned as it is.
+        """
+        if isinstance(identity, str):
+            return identity
+        user_pk, is_active = identity
+        if not is_active:
+            return INACTIVE
+        try:
+            user = get_user_model()._default_manager.get(pk=user_pk)
+        except ObjectDoesNotExist:
+            return INVALID
+        if not user.is_active:
+            return INACTIVE
+        return self.get_model()(key=key, user=user)
+
+    def store_identity(self, entry_key, entry):
+        identity = entry if isinstance(entry, str) else (entry.user_id, entry.user.is_active)
+        get_cache().set(entry_key, identity, self.timeout(entry, "TOKEN_AUTH_CACHE_TIMEOUT", 300))
+
+    @staticmethod
+    def timeout(entry, setting, default):
+        timeout = getattr(settings, setting, default)
+        if isinstance(entry, str):
+            timeout = min(timeout, getattr(settings, "TOKEN_AUTH_NEGATIVE_TIMEOUT", 30))
+        return timeout
@@ -0,0 +1,174 @@
+from django.db import DatabaseError, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from rest_framework.response import Response
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkWriteMixin:
+    """
+    Adds list-payload write actions to a ModelViewSet:
+    - POST   /<prefix>/bulk/  [{...}, {...}]                -> bulk_create
+    - PATCH  /<prefix>/bulk/  [{"id": 1, ...}, ...]         -> bulk_update
+    - DELETE /<prefix>/bulk/  [1, 2, 3]                     -> delete
+
+    Every item is validated with the view's serializer. Invalid items are
+    reported by their index in the payload and do not stop the valid ones from
+    being written. Writes go out in batches of `bulk_batch_size` rows, each in
+    its own transaction; if a batch fails in the database it is retried row by
+    row so only the offending rows are reported.
+
+    Response: {"created"/"updated"/"deleted": [...], "errors": [{"index", "errors"}]}
+    with 201/200 when everything succeeded, 207 when some items failed and 400
+    when none succeeded.
+    """
+    bulk_batch_size = 500
+    bulk_max_items = 10000
+
+    def get_bulk_payload(self, request):
+        data = request.data
+        if not isinstance(data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if len(data) > self.bulk_max_items:
+            raise ValidationError(
+                {"non_field_errors": [f"At most {self.bulk_max_items} items per request."]}
+            )
+        return data
+
+    @staticmethod
+    def validate_item(serializer, item):
+        """
+        Validate one item with a shared serializer instance (as ListSerializer
+        does for its children) instead of building a serializer per item.
+        Returns (validated_data, None) or (None, errors).
+        """
+        try:
+            return serializer.run_validation(item), None
+        except ValidationError as exc:
+            return None, as_serializer_error(exc)
+
+    def bulk_response(self, key, done, errors, success_status):
+        if errors and not done:
+            code = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = success_status
+        return Response({key: done, "errors": errors}, status=code)
+
+    def write_in_batches(self, items, write):
+        """
+        Run `write(batch)` for each batch of (index, obj) pairs inside a
+        transaction. Returns (written objects, errors).
+        """
+        written, errors = [], []
+        for batch in chunked(items, self.bulk_batch_size):
+            try:
+                with transaction.atomic():
+                    write([obj for _, obj in batch])
+                written.extend(obj for _, obj in batch)
+            except DatabaseError:
+                for index, obj in batch:
+                    try:
+                        with transaction.atomic():
+                            write([obj])
+                        written.append(obj)
+                    except DatabaseError as exc:
+                        errors.append({"index": index, "errors": {"non_field_errors": [str(exc)]}})
+        return written, errors
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        payload = self.get_bulk_payload(request)
+        model = self.get_queryset().model
+
+        serializer = self.get_serializer()
+        valid, errors = [], []
+        for index, item in enumerate(payload):
+            validated, item_errors = self.validate_item(serializer, item)
+            if item_errors:
+                errors.append({"index": index, "errors": item_errors})
+            else:
+                valid.append((index, model(**validated)))
+
+        created, write_errors = self.write_in_batches(
+            valid, lambda objs: model.objects.bulk_create(objs)
+        )
+        errors = sorted(errors + write_errors, key=lambda e: e["index"])
+        data = self.get_serializer(created, many=True).data
+        return self.bulk_response("created", data, errors, status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        payload = self.get_bulk_payload(request)
+        queryset = self.get_queryset()
+        model = queryset.model
+
+        ids = [item.get("id") for item in payload if isinstance(item, dict)]
+        ids = [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+        instances = {}
+        for batch in chunked(ids, self.bulk_batch_size):
+            instances.update(queryset.in_bulk(batch))
+
+        serializer = self.get_serializer(partial=True)
+        valid, errors, fields = [], [], set()
+        for index, item in enumerate(payload):
+            pk = item.get("id") if isinstance(item, dict) else None
+            if pk is None:
+                errors.append({"index": index, "errors": {"id": ["This field is required."]}})
+                continue
+            instance = instances.get(pk) if isinstance(pk, int) else None
+            if instance is None:
+                errors.append({"index": index, "errors": {"id": [f"Object with id={pk} does not exist."]}})
+                continue
+            serializer.instance = instance  # unique validators exclude the row itself
+            validated, item_errors = self.validate_item(serializer, item)
+            if item_errors:
+                errors.append({"index": index, "errors": item_errors})
+                continue
+            for field, value in validated.items():
+                setattr(instance, field, value)
+                fields.add(field)
+            valid.append((index, instance))
+
+        if fields:
+            updated, write_errors = self.write_in_batches(
+                valid, lambda objs: model.objects.bulk_update(objs, sorted(fields))
+            )
+        else:
+            updated, write_errors = [obj for _, obj in valid], []
+        errors = sorted(errors + write_errors, key=lambda e: e["index"])
+        data = self.get_serializer(updated, many=True).data
+        return self.bulk_response("updated", data, errors, status.HTTP_200_OK)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        payload = self.get_bulk_payload(request)
+        queryset = self.get_queryset()
+
+        wanted, errors = [], []
+        for index, pk in enumerate(payload):
+            if isinstance(pk, int) and not isinstance(pk, bool):
+                wanted.append((index, pk))
+            else:
+                errors.append({"index": index, "errors": {"id": ["A valid integer is required."]}})
+
+        deleted = []
+        for batch in chunked(wanted, self.bulk_batch_size):
+            with transaction.atomic():
+                ids = [pk for _, pk in batch]
+                existing = set(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+                queryset.filter(pk__in=existing).delete()
+            for index, pk in batch:
+                if pk in existing:
+                    deleted.append(pk)
+                else:
+                    errors.append({"index": index, "errors": {"id": [f"Object with id={pk} does not exist."]}})
+        errors.sort(key=lambda e: e["index"])
+        return self.bulk_response("deleted", deleted, errors, status.HTTP_200_OK)
@@ -0,0 +1,69 @@
+# api/management/commands/bench_bulk.py
+"""
+Throughput of the bulk endpoint versus one POST per book:
+`python manage.py bench_bulk --items 10000` (rolled back at the end).
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import Book
+from api.views import BookViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of POST /books_all/bulk/ with single-item POST /books_all/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=10_000)
+        parser.add_argument("--single-items", type=int, default=2_000,
+                            help="Items sent through the single-item path (it is slow).")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, items, single_items, **options):
+        factory = APIRequestFactory(HTTP_HOST="localhost")
+        user = User.objects.create(username="bench-bulk")
+
+        def payload(prefix, n):
+            return [
+                {"title": f"{prefix} {i}", "author": f"Author {i % 100}", "pages": 100 + i % 500}
+                for i in range(n)
+            ]
+
+        create = BookViewSet.as_view({"post": "create"})
+        start = time.perf_counter()
+        for item in payload("single", single_items):
+            request = factory.post("/api/books_all/", item, format="json")
+            force_authenticate(request, user)
+            # Each request commits on its own, like separate HTTP calls would.
+            with transaction.atomic():
+                create(request)
+        single = single_items / (time.perf_counter() - start)
+
+        bulk = BookViewSet.as_view({"post": "bulk"})
+        request = factory.post("/api/books_all/bulk/", payload("bulk", items), format="json")
+        force_authenticate(request, user)
+        start = time.perf_counter()
+        response = bulk(request)
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 201, response.data
+        bulk_rate = items / elapsed
+
+        self.stdout.write(f"single-item POST: {single:>10.0f} rows/s ({single_items} rows)")
+        self.stdout.write(f"bulk POST:        {bulk_rate:>10.0f} rows/s ({items} rows, {elapsed:.2f}s)")
+        self.stdout.write(f"speed-up:         {bulk_rate / single:>10.1f}x")
+        self.stdout.write(f"rows written:     {Book.objects.count()}")
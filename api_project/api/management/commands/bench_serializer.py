@@ -0,0 +1,88 @@
+# api/management/commands/bench_serializer.py
+"""
+Microbenchmark: BookSerializer versus the .values() fast path (api/fastpath.py).
+
+    python manage.py bench_serializer --rows 10000 --repeat 5
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import ValuesSerializer
+from api.models import Book
+from api.serializers import BookSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+def best_of(repeat, func):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+class Command(BaseCommand):
+    help = "Compare BookSerializer and the .values() fast path on one large page."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, repeat, **options):
+        self.stdout.write(f"Seeding {rows} books...")
+        Book.objects.bulk_create(
+            (
+                Book(
+                    title=f"Title {i:08d}", author=f"Author {i % 100}",
+                    published_date=date(1900 + i % 120, 1 + i % 12, 1 + i % 28) if i % 10 else None,
+                    isbn=f"{i:013d}", pages=100 + i % 900,
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
+        queryset = Book.objects.order_by("id")[:rows]
+        fast = ValuesSerializer.for_serializer(BookSerializer)
+        renderer = JSONRenderer()
+
+        fetch_ms, instances = best_of(repeat, lambda: list(queryset.all()))
+        serialize_ms, data = best_of(repeat, lambda: BookSerializer(instances, many=True).data)
+        render_ms, expected = best_of(repeat, lambda: renderer.render(data))
+
+        fast_fetch_ms, values = best_of(repeat, lambda: list(fast.values(queryset)))
+        fast_serialize_ms, fast_data = best_of(repeat, lambda: fast.many(values))
+        fast_render_ms, body = best_of(repeat, lambda: renderer.render(fast_data))
+
+        if body != expected:
+            raise CommandError("The fast path rendered different JSON.")
+
+        self.stdout.write(f"{'':<12} {'fetch ms':>10} {'serialize ms':>13} {'render ms':>10} {'total ms':>10}")
+        for label, timings in (
+            ("serializer", (fetch_ms, serialize_ms, render_ms)),
+            ("fast path", (fast_fetch_ms, fast_serialize_ms, fast_render_ms)),
+        ):
+            self.stdout.write(
+                f"{label:<12} {timings[0]:>10.1f} {timings[1]:>13.1f} {timings[2]:>10.1f} {sum(timings):>10.1f}"
+            )
+        total = fetch_ms + serialize_ms
+        fast_total = fast_fetch_ms + fast_serialize_ms
+        self.stdout.write(
+            f"Identical JSON ({len(body)} bytes). Fetch + serialize: {total / fast_total:.1f}x faster, "
+            f"serialize alone: {serialize_ms / fast_serialize_ms:.1f}x."
+        )
@@ -0,0 +1,56 @@
+# api/signals.py
+"""
+Drops cached token authentications (api/authentication.py) when a token or
+its user changes, including the user's groups and permissions. Connected in ApiConfig.ready().
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_tokens
+
+
+def invalidate_after_commit(token_keys):
+    token_keys = list(token_keys)
+    invalidate_tokens(token_keys)
+    # Again after commit: a request may have cached the old row in between.
+    transaction.on_commit(lambda: invalidate_tokens(token_keys))
+
+
+def invalidate_user_tokens(user_pks):
+    invalidate_after_commit(Token.objects.filter(user_id__in=user_pks).values_list("key", flat=True))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, raw=False, **kwargs):
+    # Created tokens too: the key may be cached as invalid.
+    if not raw:
+        invalidate_after_commit([instance.key])
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Cached tokens carry a copy of the user; last_login updates don't matter.
+    # Deleting a user deletes its token, which token_changed handles.
+    if raw or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    invalidate_user_tokens([instance.pk])
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+@receiver(m2m_changed, sender=get_user_model().user_permissions.through)
+def user_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.groups / user.user_permissions (or the reverse side) changed."""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_user_tokens([instance.pk])
+    elif pk_set:
+        invalidate_user_tokens(pk_set)
+    else:
+        # group.user_set.clear(): the users it had are no longer known.
+        invalidate_after_commit(Token.objects.values_list("key", flat=True))
+
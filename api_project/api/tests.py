@@ -1,3 +1,298 @@
-from django.test import TestCase
+import json
+from datetime import date
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase
+from . import throttling
+from .authentication import (
+    CachedTokenAuthentication, cache_key, local_cache, token_auth_metrics, token_auth_stats,
+)
+from .models import Book
+from .throttling import get_store, rate_limit_metrics
+from .views import BookList, BookViewSet
+
+BULK_URL = "/api/books_all/bulk/"
+
+
+class BookBulkWriteTests(APITestCase):
+    def setUp(self):
+        get_store().clear()  # a fresh bulk-write allowance; user pks are reused between tests
+        self.user = User.objects.create_user(username="ingest", password="pass12345")
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_reports_per_item_errors(self):
+        payload = [
+            {"title": "Dune", "author": "Frank Herbert", "pages": 412},
+            {"author": "No Title"},
+            {"title": "Emma", "author": "Jane Austen", "isbn": "x" * 20},
+            {"title": "Hyperion", "author": "Dan Simmons"},
+        ]
+        response = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([b["title"] for b in response.data["created"]], ["Dune", "Hyperion"])
+        self.assertTrue(all(b["id"] for b in response.data["created"]))
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2])
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_bulk_create_in_batches(self):
+        payload = [{"title": f"Book {i}", "author": "A"} for i in range(1203)]
+        response = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Book.objects.count(), 1203)
+
+    def test_bulk_update(self):
+        books = Book.objects.bulk_create([Book(title=f"T{i}", author="A") for i in range(3)])
+        payload = [
+            {"id": books[0].pk, "title": "New title"},
+            {"id": books[1].pk, "pages": 99},
+            {"id": 999999, "title": "Missing"},
+            {"title": "No id"},
+        ]
+        response = self.client.patch(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(len(response.data["updated"]), 2)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 3])
+        books[0].refresh_from_db()
+        books[1].refresh_from_db()
+        self.assertEqual(books[0].title, "New title")
+        self.assertEqual(books[1].pages, 99)
+        self.assertEqual(books[1].title, "T1")
+
+    def test_bulk_delete(self):
+        books = Book.objects.bulk_create([Book(title=f"T{i}", author="A") for i in range(3)])
+        response = self.client.delete(BULK_URL, [books[0].pk, books[2].pk, 424242], format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(sorted(response.data["deleted"]), sorted([books[0].pk, books[2].pk]))
+        self.assertEqual(list(Book.objects.values_list("pk", flat=True)), [books[1].pk])
+
+    def test_rejects_non_list_and_anonymous(self):
+        response = self.client.post(BULK_URL, {"title": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(None)
+        response = self.client.post(BULK_URL, [{"title": "x", "author": "y"}], format="json")
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+
+class BookExportTests(APITestCase):
+    def setUp(self):
+        Book.objects.create(title="Dune", author="Frank Herbert", published_date=date(1965, 8, 1))
+        Book.objects.create(title="Emma", author="Jane Austen")
+
+    def test_ndjson_export(self):
+        response = self.client.get("/api/books/?export=ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([r["title"] for r in rows], ["Dune", "Emma"])
+        self.assertEqual(rows[0]["published_date"], "1965-08-01")
+        self.assertIsNone(rows[1]["published_date"])
+
+    def test_csv_export(self):
+        response = self.client.get("/api/books/?export=csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,title,author,published_date,isbn,pages")
+        self.assertEqual(len(lines), 3)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        token_auth_metrics.reset()
+        self.user = User.objects.create_user(username="mobile", password="pass12345")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_repeat_authentication_skips_the_database(self):
+        with self.assertNumQueries(1):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            again, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user, again), (self.user, self.user))
+        self.assertIsNot(user, again)  # each request gets its own copy
+        self.assertEqual(token_auth_stats()["tiers"], {"database": 1, "local": 1})
+
+    @override_settings(TOKEN_AUTH_LOCAL_TIMEOUT=0)
+    def test_shared_tier_without_local_tier(self):
+        self.auth.authenticate_credentials(self.token.key)
+        # Only the user's identity is shared, never the row (password hash included).
+        self.assertEqual(cache.get(cache_key(self.token.key)), (self.user.pk, True))
+        with self.assertNumQueries(1):  # the user, by primary key
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user, token.key, token.user), (self.user, self.token.key, user))
+        stats = token_auth_stats()
+        self.assertEqual((stats["tiers"], stats["hit_ratio"]), ({"database": 1, "shared": 1}, 0.5))
+
+    @override_settings(TOKEN_AUTH_LOCAL_TIMEOUT=0)
+    def test_shared_tier_rechecks_the_user(self):
+        self.auth.authenticate_credentials(self.token.key)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)  # no signal
+        for queries in (1, 0):  # then the refusal is what is cached
+            with self.assertNumQueries(queries), self.assertRaisesMessage(AuthenticationFailed, "inactive"):
+                self.auth.authenticate_credentials(self.token.key)
+
+    def test_permission_changes_invalidate(self):
+        self.auth.authenticate_credentials(self.token.key)
+        group = Group.objects.create(name="editors")
+        group.permissions.add(Permission.objects.get(codename="add_book"))
+        self.user.groups.add(group)
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertTrue(user.has_perm("api.add_book"))
+        group.user_set.clear()
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertFalse(user.has_perm("api.add_book"))
+        self.assertEqual(token_auth_stats()["tiers"], {"database": 3})
+
+    def test_invalid_tokens_are_cached_until_created(self):
+        for queries in (1, 0):
+            with self.assertNumQueries(queries), self.assertRaisesMessage(AuthenticationFailed, "Invalid token."):
+                self.auth.authenticate_credentials("f" * 40)
+        Token.objects.create(key="f" * 40, user=User.objects.create_user("late"))
+        self.assertEqual(self.auth.authenticate_credentials("f" * 40)[0].username, "late")
+
+    def test_revocation_is_immediate(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaisesMessage(AuthenticationFailed, "User inactive or deleted."):
+            self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = True
+        self.user.save()
+        key = self.token.key
+        self.auth.authenticate_credentials(key)
+        self.token.delete()
+        with self.assertRaisesMessage(AuthenticationFailed, "Invalid token."):
+            self.auth.authenticate_credentials(key)
+
+    @override_settings(PERF_METRICS_TOKEN="scrape")
+    def test_api_request_and_metrics(self):
+        headers = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        payload = {"title": "Dune", "author": "Frank Herbert"}
+        response = self.client.post("/api/books_all/", payload, format="json", **headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape")
+        self.assertContains(response, 'api_token_auth_lookups_total{tier="database",result="ok"} 1')
+
+
+class BookFastPathTests(APITestCase):
+    def setUp(self):
+        Book.objects.create(title="Dune", author="Frank Herbert", published_date=date(1965, 8, 1), pages=412)
+        Book.objects.create(title="Solaris", author="Stanisław Lem", isbn="9780156027601")
+
+    def test_lists_are_byte_identical_to_the_serializer(self):
+        for view, url in ((BookList, "/api/books/"), (BookViewSet, "/api/books_all/")):
+            with mock.patch.object(Book, "from_db", side_effect=AssertionError):
+                fast = self.client.get(url, HTTP_ACCEPT="application/json").content
+            with mock.patch.object(view, "fast_path", False):
+                self.assertEqual(self.client.get(url, HTTP_ACCEPT="application/json").content, fast)
+
+
+WRITE_LIMITS = {
+    "book-writes": {"rate": "60/min", "burst": 2, "key": "token"},
+    "book-bulk-writes": {"rate": "1/min", "key": "token"},
+}
+
+
+@override_settings(RATE_LIMITS=WRITE_LIMITS)
+class RateLimitTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        get_store().clear()
+        rate_limit_metrics.reset()
+        self.tokens = [Token.objects.create(user=User.objects.create_user(name)).key for name in ("a", "b")]
+
+    def post(self, token, url="/api/books_all/", data=None):
+        data = data or {"title": "Dune", "author": "Frank Herbert"}
+        return self.client.post(url, data, format="json", HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_writes_past_the_burst_get_429_with_retry_after(self):
+        self.assertEqual([self.post(self.tokens[0]).status_code for _ in range(3)], [201, 201, 429])
+        response = self.post(self.tokens[0])
+        self.assertEqual(response["Retry-After"], "1")  # one token refills in a second
+        self.assertEqual(self.post(self.tokens[1]).status_code, 201)  # another token, another bucket
+        self.assertEqual(rate_limit_metrics.stats("book-writes"), {"allowed": 3, "throttled": 2})
+
+    def test_reads_are_not_limited(self):
+        for _ in range(5):
+            response = self.client.get("/api/books_all/", HTTP_AUTHORIZATION=f"Token {self.tokens[0]}")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(rate_limit_metrics.stats("book-writes"), {"allowed": 0, "throttled": 0})
+
+    def test_bulk_endpoint_has_its_own_scope(self):
+        book = Book.objects.create(title="Emma", author="Jane Austen")
+        auth = {"format": "json", "HTTP_AUTHORIZATION": f"Token {self.tokens[0]}"}
+        requests = [
+            (self.client.post, [{"title": "Persuasion", "author": "Jane Austen"}], 201),
+            (self.client.patch, [{"id": book.pk, "pages": 474}], 200),
+            (self.client.delete, [book.pk], 200),
+        ]
+        for send, payload, expected in requests:
+            get_store().clear()
+            self.assertEqual(send(BULK_URL, payload, **auth).status_code, expected)
+            for method in (self.client.post, self.client.patch, self.client.delete):
+                response = method(BULK_URL, payload, **auth)
+                self.assertEqual((response.status_code, response["Retry-After"]), (429, "60"))
+            self.assertEqual(self.post(self.tokens[0]).status_code, 201)
+        self.assertEqual(rate_limit_metrics.stats("book-bulk-writes"), {"allowed": 3, "throttled": 9})
+
+    @override_settings(RATE_LIMIT_STORE="api.throttling.CacheStore")
+    def test_cache_store_shares_buckets(self):
+        self.assertEqual([self.post(self.tokens[0]).status_code for _ in range(3)], [201, 201, 429])
+        throttling._stores.clear()  # as if another process answered
+        self.assertEqual(self.post(self.tokens[0]).status_code, 429)
+
+
+class RateLimitAlgorithmTests(SimpleTestCase):
+    def run_requests(self, algorithm, times):
+        state, waits = None, []
+        for now in times:
+            state, wait = algorithm(state, now)
+            waits.append(wait)
+        return waits
+
+    def test_token_bucket_refills_at_the_rate(self):
+        bucket = throttling.TokenBucket(*throttling.parse_rate("10/s"), burst=3)
+        waits = self.run_requests(bucket, [0, 0, 0, 0, 0.05, 0.1, 0.1])
+        self.assertEqual(waits[:4], [None, None, None, 0.1])
+        self.assertAlmostEqual(waits[4], 0.05)  # denied requests take no token
+        self.assertEqual(waits[5:], [None, 0.1])
+
+    def test_sliding_window_weights_the_previous_window(self):
+        window = throttling.SlidingWindow(4, 60)
+        waits = self.run_requests(window, [50, 55, 58, 59, 59, 75, 76, 90])
+        self.assertEqual(waits[:4], [None, None, None, None])
+        self.assertEqual(waits[4], 1 + 15)  # into the next window until 4 * weight + 1 <= 4
+        self.assertIsNone(waits[5])
+        self.assertAlmostEqual(waits[6], 14)  # until 4 * weight + 1 + 1 <= 4
+        self.assertIsNone(waits[7])
+
+    def test_local_store_is_bounded(self):
+        store = throttling.LocalStore(max_keys=64, shards=4)
+        bucket = throttling.TokenBucket(1, 60)
+        for i in range(1000):
+            store.update(f"user:{i}", bucket, bucket.ttl)
+        self.assertEqual(len(store), 64)
+        # The most recent keys are kept.
+        self.assertAlmostEqual(store.update("user:999", bucket, bucket.ttl), 60, places=2)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ImproperlyConfigured):
+            throttling.parse_rate("10 per minute")
+
+
+class IndexAdvisorTests(TestCase):
+    def test_project_has_no_missing_indexes(self):
+        out = StringIO()
+        call_command("index_advisor", "--check", stdout=out)
+        self.assertIn("No missing indexes.", out.getvalue())
@@ -3,19 +3,26 @@ from rest_framework.permissions import AllowAny
 from rest_framework import viewsets, permissions
 from .models import Book
 from .serializers import BookSerializer
+from .bulk import BulkWriteMixin
+from .export import StreamingExportMixin
+from .fastpath import FastPathListMixin
+from .throttling import RateLimitThrottle
 
 
-class BookList(generics.ListAPIView):
+class BookList(StreamingExportMixin, FastPathListMixin, generics.ListAPIView):
     """
     Read-only list endpoint kept for compatibility with the assignment.
-    GET /books/ -> list all books
+    GET /books/ -> list all books, serialized from .values() rows (see api/fastpath.py)
+    GET /books/?export=ndjson|csv -> stream all books row by row (see api/export.py)
     """
-    queryset = Book.objects.all()
+    queryset = Book.objects.all().order_by("id")
+    export_filename = "books"
     serializer_class = BookSerializer
     permission_classes = [AllowAny]
+    fast_path = True
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(BulkWriteMixin, FastPathListMixin, viewsets.ModelViewSet):
     """
     Full CRUD for Book model using DRF's ModelViewSet.
     Provides:
@@ -25,10 +32,19 @@ class BookViewSet(viewsets.ModelViewSet):
     - PUT    /books_all/<id>/   -> update
     - PATCH  /books_all/<id>/   -> partial update
     - DELETE /books_all/<id>/   -> destroy
+    - POST/PATCH/DELETE /books_all/bulk/ -> batched create/update/delete (see api/bulk.py)
+    The list is serialized from .values() rows (see api/fastpath.py).
+    Writes are rate limited per token (RATE_LIMITS["book-writes"], the bulk
+    endpoint RATE_LIMITS["book-bulk-writes"]; see api/throttling.py).
     """
     queryset = Book.objects.all().order_by("id")
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    throttle_classes = [RateLimitThrottle]
+    throttle_scope = "book-writes"
+    # DRF names the bulk route's actions after their handlers.
+    throttle_scopes = dict.fromkeys(["bulk", "bulk_update", "bulk_destroy"], "book-bulk-writes")
+    fast_path = True
 
 class BookAdminWriteViewSet(viewsets.ModelViewSet):
     """
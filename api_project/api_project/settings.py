@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from perf.sqlite import sqlite_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,11 +43,12 @@ INSTALLED_APPS = [
     "rest_framework",
     'rest_framework.authtoken', 
      "api",
+    "perf",
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -52,7 +56,19 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Token authentication cache (see api/authentication.py): an in-process LRU
+# in front of TOKEN_AUTH_CACHE_ALIAS, in front of the token/user query. No
+# CACHES are configured, so that alias is a per-process LocMemCache; point it
+# at Redis or Memcached to share lookups between workers.
+TOKEN_AUTH_CACHE_ALIAS = 'default'
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+TOKEN_AUTH_LOCAL_SIZE = 10000
+TOKEN_AUTH_LOCAL_TIMEOUT = 5
+TOKEN_AUTH_NEGATIVE_TIMEOUT = 30
+
 MIDDLEWARE = [
+    'perf.middleware.PerfMiddleware',
+    'perf.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,13 +101,28 @@ WSGI_APPLICATION = 'api_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite with a busy timeout, immediate transactions and persistent,
+# health-checked connections (see perf.sqlite). On a server, run
+# `manage.py enable_sqlite_wal` once to switch the database file to WAL;
+# synchronous is then relaxed from FULL to NORMAL.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_profile(BASE_DIR / 'db.sqlite3'),
 }
 
+# Read replicas (see perf.replicas): reads go to the aliases listed in
+# REPLICA_DATABASES, writes and a client's reads for REPLICA_STICKY_SECONDS
+# after a write go to 'default'. SQLITE_REPLICAS="/path/a.sqlite3,/path/b.sqlite3"
+# adds local SQLite copies of the database as stand-in replicas.
+REPLICA_DATABASES = []
+for index, path in enumerate(filter(None, os.environ.get('SQLITE_REPLICAS', '').split(','))):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': path, 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(alias)
+REPLICA_STICKY_SECONDS = 10
+REPLICA_HEALTH_INTERVAL = 5
+REPLICA_RETRY_AFTER = 30
+DATABASE_ROUTERS = ['perf.replicas.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,3 +164,45 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Per-request performance metrics (see django-perf/ at the repository root).
+# PerfMiddleware records query count, DB time, duplicate queries and render
+# time per view; /metrics/ serves them in Prometheus format to staff users and
+# to requests with "Authorization: Bearer $PERF_METRICS_TOKEN". The test
+# runner switches it off; perf's own tests live in django-perf.
+PERF_ENABLED = True
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN')
+TEST_RUNNER = 'perf.testing.TestRunner'
+PERF_METRICS_REGISTRIES = ['api.authentication.token_auth_metrics', 'api.throttling.rate_limit_metrics']
+
+# Rate limits of the write endpoints (see api/throttling.py): a token bucket
+# per API token refilling `rate` and holding `burst` requests. The buckets
+# live in this process (RATE_LIMIT_STORE); api.throttling.CacheStore shares
+# them through the default cache between processes.
+RATE_LIMITS = {
+    'book-writes': {'rate': '60/min', 'burst': 20, 'key': 'token'},
+    'book-bulk-writes': {'rate': '10/min', 'burst': 3, 'key': 'token'},
+}
+RATE_LIMIT_STORE = 'api.throttling.LocalStore'
+RATE_LIMIT_LOCAL_MAX_KEYS = 100_000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'perf_file': {
+            'class': 'perf.logs.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'perf.requests': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -23,4 +23,5 @@ urlpatterns = [
     path('api-token-auth/', obtain_auth_token, name='api_token_auth'),
     path('api-auth/', include('rest_framework.urls')),
     path('api/', include('api.urls')),
+    path('', include('perf.urls')),
 ]
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from perf.sqlite import sqlite_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,10 +38,12 @@ INSTALLED_APPS = [ 'django.contrib.admin', 'django.contrib.auth',
     'django.contrib.messages', 'django.contrib.staticfiles', 
     'bookshelf',
     'relationship_app',
+    'perf',
 
     ]
 
 MIDDLEWARE = [
+    'perf.middleware.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,12 +76,28 @@ WSGI_APPLICATION = 'LibraryProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite with a busy timeout, immediate transactions and persistent,
+# health-checked connections (see perf.sqlite). On a server, run
+# `manage.py enable_sqlite_wal` once to switch the database file to WAL;
+# synchronous is then relaxed from FULL to NORMAL.
 DATABASES = {
+    'default': sqlite_profile(BASE_DIR / 'db.sqlite3'),
+}
+
+
+# relationship_app caches each user's roles (see relationship_app/roles.py).
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-project',
     }
 }
+ROLE_CACHE_ALIAS = 'default'
+ROLE_CACHE_TIMEOUT = 300
+
+# Library manifests shown on the library detail page (relationship_app/manifest.py).
+LIBRARY_CACHE_ALIAS = 'default'
+LIBRARY_MANIFEST_TIMEOUT = 600
 
 
 # Password validation
@@ -121,3 +142,33 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = '/books/'
+
+# Per-request performance metrics (see django-perf/ at the repository root).
+# PerfMiddleware records query count, DB time, duplicate queries and render
+# time per view; /metrics/ serves them in Prometheus format to staff users and
+# to requests with "Authorization: Bearer $PERF_METRICS_TOKEN". The test
+# runner switches it off; perf's own tests live in django-perf.
+PERF_ENABLED = True
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN')
+TEST_RUNNER = 'perf.testing.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'perf_file': {
+            'class': 'perf.logs.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'perf.requests': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,11 @@
+# relationship_app/counters.py
+"""
+Counter caches for relationship_app (see perf.counters). Imported in
+RelationshipAppConfig.ready().
+"""
+from perf.counters import CounterCache
+
+from .models import Author, Library
+
+author_books = CounterCache(Author.books, 'books_count')
+library_books = CounterCache(Library.books, 'books_count')
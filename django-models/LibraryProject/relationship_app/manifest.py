@@ -0,0 +1,50 @@
+# relationship_app/manifest.py
+"""
+Per-library summary for LibraryDetailView, computed in one aggregate query and
+cached for LIBRARY_MANIFEST_TIMEOUT seconds; signals.py drops it on changes.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F
+
+from .models import Library
+
+
+def get_cache():
+    return caches[getattr(settings, "LIBRARY_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "LIBRARY_MANIFEST_TIMEOUT", 600)
+
+
+def manifest_cache_key(library_id):
+    return f"relationship_app:library-manifest:{library_id}"
+
+
+def load_manifest(library_id):
+    rows = (
+        Library.objects
+        .filter(pk=library_id)
+        .values("name", librarian_name=F("librarian__name"))
+        .annotate(
+            book_count=Count("books"),
+            author_count=Count("books__author", distinct=True),
+        )
+    )
+    return next(iter(rows), None)
+
+
+def get_manifest(library_id):
+    cache = get_cache()
+    key = manifest_cache_key(library_id)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = load_manifest(library_id)
+        if manifest is not None:
+            cache.set(key, manifest, get_timeout())
+    return manifest
+
+
+def invalidate_manifests(library_ids):
+    get_cache().delete_many([manifest_cache_key(pk) for pk in library_ids])
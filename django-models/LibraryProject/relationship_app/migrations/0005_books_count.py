@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:08
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_books_count(apps, schema_editor):
+    Author = apps.get_model('relationship_app', 'Author')
+    Book = apps.get_model('relationship_app', 'Book')
+    Library = apps.get_model('relationship_app', 'Library')
+    LibraryBooks = Library.books.through
+
+    def count_of(rows, parent):
+        counted = (
+            rows.filter(**{parent: OuterRef('pk')})
+            .order_by().values(parent).annotate(n=Count('*')).values('n')
+        )
+        return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+    Author.objects.update(books_count=count_of(Book.objects, 'author'))
+    Library.objects.update(books_count=count_of(LibraryBooks.objects, 'library'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0004_backfill_user_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='books_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='books_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_books_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['books_count', 'id'], name='rel_author_books_count_idx'),
+        ),
+    ]
@@ -6,6 +6,13 @@ from django.dispatch import receiver
 
 class Author(models.Model):
     name = models.CharField(max_length=255)
+    # Denormalized counters, kept current by relationship_app/counters.py
+    books_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['books_count', 'id'], name='rel_author_books_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -35,6 +42,7 @@ class Book(models.Model):
 class Library(models.Model):
     name = models.CharField(max_length=255)
     books = models.ManyToManyField(Book, related_name='libraries')
+    books_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -62,14 +70,57 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} ({self.role})"
 
+    # Fields compared by changed_fields(); the user link never changes.
+    tracked_fields = ('role',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_saved_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_saved_values()
+
+    def _remember_saved_values(self):
+        self._saved_values = {
+            name: getattr(self, name)
+            for name in self.tracked_fields if name in self.__dict__
+        }
+
+    def changed_fields(self):
+        """Tracked fields that differ from what was last loaded or saved."""
+        saved = getattr(self, '_saved_values', None)
+        if saved is None:
+            return list(self.tracked_fields)
+        return [
+            name for name in self.tracked_fields
+            if name in self.__dict__ and getattr(self, name) != saved.get(name)
+        ]
+
+    def save_if_changed(self):
+        """Write only the changed fields; no query at all if nothing changed."""
+        changed = self.changed_fields()
+        if changed:
+            self.save(update_fields=changed)
+        return bool(changed)
+
 
 # ---------- Signals: Auto-create UserProfile ----------
+# bulk_create_users() in profiles.py provisions profiles in batches instead;
+# bulk_create sends no post_save, so these handlers never run for it.
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
         UserProfile.objects.create(user=instance)
 
+
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    UserProfile.objects.get_or_create(user=instance)
-    instance.userprofile.save()
+def save_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Only a profile already loaded on this user object can carry unsaved
+    # edits, and it is written only if its fields changed. Plain user saves
+    # such as the last_login update on login touch no profile row.
+    if created or raw or not sender.userprofile.is_cached(instance):
+        return
+    instance.userprofile.save_if_changed()
@@ -0,0 +1,10 @@
+# relationship_app/paginators.py
+from django.core.paginator import Paginator
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator that takes the total from the caller instead of running COUNT(*)."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__['count'] = count  # pre-fills the cached_property
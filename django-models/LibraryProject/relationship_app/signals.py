@@ -0,0 +1,109 @@
+# relationship_app/signals.py
+"""
+Invalidates cached user roles (relationship_app/roles.py) when group
+membership changes, and cached library manifests (manifest.py) when a
+library's books change. Connected in RelationshipAppConfig.ready().
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .manifest import invalidate_manifests
+from .models import Book, Librarian, Library
+from .roles import invalidate_all_roles, invalidate_user_roles
+
+CHANGED = ("post_add", "post_remove", "post_clear")
+
+
+def drop_user_roles(user_ids):
+    user_ids = list(user_ids)
+    invalidate_user_roles(user_ids)
+    # Again after commit: a request may have cached the old roles in between.
+    transaction.on_commit(lambda: invalidate_user_roles(user_ids))
+
+
+def drop_all_roles():
+    transaction.on_commit(invalidate_all_roles)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.groups / group.user_set changed."""
+    if action not in CHANGED:
+        return
+    if not reverse:
+        drop_user_roles([instance.pk])
+        instance.__dict__.pop("_role_cache", None)
+    elif pk_set:
+        drop_user_roles(pk_set)
+    else:
+        # group.user_set.clear(): the affected users are no longer known.
+        drop_all_roles()
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    # A rename can turn a group into (or out of) a role group.
+    if not created:
+        drop_all_roles()
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, **kwargs):
+    drop_all_roles()
+
+
+# ---------------- Library manifests ----------------
+
+def drop_manifests(library_ids):
+    library_ids = list(library_ids)
+    invalidate_manifests(library_ids)
+    # Again after commit: a request may have cached the old manifest in between.
+    transaction.on_commit(lambda: invalidate_manifests(library_ids))
+
+
+@receiver(m2m_changed, sender=Library.books.through)
+def library_books_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """library.books / book.libraries changed."""
+    if not reverse:
+        if action in CHANGED:
+            drop_manifests([instance.pk])
+    elif action == "pre_clear":
+        # book.libraries.clear(): remember the libraries before they are gone.
+        instance._manifest_library_ids = list(instance.libraries.values_list("pk", flat=True))
+    elif action == "post_clear":
+        drop_manifests(instance.__dict__.pop("_manifest_library_ids", []))
+    elif action in CHANGED:
+        drop_manifests(pk_set)
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, created, update_fields=None, **kwargs):
+    # A new book is in no library yet; otherwise only a new author changes the counts.
+    if not created and (update_fields is None or "author" in update_fields):
+        drop_manifests(instance.libraries.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Book)
+def book_deleting(sender, instance, **kwargs):
+    # The m2m rows are deleted by the cascade, which sends no m2m_changed.
+    instance._manifest_library_ids = list(instance.libraries.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    drop_manifests(instance.__dict__.pop("_manifest_library_ids", []))
+
+
+@receiver(post_save, sender=Library)
+@receiver(post_delete, sender=Library)
+def library_changed(sender, instance, **kwargs):
+    drop_manifests([instance.pk])
+
+
+@receiver(post_save, sender=Librarian)
+@receiver(post_delete, sender=Librarian)
+def librarian_changed(sender, instance, **kwargs):
+    drop_manifests([instance.library_id])
@@ -5,7 +5,10 @@ from django.views.generic.detail import DetailView
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.contrib.auth.decorators import permission_required
 from django.http import HttpResponse
+from .manifest import get_manifest
 from .models import Book, Library
+from .paginators import KnownCountPaginator
+from .roles import has_role
 
 
 # ---------------- Existing Views ----------------
@@ -18,14 +21,34 @@ def list_books(request):
 # ---------------- Library Detail View ----------------
 
 class LibraryDetailView(DetailView):
+    """
+    One page of a library's books, each with its author, in a single joined
+    query. The book/author counts come from the cached library manifest (see
+    manifest.py), which also serves as the paginator count, so large
+    libraries are never counted or loaded in full.
+    """
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
+    paginate_by = 50
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add all books belonging to this library
-        context['books'] = Book.objects.filter(libraries=self.object)
+        manifest = get_manifest(self.object.pk)
+        books = (
+            self.object.books
+            .select_related('author')
+            .order_by('title', 'id')
+        )
+        paginator = KnownCountPaginator(books, self.paginate_by, count=manifest['book_count'])
+        page = paginator.get_page(self.request.GET.get('page'))
+        context.update({
+            'manifest': manifest,
+            'page_obj': page,
+            'paginator': paginator,
+            'is_paginated': page.has_other_pages(),
+            'books': page.object_list,
+        })
         return context
 
 
@@ -45,14 +68,17 @@ def register(request):
 
 # ---------------- Role-based Views ----------------
 
+# Roles come from role-named groups, cached per user (see roles.py), so these
+# checks normally make no queries. The profile's role is not a grant.
+
 def is_admin(user):
     return user.is_superuser
 
 def is_librarian(user):
-    return user.groups.filter(name='Librarian').exists()
+    return has_role(user, 'Librarian')
 
 def is_member(user):
-    return user.groups.filter(name='Member').exists()
+    return has_role(user, 'Member')
 
 
 @user_passes_test(is_admin)
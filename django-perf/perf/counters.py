@@ -0,0 +1,178 @@
+# perf/counters.py
+"""
+Counter caches: integer columns on a parent kept equal to the size of one of
+its relations by signal handlers, so reads and ORDER BY skip the COUNT(*).
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+
+counters = []
+UNKNOWN = object()
+
+
+class CounterCache:
+    """
+    `CounterCache(Post.comments, "comments_count")`: a reverse foreign key or
+    either side of a many-to-many. bulk_create(), QuerySet.update() and raw SQL
+    send no signals; call refresh(pks) after them or run reconcile_counters.
+    """
+
+    def __init__(self, descriptor, field_name):
+        rel = descriptor.rel
+        self.field_name = field_name
+        self.many_to_many = rel.many_to_many
+        if self.many_to_many:
+            through = rel.through
+            m2m_field = descriptor.field
+            # `descriptor.reverse` is True for the side without the field.
+            if descriptor.reverse:
+                self.model, self.child_model = m2m_field.related_model, m2m_field.model
+                parent_column, child_column = m2m_field.m2m_reverse_field_name(), m2m_field.m2m_field_name()
+            else:
+                self.model, self.child_model = m2m_field.model, m2m_field.related_model
+                parent_column, child_column = m2m_field.m2m_field_name(), m2m_field.m2m_reverse_field_name()
+            self.rows = through._default_manager
+            self.parent_lookup = parent_column
+            self.child_lookup = child_column
+            self.reverse = descriptor.reverse
+        else:
+            fk = rel.field
+            self.model, self.child_model = fk.related_model, fk.model
+            self.rows = fk.model._default_manager
+            self.parent_lookup = fk.name
+            self.parent_attname = fk.attname
+        self.label = f"{self.model._meta.label}.{field_name}"
+        counters.append(self)
+        self.connect()
+
+    def __repr__(self):
+        return f"<CounterCache {self.label}>"
+
+    # ---- reading and recomputing ----
+
+    def actual_count(self):
+        """Correlated subquery computing the true count for OuterRef('pk')."""
+        counted = (
+            self.rows.filter(**{self.parent_lookup: OuterRef("pk")})
+            .order_by()
+            .values(self.parent_lookup)
+            .annotate(n=Count("*"))
+            .values("n")
+        )
+        return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+    def refresh(self, pks=None):
+        """Recompute the counter for the given parents (all parents if None)."""
+        queryset = self.model._default_manager.all()
+        if pks is not None:
+            pks = {pk for pk in pks if pk is not None}
+            if not pks:
+                return 0
+            queryset = queryset.filter(pk__in=pks)
+        return queryset.update(**{self.field_name: self.actual_count()})
+
+    def drifted(self):
+        """Parents whose stored count differs from the real one."""
+        return (
+            self.model._default_manager
+            .annotate(_actual_count=self.actual_count())
+            .exclude(**{self.field_name: F("_actual_count")})
+        )
+
+    def add(self, pks, delta):
+        pks = {pk for pk in pks if pk is not None}
+        if pks and delta:
+            self.model._default_manager.filter(pk__in=pks).update(
+                **{self.field_name: F(self.field_name) + delta}
+            )
+
+    # ---- signal handlers ----
+
+    def connect(self):
+        uid = f"counter-cache:{self.label}"
+        if self.many_to_many:
+            m2m_changed.connect(self.relation_changed, sender=self.rows.model, weak=False, dispatch_uid=uid)
+            pre_delete.connect(self.child_deleting, sender=self.child_model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self.child_deleted, sender=self.child_model, weak=False, dispatch_uid=uid)
+        else:
+            post_init.connect(self.child_loaded, sender=self.child_model, weak=False, dispatch_uid=uid)
+            pre_save.connect(self.child_saving, sender=self.child_model, weak=False, dispatch_uid=uid)
+            post_save.connect(self.child_saved, sender=self.child_model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self.child_deleted, sender=self.child_model, weak=False, dispatch_uid=uid)
+
+    def _stash_key(self):
+        return f"_counter_cache_{self.label}"
+
+    def _loaded_key(self):
+        return f"_counter_cache_loaded_{self.label}"
+
+    def child_loaded(self, sender, instance, **kwargs):
+        # The parent as loaded (or constructed), so a save spots a move
+        # without reading the row again. Missing if the FK was deferred.
+        instance.__dict__[self._loaded_key()] = instance.__dict__.get(self.parent_attname, UNKNOWN)
+
+    def child_saving(self, sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or instance._state.adding:
+            return
+        fk_names = {self.parent_lookup, self.parent_attname}
+        if update_fields is not None and not fk_names & set(update_fields):
+            return
+        previous = instance.__dict__.get(self._loaded_key(), UNKNOWN)
+        if previous is UNKNOWN:
+            previous = (
+                sender._default_manager.filter(pk=instance.pk)
+                .values_list(self.parent_attname, flat=True)
+                .first()
+            )
+        instance.__dict__[self._stash_key()] = previous
+
+    def child_saved(self, sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        current = getattr(instance, self.parent_attname)
+        if created:
+            self.add([current], 1)
+        else:
+            previous = instance.__dict__.pop(self._stash_key(), UNKNOWN)
+            if previous is UNKNOWN:
+                return  # the foreign key was not written
+            if previous != current:
+                self.add([previous], -1)
+                self.add([current], 1)
+        instance.__dict__[self._loaded_key()] = current
+
+    def child_deleting(self, sender, instance, **kwargs):
+        # The m2m rows go with the cascade, which sends no m2m_changed.
+        instance.__dict__[self._stash_key()] = list(
+            self.rows.filter(**{self.child_lookup: instance.pk})
+            .values_list(self.parent_lookup, flat=True)
+        )
+
+    def child_deleted(self, sender, instance, **kwargs):
+        if self.many_to_many:
+            self.refresh(instance.__dict__.pop(self._stash_key(), []))
+        else:
+            self.add([getattr(instance, self.parent_attname)], -1)
+
+    def relation_changed(self, sender, instance, action, reverse, pk_set, **kwargs):
+        instance_is_parent = reverse == self.reverse
+        if action == "post_add":
+            # pk_set only holds the rows actually inserted.
+            if instance_is_parent:
+                self.add([instance.pk], len(pk_set))
+            else:
+                self.add(pk_set, 1)
+        elif action == "post_remove":
+            # pk_set holds what was asked for, which may include absent rows.
+            self.refresh([instance.pk] if instance_is_parent else pk_set)
+        elif action == "pre_clear" and not instance_is_parent:
+            instance.__dict__[self._stash_key()] = list(
+                self.rows.filter(**{self.child_lookup: instance.pk})
+                .values_list(self.parent_lookup, flat=True)
+            )
+        elif action == "post_clear":
+            if instance_is_parent:
+                self.model._default_manager.filter(pk=instance.pk).update(**{self.field_name: 0})
+            else:
+                self.refresh(instance.__dict__.pop(self._stash_key(), []))
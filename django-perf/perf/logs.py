@@ -0,0 +1,72 @@
+# perf/logs.py
+import atexit
+import json
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger("perf.requests")
+
+FIELDS = (
+    "view", "method", "path", "status", "duration_ms", "queries",
+    "db_ms", "duplicate_queries", "render_ms",
+)
+
+
+class RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that creates the log directory if it is missing. With
+    delay=True neither is created until the first record is written.
+    """
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class RequestLog:
+    """
+    Write-behind request log. The middleware only appends a tuple to a deque;
+    a daemon thread formats the entries as JSON lines and hands them to the
+    "perf.requests" logger every `interval` seconds, so file I/O and
+    formatting stay off the request path.
+    """
+
+    def __init__(self, interval=1.0, maxlen=100_000):
+        self.interval = interval
+        self.entries = deque(maxlen=maxlen)  # oldest entries dropped if the writer falls behind
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def append(self, entry):
+        self.entries.append(entry)
+        if self.thread is None:
+            self._start()
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="perf-request-log", daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        entries = self.entries
+        while entries:
+            try:
+                entry = entries.popleft()
+            except IndexError:
+                break
+            logger.info(json.dumps(dict(zip(FIELDS, entry))))
+
+
+request_log = RequestLog()
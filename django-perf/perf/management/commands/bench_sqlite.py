@@ -0,0 +1,126 @@
+# perf/management/commands/bench_sqlite.py
+"""
+Concurrent SQLite reads and writes with Django's defaults versus sqlite_profile() on WAL.
+
+    python manage.py bench_sqlite --processes 8 --write-ratio 0.2 --duration 5
+"""
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from perf.sqlite import SYNCHRONOUS_BY_JOURNAL, apply_synchronous, sqlite_profile
+
+
+def default_profile(name):
+    return {"ENGINE": "django.db.backends.sqlite3", "NAME": name, "CONN_MAX_AGE": 0, "OPTIONS": {}}
+
+
+SCENARIOS = {"default": (default_profile, False), "profile": (sqlite_profile, True)}
+
+
+def connect(database):
+    options = database["OPTIONS"]
+    conn = sqlite3.connect(database["NAME"], timeout=options.get("timeout", 5), isolation_level=None)
+    for command in options.get("init_command", "").split(";"):
+        if command.strip():
+            conn.execute(command)
+    if database.get(SYNCHRONOUS_BY_JOURNAL):
+        apply_synchronous(conn.cursor())
+    return conn
+
+
+def seed(database, rows, wal):
+    conn = connect(database)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+        apply_synchronous(conn.cursor())
+    conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL, hits INTEGER NOT NULL)")
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO item (id, name, hits) VALUES (?, ?, 0)",
+        ((i, f"item {i:08d}") for i in range(1, rows + 1)),
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def worker(args):
+    database, rows, write_ratio, deadline, seed_value = args
+    rng = random.Random(seed_value)
+    persistent = database["CONN_MAX_AGE"] != 0
+    begin = f"BEGIN {database['OPTIONS'].get('transaction_mode', '')}".strip()
+    conn = connect(database) if persistent else None
+    reads = writes = errors = 0
+    latencies = []
+    while time.time() < deadline:
+        started = time.perf_counter()
+        write = rng.random() < write_ratio
+        row = rng.randint(1, rows)
+        try:
+            if not persistent:
+                conn = connect(database)
+            if write:
+                conn.execute(begin)
+                try:
+                    hits = conn.execute("SELECT hits FROM item WHERE id = ?", (row,)).fetchone()[0]
+                    conn.execute("UPDATE item SET hits = ? WHERE id = ?", (hits + 1, row))
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+                writes += 1
+            else:
+                conn.execute("SELECT id, name, hits FROM item WHERE id >= ? ORDER BY id LIMIT 20", (row,)).fetchall()
+                reads += 1
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            errors += 1
+        finally:
+            if not persistent and conn is not None:
+                conn.close()
+                conn = None
+    if conn is not None:
+        conn.close()
+    return reads, writes, errors, latencies
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent SQLite read/write throughput with and without perf.sqlite's profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--rows", type=int, default=100_000)
+
+    def handle(self, *args, processes, write_ratio, duration, rows, **options):
+        self.stdout.write(
+            f"{'scenario':<9} {'reads/s':>9} {'writes/s':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}"
+        )
+        with tempfile.TemporaryDirectory(prefix="bench-sqlite-") as directory:
+            for label, (profile, wal) in SCENARIOS.items():
+                database = profile(os.path.join(directory, f"{label}.sqlite3"))
+                seed(database, rows, wal)
+                deadline = time.time() + duration
+                jobs = [(database, rows, write_ratio, deadline, index) for index in range(processes)]
+                with multiprocessing.Pool(processes) as pool:
+                    results = pool.map(worker, jobs)
+                reads = sum(result[0] for result in results)
+                writes = sum(result[1] for result in results)
+                errors = sum(result[2] for result in results)
+                latencies = sorted(latency for result in results for latency in result[3])
+
+                def percentile(fraction):
+                    if not latencies:
+                        return float("nan")
+                    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+                self.stdout.write(
+                    f"{label:<9} {reads / duration:>9.0f} {writes / duration:>9.0f} {errors:>7} "
+                    f"{percentile(0.50):>8.2f} {percentile(0.99):>8.2f}"
+                )
@@ -0,0 +1,32 @@
+# perf/management/commands/enable_sqlite_wal.py
+"""
+Switch SQLite databases to write-ahead logging; the mode persists in the file.
+
+    python manage.py enable_sqlite_wal [--database default]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from perf.sqlite import enable_wal
+
+
+class Command(BaseCommand):
+    help = "Set journal_mode=WAL on the project's SQLite databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", action="append", help="Database alias (repeatable); default all.")
+
+    def handle(self, database, **options):
+        aliases = database or list(connections)
+        unknown = set(aliases) - set(connections)
+        if unknown:
+            raise CommandError(f"Unknown database(s): {', '.join(sorted(unknown))}.")
+        for alias in aliases:
+            connection = connections[alias]
+            if connection.vendor != "sqlite":
+                self.stdout.write(f"{alias}: not SQLite, skipped")
+                continue
+            mode = enable_wal(connection)
+            if mode != "wal":  # e.g. an in-memory database
+                raise CommandError(f"{alias}: SQLite kept journal_mode={mode}.")
+            self.stdout.write(f"{alias}: journal_mode=wal")
@@ -0,0 +1,108 @@
+# perf/management/commands/index_advisor.py
+"""
+Report (and with --plans/--benchmark, EXPLAIN or time) the access paths no index covers.
+
+    python manage.py index_advisor [app ...] [--plans] [--benchmark] [--check]
+"""
+import statistics
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from perf import indexes
+
+
+class Command(BaseCommand):
+    help = "Find list-view and admin queries that no index serves, and propose indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("app_labels", nargs="*", help="Restrict to these apps (default: every project app).")
+        parser.add_argument("--plans", action="store_true", help="Print the query plan of every path.")
+        parser.add_argument("--benchmark", action="store_true",
+                            help="Time every path with and without the proposed indexes.")
+        parser.add_argument("--repeat", type=int, default=50, help="Runs per timing (default 50).")
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--check", action="store_true", help="Exit with status 1 if any index is proposed.")
+
+    def handle(self, app_labels, plans, benchmark, repeat, database, check, **options):
+        found = indexes.collect(app_labels)
+        all_paths = [path for paths, _ in found.values() for path in paths]
+        proposals = indexes.propose(all_paths)
+        samples = {path: path.sample_values() for path in all_paths}
+        before = {path: self.measure(path, samples[path], database, benchmark, repeat) for path in all_paths}
+        after = {}
+        if benchmark and proposals:
+            after = self.measure_with(proposals, all_paths, samples, database, repeat)
+
+        for origin, (paths, notes) in found.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{origin} ({paths[0].model._meta.label})"))
+            for path in paths:
+                self.stdout.write(self.describe(path, proposals, before[path], after.get(path)))
+                if plans:
+                    self.stdout.write(self.indent(before[path][0], 6))
+                    if path in after:
+                        self.stdout.write("      with the proposed indexes:")
+                        self.stdout.write(self.indent(after[path][0], 6))
+            for note in notes:
+                self.stdout.write(f"  note: {note}")
+
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("No missing indexes."))
+            return
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            "Proposed indexes (add them to Meta.indexes, then run makemigrations):"
+        ))
+        for model, model_indexes in proposals.items():
+            self.stdout.write(f"# {model._meta.label}")
+            for index in model_indexes:
+                fields = ", ".join(f'"{name}"' for name in index.fields)
+                self.stdout.write(f'models.Index(fields=[{fields}], name="{index.name}"),')
+        if check:
+            sys.exit(1)
+
+    def describe(self, path, proposals, before, after):
+        line = f"  {path.describe():<48} {before[1]:<18}"
+        if not indexes.is_covered(path):
+            key = path.columns()
+            served_by = [
+                index.name for index in proposals.get(path.model, [])
+                if indexes.covers(indexes.index_key(index), key, path.equality_prefix())
+            ]
+            line += f"-> {', '.join(served_by)}" if served_by else "-> (no index proposed)"
+        if before[2] is not None:
+            line += f"  {before[2]:.2f} ms"
+            if after is not None:
+                line += f" -> {after[2]:.2f} ms ({after[1]})"
+        return line
+
+    def measure(self, path, sample, database, benchmark, repeat):
+        """(plan, verdict, median ms or None) for one path."""
+        plan, verdict = path.explain(sample, database)
+        elapsed = None
+        if benchmark:
+            queryset = path.queryset(sample).using(database)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())  # .all(): a fresh clone, no result cache
+                timings.append(time.perf_counter() - start)
+            elapsed = statistics.median(timings) * 1000
+        return plan, verdict, elapsed
+
+    def measure_with(self, proposals, paths, samples, database, repeat):
+        connection = connections[database]
+        with transaction.atomic(using=database):
+            with connection.cursor() as cursor:
+                for model, model_indexes in proposals.items():
+                    for index in model_indexes:
+                        cursor.execute(indexes.create_index_sql(model, index, database))
+            measured = {path: self.measure(path, samples[path], database, True, repeat) for path in paths}
+            transaction.set_rollback(True, using=database)
+        return measured
+
+    @staticmethod
+    def indent(text, width):
+        return "\n".join(" " * width + line for line in text.splitlines())
@@ -0,0 +1,58 @@
+# perf/management/commands/perf_overhead.py
+"""
+Median latency of a URL with and without PerfMiddleware (target: below 2% overhead).
+
+    python manage.py perf_overhead /posts/ --requests 3000
+"""
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from perf.logs import request_log
+
+MIDDLEWARE_PATH = "perf.middleware.PerfMiddleware"
+
+
+class Command(BaseCommand):
+    help = "Compare request latency with and without PerfMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--requests", type=int, default=3000)
+        parser.add_argument("--no-log", action="store_true",
+                            help="Silence the perf.requests logger while measuring.")
+
+    def handle(self, path, requests, no_log, **options):
+        if MIDDLEWARE_PATH not in settings.MIDDLEWARE:
+            self.stderr.write(f"{MIDDLEWARE_PATH} is not in MIDDLEWARE.")
+            return
+        if no_log:
+            logging.getLogger("perf.requests").disabled = True
+
+        # Each Client builds its middleware chain on its first request.
+        plain_middleware = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE_PATH]
+        with override_settings(MIDDLEWARE=plain_middleware):
+            plain = Client(HTTP_HOST="localhost")
+            plain.get(path, secure=True)
+        instrumented = Client(HTTP_HOST="localhost")
+        instrumented.get(path, secure=True)
+
+        clients = {"plain": plain, "instrumented": instrumented}
+        samples = {label: [] for label in clients}
+        for _ in range(requests):
+            for label, client in clients.items():
+                start = time.perf_counter()
+                client.get(path, secure=True)
+                samples[label].append(time.perf_counter() - start)
+        request_log.flush()
+
+        median = {label: statistics.median(values) * 1000 for label, values in samples.items()}
+        overhead = (median["instrumented"] / median["plain"] - 1) * 100
+        self.stdout.write(f"{path}: {requests} requests each, median latency")
+        self.stdout.write(f"  without PerfMiddleware  {median['plain']:.3f} ms")
+        self.stdout.write(f"  with PerfMiddleware     {median['instrumented']:.3f} ms")
+        self.stdout.write(f"  overhead                {overhead:+.2f}%")
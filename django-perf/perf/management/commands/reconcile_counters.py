@@ -0,0 +1,50 @@
+# perf/management/commands/reconcile_counters.py
+"""
+Recompute registered counter columns in primary-key batches and report the drift.
+
+    python manage.py reconcile_counters [blog.Post.comments_count] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from perf.counters import counters
+
+
+class Command(BaseCommand):
+    help = "Find and fix drift in denormalized counter columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("labels", nargs="*", help="app_label.Model.field of the counters to check.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, labels, dry_run, batch_size, **options):
+        known = {counter.label: counter for counter in counters}
+        unknown = set(labels) - set(known)
+        if unknown:
+            raise CommandError(
+                f"Unknown counter(s): {', '.join(sorted(unknown))}. "
+                f"Registered: {', '.join(sorted(known)) or 'none'}."
+            )
+        for counter in [known[label] for label in labels] or counters:
+            drifted = self.reconcile(counter, dry_run, batch_size)
+            verb = "drifted" if dry_run else "fixed"
+            self.stdout.write(f"{counter.label}: {drifted} row(s) {verb}")
+
+    def reconcile(self, counter, dry_run, batch_size):
+        bounds = counter.model._default_manager.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            return 0
+        total = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            with transaction.atomic():
+                pks = list(
+                    counter.drifted()
+                    .filter(pk__gte=start, pk__lt=start + batch_size)
+                    .values_list("pk", flat=True)
+                )
+                if pks and not dry_run:
+                    counter.refresh(pks)
+            total += len(pks)
+        return total
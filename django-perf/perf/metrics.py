@@ -0,0 +1,161 @@
+# perf/metrics.py
+"""
+Per-process metric registries rendered in Prometheus text format on /metrics/,
+with `request_metrics` first and then those listed in PERF_METRICS_REGISTRIES.
+"""
+import bisect
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Family:
+    """One metric name with a child (histogram or counter) per label set."""
+
+    def __init__(self, name, help_text, kind, buckets=None):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.buckets = buckets
+        self.children = {}
+
+    def child(self, labels):
+        child = self.children.get(labels)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == "histogram" else [0]
+            self.children[labels] = child
+        return child
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """A set of metric families sharing one lock and one set of label names."""
+
+    label_names = ()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}
+
+    def _family(self, name, help_text, kind, buckets=None):
+        family = Family(name, help_text, kind, buckets)
+        self.families[name] = family
+        return family
+
+    def reset(self):
+        with self.lock:
+            for family in self.families.values():
+                family.children.clear()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        with self.lock:
+            for family in self.families.values():
+                lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for labels, child in sorted(family.children.items()):
+                    if family.kind == "counter":
+                        lines.append(f"{family.name}{_labels(self.label_names, labels)} {child[0]}")
+                        continue
+                    for bound, total in child.cumulative():
+                        le = f'le="{_number(bound)}"'
+                        lines.append(f"{family.name}_bucket{_labels(self.label_names, labels, le)} {total}")
+                    lines.append(f"{family.name}_sum{_labels(self.label_names, labels)} {_number(child.sum)}")
+                    lines.append(f"{family.name}_count{_labels(self.label_names, labels)} {child.count}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics(Registry):
+    """The per-view request metrics recorded by PerfMiddleware."""
+
+    label_names = ("view", "method")
+
+    def __init__(self):
+        super().__init__()
+        self.duration = self._family(
+            "perf_request_duration_seconds", "Wall time of the request.", "histogram", DURATION_BUCKETS)
+        self.queries = self._family(
+            "perf_db_queries", "SQL queries per request.", "histogram", COUNT_BUCKETS)
+        self.db_time = self._family(
+            "perf_db_duration_seconds", "Time spent in SQL per request.", "histogram", DURATION_BUCKETS)
+        self.render_time = self._family(
+            "perf_render_duration_seconds", "Template response render time.", "histogram", DURATION_BUCKETS)
+        self.duplicates = self._family(
+            "perf_duplicate_queries_total", "Queries repeated with identical SQL and parameters.", "counter")
+
+    def record(self, view, method, duration, queries, db_time, duplicates, render_time=None):
+        labels = (view, method)
+        with self.lock:
+            self.duration.child(labels).observe(duration)
+            self.queries.child(labels).observe(queries)
+            self.db_time.child(labels).observe(db_time)
+            if render_time is not None:
+                self.render_time.child(labels).observe(render_time)
+            self.duplicates.child(labels)[0] += duplicates
+
+    def snapshot(self, view, method="GET"):
+        """Plain numbers for one view, mainly for tests and shell use."""
+        labels = (view, method)
+        with self.lock:
+            duration = self.duration.children.get(labels)
+            if duration is None:
+                return None
+            return {
+                "requests": duration.count,
+                "queries": self.queries.children[labels].sum,
+                "db_time": self.db_time.children[labels].sum,
+                "duplicates": self.duplicates.children[labels][0],
+                "render_count": getattr(self.render_time.children.get(labels), "count", 0),
+            }
+
+
+request_metrics = RequestMetrics()
+
+
+def registries():
+    """request_metrics plus the registries listed in PERF_METRICS_REGISTRIES."""
+    return [request_metrics] + [
+        import_string(path) for path in getattr(settings, "PERF_METRICS_REGISTRIES", ())
+    ]
@@ -0,0 +1,134 @@
+# perf/middleware.py
+"""
+PerfMiddleware: per-view query count, DB time, duplicate queries and render
+time, recorded in request_metrics and logged to "perf.requests". Put it first in MIDDLEWARE.
+"""
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .logs import logger, request_log
+from .metrics import request_metrics
+
+UNRESOLVED = "<unresolved>"
+
+
+class QueryTracker:
+    """execute_wrapper that counts, times and fingerprints SQL statements."""
+
+    __slots__ = ("count", "db_time", "seen", "duplicates", "connections")
+
+    def __init__(self):
+        self.connections = []
+        self.count = 0
+        self.db_time = 0.0
+        self.seen = set()
+        self.duplicates = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.count += 1
+            if not many:
+                try:
+                    key = (sql, tuple(params) if isinstance(params, list) else params)
+                    if key in self.seen:
+                        self.duplicates += 1
+                    else:
+                        self.seen.add(key)
+                except TypeError:  # unhashable (e.g. dict) params
+                    pass
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or match._func_path
+
+
+class PerfMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.log_enabled = logger.isEnabledFor(logging.INFO)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        tracker = self.start_tracking(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            self.stop_tracking(tracker)
+        return self.record(request, response, tracker, duration)
+
+    async def __acall__(self, request):
+        tracker = await sync_to_async(self.start_tracking)(request)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            await sync_to_async(self.stop_tracking)(tracker)
+        return self.record(request, response, tracker, duration)
+
+    @staticmethod
+    def start_tracking(request):
+        tracker = QueryTracker()
+        tracker.connections = [connections[alias] for alias in connections]
+        request._perf_render_time = None
+        for connection in tracker.connections:
+            connection.execute_wrappers.append(tracker)
+        return tracker
+
+    @staticmethod
+    def stop_tracking(tracker):
+        for connection in tracker.connections:
+            connection.execute_wrappers.remove(tracker)
+
+    def record(self, request, response, tracker, duration):
+        match = request.resolver_match
+        if match is not None and getattr(match.func, "perf_exempt", False):
+            return response
+
+        name = view_name(request)
+        render_time = request._perf_render_time
+        request_metrics.record(
+            name, request.method, duration, tracker.count, tracker.db_time,
+            tracker.duplicates, render_time,
+        )
+        if self.log_enabled:
+            request_log.append((
+                name, request.method, request.path, response.status_code,
+                round(duration * 1000, 2), tracker.count, round(tracker.db_time * 1000, 2),
+                tracker.duplicates, None if render_time is None else round(render_time * 1000, 2),
+            ))
+        return response
+
+    def process_template_response(self, request, response):
+        # As the outermost middleware this hook runs last, right before the
+        # handler calls response.render().
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._perf_render_time = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,170 @@
+# perf/replicas.py
+"""
+Read-replica routing: reads go to a healthy alias in REPLICA_DATABASES unless
+the request wrote, is pinned by a recent write or runs in an atomic block.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+STICKY_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_request_state = ContextVar("replica_request_state", default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, "REPLICA_DATABASES", []))
+
+
+class RequestState:
+    __slots__ = ("pinned", "wrote", "replica")
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+class ReplicaHealth:
+    """Per-process record of which replicas answered their last probe."""
+
+    def __init__(self):
+        self.checked = {}     # alias -> time of the last successful probe
+        self.down_until = {}  # alias -> time before which the alias is skipped
+
+    def reset(self):
+        self.checked.clear()
+        self.down_until.clear()
+
+    def is_available(self, alias):
+        now = time.monotonic()
+        if self.down_until.get(alias, 0) > now:
+            return False
+        if now - self.checked.get(alias, float("-inf")) < getattr(settings, "REPLICA_HEALTH_INTERVAL", 5):
+            return True
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            self.mark_down(alias)
+            return False
+        self.checked[alias] = now
+        return True
+
+    def mark_down(self, alias):
+        self.down_until[alias] = time.monotonic() + getattr(settings, "REPLICA_RETRY_AFTER", 30)
+        self.checked.pop(alias, None)
+        connections[alias].close()
+
+    def healthy(self, aliases):
+        return [alias for alias in aliases if self.is_available(alias)]
+
+
+health = ReplicaHealth()
+
+
+def choose_replica():
+    """A healthy replica alias, or None if there is none."""
+    replicas = health.healthy(get_replicas())
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related lookups from an object stay on the database it came from.
+            return instance._state.db
+        state = _request_state.get()
+        if (state is not None and state.pinned) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state is None:
+            return choose_replica() or DEFAULT_DB_ALIAS
+        if state.replica is None or not health.is_available(state.replica):
+            state.replica = choose_replica()
+        return state.replica or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            # Later reads in this request, and the client's next requests, see the write.
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary through replication.
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Tracks per-request routing state and the sticky-to-primary cookie. Put it
+    right after PerfMiddleware so sessions and authentication are routed too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.request_state(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.set_sticky_cookie(request, response, state)
+
+    async def __acall__(self, request):
+        # The ORM's threads (sync_to_async) run in a copy of this context, so
+        # they see the same RequestState.
+        state = self.request_state(request)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.set_sticky_cookie(request, response, state)
+
+    @staticmethod
+    def request_state(request):
+        state = RequestState(
+            pinned=request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES,
+        )
+        state.wrote = request.method not in SAFE_METHODS
+        return state
+
+    @staticmethod
+    def set_sticky_cookie(request, response, state):
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, "1",
+                max_age=getattr(settings, "REPLICA_STICKY_SECONDS", 10),
+                secure=request.is_secure(), httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_exception(self, request, exception):
+        state = _request_state.get()
+        if isinstance(exception, DatabaseError) and state is not None and state.replica:
+            health.mark_down(state.replica)
@@ -0,0 +1,85 @@
+# perf/sqlite.py
+"""
+SQLite tuning applied on connect, for `DATABASES = {"default": sqlite_profile(path)}`.
+Known gap: WAL itself is not switched on at connect (it would rewrite every file
+a manage.py command opens); run `manage.py enable_sqlite_wal` once per database.
+"""
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Entry key marking profile databases whose synchronous follows the journal mode.
+SYNCHRONOUS_BY_JOURNAL = "PERF_SYNCHRONOUS_BY_JOURNAL"
+
+DEFAULTS = {
+    "busy_timeout": 5.0,  # seconds
+    "cache_size": 64 * 1024 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "synchronous": None,  # NORMAL under WAL, FULL otherwise
+    "conn_max_age": 600,
+    "transaction_mode": "IMMEDIATE",
+}
+
+
+def pragmas(busy_timeout, cache_size, mmap_size, synchronous):
+    """The PRAGMA statements run on each connection, in order."""
+    statements = [
+        f"PRAGMA busy_timeout={int(busy_timeout * 1000)}",
+        f"PRAGMA cache_size={-(cache_size // 1024)}",  # negative: KiB rather than pages
+        f"PRAGMA mmap_size={mmap_size}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if synchronous:
+        statements.insert(0, f"PRAGMA synchronous={synchronous}")
+    return statements
+
+
+def apply_synchronous(cursor):
+    """Set synchronous to NORMAL if the database is in WAL mode, else FULL."""
+    cursor.execute("PRAGMA journal_mode")
+    mode = cursor.fetchone()[0]
+    cursor.execute(f"PRAGMA synchronous={'NORMAL' if mode.lower() == 'wal' else 'FULL'}")
+    return mode
+
+
+@receiver(connection_created)
+def set_synchronous(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and connection.settings_dict.get(SYNCHRONOUS_BY_JOURNAL):
+        with connection.cursor() as cursor:
+            apply_synchronous(cursor)
+
+
+def enable_wal(connection):
+    """Switch the database of a Django connection to WAL; returns the new journal mode."""
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        mode = cursor.fetchone()[0]
+        if connection.settings_dict.get(SYNCHRONOUS_BY_JOURNAL):
+            apply_synchronous(cursor)
+        return mode
+
+
+def sqlite_profile(name, **overrides):
+    """
+    A DATABASES entry for the SQLite file `name` with the profile applied.
+    Keyword arguments override DEFAULTS (conn_max_age=None keeps connections
+    open indefinitely, 0 closes them after each request; transaction_mode=None
+    keeps deferred transactions, an explicit synchronous applies whatever the
+    journal mode).
+    """
+    unknown = set(overrides) - set(DEFAULTS)
+    if unknown:
+        raise TypeError(f"Unknown SQLite profile settings: {', '.join(sorted(unknown))}")
+    settings = {**DEFAULTS, **overrides}
+    conn_max_age = settings.pop("conn_max_age")
+    transaction_mode = settings.pop("transaction_mode")
+    options = {"timeout": settings["busy_timeout"], "init_command": ";".join(pragmas(**settings))}
+    if transaction_mode:
+        options["transaction_mode"] = transaction_mode
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": options,
+        SYNCHRONOUS_BY_JOURNAL: settings["synchronous"] is None,
+    }
@@ -0,0 +1,24 @@
+# perf/stamps.py
+"""Version stamps kept in a Django cache: entries keyed on a stamp are invalidated by replacing it."""
+import uuid
+
+
+def new_stamp():
+    return uuid.uuid4().hex
+
+
+def get_stamp(cache, key):
+    """
+    The stamp stored under `key`, created if missing. Stamps are random rather
+    than counters, so a stamp lost to eviction is never re-created with a value
+    that old entries were stored under.
+    """
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, new_stamp(), None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def bump_stamp(cache, key):
+    cache.set(key, new_stamp(), None)
@@ -0,0 +1,99 @@
+# perf/testing.py
+"""
+Test helpers: a test runner that switches perf off, and SQLite files standing
+in for read replicas.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from .replicas import health
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that runs the suite with PERF_ENABLED = False, so test
+    requests are neither recorded nor logged. Tests of perf itself switch it
+    back on with override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.perf_override = override_settings(PERF_ENABLED=False)
+        self.perf_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.perf_override.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class SQLiteReplicas:
+    """
+    Local SQLite copies of the primary acting as lagging replicas, for a
+    TransactionTestCase (a TestCase's uncommitted data is not copied):
+
+        with SQLiteReplicas(2) as replicas:
+            ...                        # write on the primary
+            replicas.replicate()       # the replicas catch up
+            replicas.fail("replica_test_0")
+
+    While the block runs the aliases are connections of the current thread,
+    listed in REPLICA_DATABASES, and perf.replicas.ReplicaRouter is installed.
+    """
+
+    def __init__(self, count=2, prefix="replica_test"):
+        self.aliases = [f"{prefix}_{index}" for index in range(count)]
+        self.directory = None
+        self.override = None
+
+    def __enter__(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != "sqlite":
+            raise RuntimeError("SQLiteReplicas needs a SQLite primary database.")
+        self.directory = tempfile.mkdtemp(prefix="replicas-")
+        for alias in self.aliases:
+            # Registered on this thread only, not in DATABASES: test cases refuse
+            # configured aliases they do not declare, but allow run-time ones.
+            settings_dict = {**primary.settings_dict, "NAME": self.path(alias), "TEST": {"MIRROR": None}}
+            connections[alias] = type(primary)(settings_dict, alias)
+        self.override = override_settings(
+            REPLICA_DATABASES=self.aliases,
+            DATABASE_ROUTERS=["perf.replicas.ReplicaRouter"],
+        )
+        self.override.enable()
+        health.reset()
+        self.replicate()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.override.disable()
+        for alias in self.aliases:
+            connections[alias].close()
+            del connections[alias]
+        health.reset()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def path(self, alias):
+        return os.path.join(self.directory, f"{alias}.sqlite3")
+
+    def replicate(self, *aliases):
+        """Copy the primary's committed data to the given replicas (all by default)."""
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in aliases or self.aliases:
+            connections[alias].close()
+            target = sqlite3.connect(self.path(alias))
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+
+    def fail(self, alias):
+        """Make a replica unreachable: its file now lives in a directory that does not exist."""
+        connections[alias].close()
+        connections[alias].settings_dict["NAME"] = os.path.join(self.directory, "missing", f"{alias}.sqlite3")
@@ -0,0 +1,47 @@
+# perf/views.py
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .metrics import registries
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def client_ip(request):
+    """
+    The client address: REMOTE_ADDR, or with PERF_METRICS_NUM_PROXIES = n the
+    address the n-th proxy from the server appended to X-Forwarded-For.
+    """
+    num_proxies = getattr(settings, "PERF_METRICS_NUM_PROXIES", 0)
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if num_proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(",")]
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get("REMOTE_ADDR")
+
+
+def can_scrape(request):
+    user = getattr(request, "user", None)
+    if getattr(user, "is_staff", False):
+        return True
+    token = getattr(settings, "PERF_METRICS_TOKEN", None)
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if token and scheme.lower() == "bearer" and constant_time_compare(credentials.strip(), token):
+        return True
+    return client_ip(request) in getattr(settings, "PERF_METRICS_ALLOWED_IPS", ())
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. Served to staff users, to requests carrying
+    "Authorization: Bearer <PERF_METRICS_TOKEN>" and, if listed, to the
+    addresses in PERF_METRICS_ALLOWED_IPS; everyone else gets a 404.
+    """
+    if not can_scrape(request):
+        raise Http404
+    body = "".join(registry.render() for registry in registries())
+    return HttpResponse(body, content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+metrics.perf_exempt = True  # scrapes are not recorded as requests
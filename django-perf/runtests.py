@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+"""Run perf's own tests: `python runtests.py [test labels]`."""
+import os
+import sys
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+if __name__ == "__main__":
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+    django.setup()
+    runner = get_runner(settings)()
+    sys.exit(bool(runner.run_tests(sys.argv[1:] or ["tests"])))
@@ -0,0 +1,302 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin import AdminSite, ModelAdmin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, router, transaction
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse, JsonResponse
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import include, path
+from django.views.generic import ListView
+
+from perf import indexes
+from perf.metrics import Histogram, request_metrics
+from perf.replicas import STICKY_COOKIE, health
+from perf.sqlite import SYNCHRONOUS_BY_JOURNAL, sqlite_profile
+from perf.testing import SQLiteReplicas
+
+
+def queries_view(request):
+    user_model = get_user_model()
+    for _ in range(3):
+        list(user_model.objects.filter(pk=1))
+    list(user_model.objects.filter(pk=2))
+    return HttpResponse("ok")
+
+
+async def async_queries_view(request):
+    user_model = get_user_model()
+    for _ in range(2):
+        await user_model.objects.filter(pk=1).aexists()
+    return HttpResponse("ok")
+
+
+def template_view(request):
+    template = engines["django"].from_string("{% for i in items %}{{ i }}{% endfor %}")
+    return TemplateResponse(request, template, {"items": range(10)})
+
+
+def usernames_view(request):
+    users = get_user_model().objects.order_by("username")
+    return JsonResponse({"db": users.db, "usernames": list(users.values_list("username", flat=True))})
+
+
+def create_user_view(request):
+    get_user_model().objects.create(username=request.POST["username"])
+    return HttpResponse(status=201)
+
+
+urlpatterns = [
+    path("queries/", queries_view, name="queries"),
+    path("async-queries/", async_queries_view, name="async_queries"),
+    path("template/", template_view),
+    path("usernames/", usernames_view),
+    path("users/", create_user_view),
+    path("", include("perf.urls")),
+]
+
+
+@override_settings(PERF_ENABLED=True)
+class PerfMiddlewareTests(TestCase):
+    def setUp(self):
+        request_metrics.reset()
+
+    def get(self, url, **extra):
+        return self.client.get(url, secure=True, **extra)
+
+    def test_records_queries_and_duplicates_per_view(self):
+        self.get("/queries/")
+        self.get("/queries/")
+        stats = request_metrics.snapshot("queries")
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["queries"], 8)
+        self.assertEqual(stats["duplicates"], 4)
+        self.assertGreater(stats["db_time"], 0)
+        self.assertEqual(stats["render_count"], 0)
+
+    async def test_records_queries_of_async_views(self):
+        await self.async_client.get("/async-queries/", secure=True)
+        stats = request_metrics.snapshot("async_queries")
+        self.assertEqual((stats["requests"], stats["queries"], stats["duplicates"]), (1, 2, 1))
+
+    def test_records_render_time_for_template_responses(self):
+        self.get("/template/")
+        stats = request_metrics.snapshot("tests.test_perf.template_view")
+        self.assertEqual(stats["render_count"], 1)
+        self.assertEqual(stats["queries"], 0)
+
+    def test_metrics_endpoint(self):
+        self.get("/queries/")
+        self.client.force_login(get_user_model().objects.create(username="ops", is_staff=True))
+        response = self.get("/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE perf_db_queries histogram", body)
+        self.assertIn('perf_db_queries_bucket{view="queries",method="GET",le="5"} 1', body)
+        self.assertIn('perf_db_queries_bucket{view="queries",method="GET",le="+Inf"} 1', body)
+        self.assertIn('perf_duplicate_queries_total{view="queries",method="GET"} 2', body)
+        # Scrapes themselves are not recorded.
+        self.assertNotIn('view="perf:metrics"', body)
+
+    def test_metrics_endpoint_hidden_by_default(self):
+        self.client.force_login(get_user_model().objects.create(username="reader"))
+        self.assertEqual(self.get("/metrics/").status_code, 404)
+        self.assertEqual(self.get("/metrics/", REMOTE_ADDR="127.0.0.1").status_code, 404)
+
+    @override_settings(PERF_METRICS_TOKEN="s3cret")
+    def test_metrics_endpoint_with_bearer_token(self):
+        self.assertEqual(self.get("/metrics/", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+        self.assertEqual(self.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong").status_code, 404)
+        self.assertEqual(self.get("/metrics/", HTTP_AUTHORIZATION="Token s3cret").status_code, 404)
+
+    @override_settings(PERF_METRICS_ALLOWED_IPS=["10.0.0.5"], PERF_METRICS_NUM_PROXIES=1)
+    def test_metrics_endpoint_allowed_ips_behind_a_proxy(self):
+        # The proxy on 127.0.0.1 appends the client's address; anything before it is client-supplied.
+        forwarded = {"REMOTE_ADDR": "127.0.0.1"}
+        self.assertEqual(self.get("/metrics/", HTTP_X_FORWARDED_FOR="10.0.0.5", **forwarded).status_code, 200)
+        self.assertEqual(self.get("/metrics/", **forwarded).status_code, 404)
+        spoofed = self.get("/metrics/", HTTP_X_FORWARDED_FOR="10.0.0.5, 203.0.113.9", **forwarded)
+        self.assertEqual(spoofed.status_code, 404)
+
+    @override_settings(PERF_ENABLED=False)
+    def test_disabled(self):
+        self.get("/queries/")
+        self.assertIsNone(request_metrics.snapshot("queries"))
+
+
+class HistogramTests(TestCase):
+    def test_buckets_are_cumulative_and_inclusive(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 5, 9):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 4), (float("inf"), 5)])
+        self.assertEqual((histogram.sum, histogram.count), (18, 5))
+
+
+@override_settings(MIDDLEWARE=["perf.replicas.ReplicaRoutingMiddleware"])
+class ReplicaRoutingTests(TransactionTestCase):
+    def use_replicas(self, count=2):
+        self.replicas = self.enterContext(SQLiteReplicas(count))
+
+    def read(self):
+        return self.client.get("/usernames/", secure=True).json()
+
+    def test_reads_go_to_a_replica_and_lag_until_replicated(self):
+        self.use_replicas()
+        get_user_model().objects.create(username="alice")
+        data = self.read()
+        self.assertIn(data["db"], self.replicas.aliases)
+        self.assertEqual(data["usernames"], [])
+        self.replicas.replicate()
+        self.assertEqual(self.read()["usernames"], ["alice"])
+
+    def test_client_reads_its_own_writes(self):
+        self.use_replicas()
+        response = self.client.post("/users/", {"username": "bob"}, secure=True)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.read(), {"db": "default", "usernames": ["bob"]})
+        del self.client.cookies[STICKY_COOKIE]  # the sticky window has passed
+        self.assertEqual(self.read()["usernames"], [])
+
+    def test_transactions_read_from_the_primary(self):
+        self.use_replicas()
+        user_model = get_user_model()
+        self.assertIn(router.db_for_read(user_model), self.replicas.aliases)
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(user_model), "default")
+
+    @override_settings(REPLICA_HEALTH_INTERVAL=0)  # probe before every request
+    def test_fails_over_to_a_healthy_replica_then_the_primary(self):
+        self.use_replicas()
+        self.replicas.fail("replica_test_0")
+        self.assertEqual({self.read()["db"] for _ in range(10)}, {"replica_test_1"})
+        self.replicas.fail("replica_test_1")
+        self.assertEqual(self.read()["db"], "default")
+
+    @override_settings(REPLICA_HEALTH_INTERVAL=60)
+    def test_replica_failing_mid_request_is_skipped_afterwards(self):
+        self.use_replicas(1)
+        self.assertTrue(health.is_available("replica_test_0"))  # trusted for the next 60s
+        self.replicas.fail("replica_test_0")
+        self.client.raise_request_exception = False
+        with self.assertLogs("django.request", "ERROR"):
+            self.assertEqual(self.client.get("/usernames/", secure=True).status_code, 500)
+        self.assertEqual(self.read()["db"], "default")
+
+
+class IndexAdvisorTests(TestCase):
+    def setUp(self):
+        self.user_model = get_user_model()
+
+    def admin_paths(self, **options):
+        model_admin = type("UserAdmin", (ModelAdmin,), options)(self.user_model, AdminSite())
+        return indexes.admin_paths(self.user_model, model_admin)
+
+    def test_list_view_ordering(self):
+        view = type("UserList", (ListView,), {"model": self.user_model, "ordering": ["-date_joined"]})
+        paths, notes = indexes.view_paths("users", view)
+        self.assertEqual([path.columns() for path in paths], [(("date_joined", True),)])
+        [proposal] = indexes.propose(paths)[self.user_model]
+        self.assertEqual(proposal.fields, ["-date_joined"])
+
+    def test_admin_filters(self):
+        paths, notes = self.admin_paths(
+            list_filter=("last_name", "is_staff", "date_joined"), ordering=("first_name",),
+        )
+        pk = self.user_model._meta.pk.name
+        self.assertEqual([path.columns() for path in paths], [
+            (("first_name", False), (pk, False)),
+            (("last_name", False), ("first_name", False), (pk, False)),
+            (("date_joined", False),),
+        ])
+        self.assertIn("list_filter is_staff: boolean, too few values for an index", notes)
+        self.assertEqual(
+            sorted(tuple(index.fields) for index in indexes.propose(paths)[self.user_model]),
+            [("date_joined",), ("first_name", pk), ("last_name", "first_name", pk)],
+        )
+
+    def test_unique_ordering_is_covered(self):
+        paths, _ = self.admin_paths(ordering=("username",))
+        self.assertEqual(paths[0].columns(), (("username", False),))
+        self.assertTrue(indexes.is_covered(paths[0]))
+
+    def test_covers_reversed_sort_but_not_mixed_directions(self):
+        index = (("author", False), ("title", False), ("id", False))
+        self.assertTrue(indexes.covers(index, (("author", True), ("title", True), ("id", True)), 1))
+        self.assertTrue(indexes.covers(index, (("author", False), ("title", False))))
+        self.assertFalse(indexes.covers(index, (("title", False), ("id", True))))
+        self.assertFalse(indexes.covers(index, (("author", False), ("title", False), ("id", True)), 1))
+
+    def test_plan_before_and_after_the_proposed_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan verdicts are asserted for SQLite")
+        paths, _ = self.admin_paths(list_filter=("last_name",), ordering=("first_name",))
+        path = paths[1]
+        self.assertEqual(path.explain()[1], "full scan + sort")
+        [index] = indexes.propose([path])[self.user_model]
+        with connection.cursor() as cursor:
+            cursor.execute(indexes.create_index_sql(self.user_model, index))
+        self.assertEqual(path.explain()[1], "index")
+
+
+class SQLiteProfileTests(TestCase):
+    def pragmas(self, connection, names):
+        values = {}
+        with connection.cursor() as cursor:
+            for pragma in names:
+                cursor.execute(f"PRAGMA {pragma}")
+                values[pragma] = cursor.fetchone()[0]
+        return values
+
+    def test_profile_is_applied_on_connect(self):
+        with tempfile.TemporaryDirectory() as directory:
+            handler = ConnectionHandler({"default": sqlite_profile(os.path.join(directory, "tuned.sqlite3"))})
+            tuned = handler["default"]
+            try:
+                values = self.pragmas(tuned, ("journal_mode", "synchronous", "busy_timeout", "cache_size", "temp_store"))
+            finally:
+                tuned.close()
+            # Connecting leaves the file's journal mode alone.
+            self.assertEqual(sorted(os.listdir(directory)), ["tuned.sqlite3"])
+        self.assertEqual(values, {
+            "journal_mode": "delete", "synchronous": 2, "busy_timeout": 5000,
+            "cache_size": -65536, "temp_store": 2,
+        })
+        self.assertEqual(tuned.transaction_mode, "IMMEDIATE")
+        self.assertTrue(tuned.settings_dict["CONN_HEALTH_CHECKS"])
+
+    def test_enable_wal_persists_in_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database = sqlite_profile(os.path.join(directory, "tuned.sqlite3"))
+            handler = ConnectionHandler({"default": database})
+            with mock.patch("perf.management.commands.enable_sqlite_wal.connections", handler):
+                out = StringIO()
+                call_command("enable_sqlite_wal", stdout=out)
+            handler["default"].close()
+            self.assertEqual(out.getvalue(), "default: journal_mode=wal\n")
+            reopened = ConnectionHandler({"default": database})["default"]
+            try:
+                # WAL lets the profile relax synchronous to NORMAL.
+                self.assertEqual(
+                    self.pragmas(reopened, ["journal_mode", "synchronous"]), {"journal_mode": "wal", "synchronous": 1},
+                )
+            finally:
+                reopened.close()
+
+    def test_overrides(self):
+        database = sqlite_profile("db.sqlite3", busy_timeout=1.5, conn_max_age=None, transaction_mode=None)
+        self.assertIsNone(database["CONN_MAX_AGE"])
+        self.assertIn("PRAGMA busy_timeout=1500", database["OPTIONS"]["init_command"])
+        self.assertNotIn("transaction_mode", database["OPTIONS"])
+        database = sqlite_profile("db.sqlite3", synchronous="OFF")
+        self.assertIn("PRAGMA synchronous=OFF", database["OPTIONS"]["init_command"])
+        self.assertFalse(database[SYNCHRONOUS_BY_JOURNAL])
+        with self.assertRaises(TypeError):
+            sqlite_profile("db.sqlite3", journal_mode="DELETE")
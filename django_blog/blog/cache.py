@@ -0,0 +1,124 @@
+# blog/cache.py
+"""
+Versioned fragment cache for the post list: fragments are keyed on version
+stamps (perf.stamps) for the list and each post, which blog/signals.py
+replaces on change. BLOG_CACHE_ALIAS and BLOG_CACHE_TIMEOUT configure it.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.dispatch import Signal
+from django.utils.functional import cached_property
+
+from perf.stamps import get_stamp, new_stamp
+
+LIST_VERSION_KEY = "blog:post_list:version"
+POST_VERSION_KEY = "blog:post:{}:version"
+
+# Instrumentation hook: receivers get `sender` (fragment name) and `hit` (bool).
+fragment_cache_accessed = Signal()
+
+_stats_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def get_cache():
+    return caches[getattr(settings, "BLOG_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "BLOG_CACHE_TIMEOUT", 600)
+
+
+# ---------------- Version stamps ----------------
+
+def list_version():
+    return get_stamp(get_cache(), LIST_VERSION_KEY)
+
+
+def post_versions(post_ids):
+    """Return {post_id: version} for the given posts in one cache round trip."""
+    cache = get_cache()
+    keys = {POST_VERSION_KEY.format(pk): pk for pk in post_ids}
+    found = cache.get_many(keys)
+    missing = {key: new_stamp() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_posts(post_ids=(), list_changed=True):
+    """
+    Give the posts new version stamps, and the list pages showing them too
+    unless `list_changed` is False (a change the list does not display).
+    """
+    cache = get_cache()
+    stamps = {POST_VERSION_KEY.format(pk): new_stamp() for pk in post_ids}
+    if list_changed:
+        stamps[LIST_VERSION_KEY] = new_stamp()
+    if stamps:
+        cache.set_many(stamps, None)
+
+
+# ---------------- Fragments ----------------
+
+def fragment_key(name, parts):
+    return "blog:fragment:{}:{}".format(name, ":".join(str(part) for part in parts))
+
+
+def get_fragment(name, parts):
+    html = get_cache().get(fragment_key(name, parts))
+    hit = html is not None
+    with _stats_lock:
+        (_hits if hit else _misses)[name] += 1
+    fragment_cache_accessed.send(sender=name, hit=hit)
+    return html
+
+
+def set_fragment(name, parts, html):
+    get_cache().set(fragment_key(name, parts), html, get_timeout())
+
+
+def cache_stats():
+    """Hit/miss counters per fragment name plus the overall hit ratio."""
+    with _stats_lock:
+        names = set(_hits) | set(_misses)
+        hits, misses = sum(_hits.values()), sum(_misses.values())
+        per_name = {
+            name: {"hits": _hits[name], "misses": _misses[name]} for name in sorted(names)
+        }
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+        "fragments": per_name,
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose COUNT(*) is cached under the current list version, so a
+    fully cached list page does not touch the database at all.
+    """
+
+    @cached_property
+    def count(self):
+        key = f"blog:post_list:{list_version()}:count"
+        cache = get_cache()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, get_timeout())
+        return count
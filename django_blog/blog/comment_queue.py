@@ -0,0 +1,187 @@
+# blog/comment_queue.py
+"""
+Write-behind comment queue: with BLOG_COMMENT_QUEUE_DIR set, submissions are
+fsync'ed to files and `manage.py flush_comment_queue` inserts them in batches.
+Authors see their pending comments through the (shared) blog cache.
+"""
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import cache as blog_cache
+from .counters import post_comments
+from .models import Comment, Post
+from .signals import invalidate_cached_posts
+
+OVERLAY_KEY = "blog:pending-comments:{}:{}"
+
+try:
+    import fcntl
+except ImportError:  # not POSIX
+    fcntl = None
+
+
+def queue_dir():
+    return getattr(settings, "BLOG_COMMENT_QUEUE_DIR", None)
+
+
+def enabled():
+    return bool(queue_dir())
+
+
+def _ensure_dirs(path):
+    os.makedirs(os.path.join(path, "tmp"), exist_ok=True)
+
+
+# ---------------- Producer ----------------
+
+def enqueue(post_id, author_id, content):
+    """Queue a comment and return its entry."""
+    path = queue_dir()
+    if not path:
+        raise ImproperlyConfigured("BLOG_COMMENT_QUEUE_DIR is not set.")
+    _ensure_dirs(path)
+    entry = {
+        "key": uuid.uuid4().hex,
+        "post": post_id,
+        "author": author_id,
+        "content": content,
+        "submitted_at": timezone.now().isoformat(),
+    }
+    # Nanosecond prefix: the flusher reads the queue in arrival order.
+    name = f"{time.time_ns():020d}-{entry['key']}.json"
+    temporary = os.path.join(path, "tmp", name)
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(entry, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, os.path.join(path, name))
+    _remember(entry)
+    return entry
+
+
+def backlog():
+    """Number of queued entries."""
+    path = queue_dir()
+    if not path or not os.path.isdir(path):
+        return 0
+    return sum(1 for name in os.listdir(path) if name.endswith(".json"))
+
+
+# ---------------- Read-your-writes overlay ----------------
+
+def _overlay_timeout():
+    return getattr(settings, "BLOG_COMMENT_QUEUE_OVERLAY_TIMEOUT", 3600)
+
+
+def _remember(entry):
+    cache = blog_cache.get_cache()
+    key = OVERLAY_KEY.format(entry["post"], entry["author"])
+    entries = cache.get(key) or []
+    entries.append(entry)
+    cache.set(key, entries, _overlay_timeout())
+
+
+def has_pending(post_id, author_id):
+    """Whether the author may have queued comments on the post (no query)."""
+    return bool(blog_cache.get_cache().get(OVERLAY_KEY.format(post_id, author_id)))
+
+
+def pending(post_id, author):
+    """The author's queued comments on the post not flushed yet, as unsaved Comments."""
+    cache = blog_cache.get_cache()
+    key = OVERLAY_KEY.format(post_id, author.pk)
+    entries = cache.get(key)
+    if not entries:
+        return []
+    flushed = set(
+        Comment.objects.filter(queue_key__in=[entry["key"] for entry in entries])
+        .values_list("queue_key", flat=True)
+    )
+    if flushed:
+        entries = [entry for entry in entries if entry["key"] not in flushed]
+        if entries:
+            cache.set(key, entries, _overlay_timeout())
+        else:
+            cache.delete(key)
+    return [
+        Comment(
+            post_id=post_id, author=author, content=entry["content"],
+            created_at=parse_datetime(entry["submitted_at"]), queue_key=entry["key"],
+        )
+        for entry in entries
+    ]
+
+
+# ---------------- Consumer ----------------
+
+@contextmanager
+def _flusher_lock(path):
+    with open(os.path.join(path, "flush.lock"), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def flush(batch_size=500):
+    """
+    Write up to `batch_size` queued comments in one transaction.
+    Returns a Counter of "created", "duplicates" (already written) and
+    "dropped" (post or author gone, or an unreadable entry).
+    """
+    stats = Counter()
+    path = queue_dir()
+    if not path or not os.path.isdir(path):
+        return stats
+    with _flusher_lock(path):
+        names = sorted(name for name in os.listdir(path) if name.endswith(".json"))[:batch_size]
+        entries = []
+        for name in names:
+            try:
+                with open(os.path.join(path, name), encoding="utf-8") as file:
+                    entries.append(json.load(file))
+            except ValueError:
+                stats["dropped"] += 1
+        if entries:
+            _write(entries, stats)
+        for name in names:
+            os.remove(os.path.join(path, name))
+    return stats
+
+
+def _write(entries, stats):
+    keys = [entry["key"] for entry in entries]
+    written = set(Comment.objects.filter(queue_key__in=keys).values_list("queue_key", flat=True))
+    posts = set(Post.objects.filter(pk__in={entry["post"] for entry in entries}).values_list("pk", flat=True))
+    authors = set(User.objects.filter(pk__in={entry["author"] for entry in entries}).values_list("pk", flat=True))
+    comments = []
+    for entry in entries:
+        if entry["key"] in written:
+            stats["duplicates"] += 1
+        elif entry["post"] not in posts or entry["author"] not in authors:
+            stats["dropped"] += 1
+        else:
+            comments.append(Comment(
+                post_id=entry["post"], author_id=entry["author"],
+                content=entry["content"], queue_key=entry["key"],
+            ))
+    if not comments:
+        return
+    per_post = Counter(comment.post_id for comment in comments)
+    # bulk_create() sends no signals: update the counter and the version stamps here.
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        for post_id, count in per_post.items():
+            post_comments.add([post_id], count)
+        invalidate_cached_posts(per_post, list_changed=False)
+    stats["created"] += len(comments)
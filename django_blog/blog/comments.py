@@ -0,0 +1,93 @@
+# blog/comments.py
+"""
+Comment thread loader: keyset pages over (post_id, created_at, id), with
+cursors of the form "<created_at in microseconds>-<id>".
+"""
+from datetime import datetime, timezone
+
+from django.db.models import Q
+
+from .models import Comment
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def make_cursor(comment):
+    delta = comment.created_at - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{micros}-{comment.pk}"
+
+
+def parse_cursor(cursor):
+    try:
+        micros, pk = cursor.split("-")
+        micros, pk = int(micros), int(pk)
+        created_at = datetime.fromtimestamp(micros // 1_000_000, timezone.utc).replace(
+            microsecond=micros % 1_000_000)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        raise InvalidCursor(f"Invalid comment cursor: {cursor!r}")
+    return created_at, pk
+
+
+def thread(post_id):
+    return (
+        Comment.objects.filter(post_id=post_id)
+        .select_related("author")
+        .only("post_id", "content", "created_at", "author__username")
+    )
+
+
+class Page:
+    def __init__(self, comments, has_more):
+        self.comments = comments
+        self.has_more = has_more
+
+    @property
+    def first_cursor(self):
+        return make_cursor(self.comments[0]) if self.comments else None
+
+    @property
+    def last_cursor(self):
+        return make_cursor(self.comments[-1]) if self.comments else None
+
+
+def _fetch(queryset, size, newest_first):
+    order = ("-created_at", "-id") if newest_first else ("created_at", "id")
+    rows = list(queryset.order_by(*order)[:size + 1])  # one extra row tells if there are more
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if newest_first:
+        rows.reverse()
+    return Page(rows, has_more)
+
+
+def latest(post_id, size=DEFAULT_PAGE_SIZE):
+    """The newest `size` comments, oldest first; has_more means older ones exist."""
+    return _fetch(thread(post_id), size, newest_first=True)
+
+
+def before(post_id, cursor, size=DEFAULT_PAGE_SIZE):
+    """The `size` comments preceding the cursor, oldest first."""
+    created_at, pk = parse_cursor(cursor)
+    older = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    return _fetch(thread(post_id).filter(older), size, newest_first=True)
+
+
+def since(post_id, cursor=None, size=DEFAULT_PAGE_SIZE):
+    """
+    Up to `size` comments following the cursor (from the start of the thread
+    without one), oldest first; has_more means the client should ask again
+    from last_cursor.
+    """
+    queryset = thread(post_id)
+    if cursor:
+        created_at, pk = parse_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+    return _fetch(queryset, size, newest_first=False)
@@ -0,0 +1,7 @@
+# blog/counters.py
+"""Counter caches for the blog app (see perf.counters). Imported in BlogConfig.ready()."""
+from perf.counters import CounterCache
+
+from .models import Post
+
+post_comments = CounterCache(Post.comments, "comments_count")
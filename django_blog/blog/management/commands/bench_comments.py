@@ -0,0 +1,130 @@
+# blog/management/commands/bench_comments.py
+"""
+Load-test comment submission with and without the write-behind queue.
+
+    python manage.py bench_comments --threads 32 --duration 10
+"""
+import logging
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog import comment_queue
+from blog.models import Comment, Post
+
+SEED_PREFIX = "bench_comments "
+
+
+class Command(BaseCommand):
+    help = "Compare comment throughput and latency with and without the write-behind queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, threads, duration, batch_size, **options):
+        users = User.objects.bulk_create(
+            User(username=f"{SEED_PREFIX}{i}".replace(" ", "_")) for i in range(threads)
+        )
+        post = Post.objects.create(author=users[0], title=f"{SEED_PREFIX}post", content="...")
+        # Requests that fail are part of the measurement, not something to log.
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            self.stdout.write(
+                f"{'scenario':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7} {'stored/s':>9}"
+            )
+            for label in ("direct", "queue"):
+                result = self.run_scenario(label, post, users, duration, batch_size)
+                self.stdout.write(
+                    f"{label:<8} {result['rps']:>8.0f} {result['p50']:>8.1f} {result['p99']:>8.1f} "
+                    f"{result['failed']:>7} {result['stored']:>9.0f}"
+                )
+        finally:
+            request_logger.setLevel(level)
+            post.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run_scenario(self, label, post, users, duration, batch_size):
+        Comment.objects.filter(post=post).delete()
+        queue_dir = tempfile.mkdtemp(prefix="comment-queue-") if label == "queue" else None
+        url = reverse("blog:comment_create", args=[post.pk])
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ("*",) and not host.startswith(".")),
+                    "localhost")
+        latencies, failed = [], [0]
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + duration
+
+        def client(user):
+            browser = Client(raise_request_exception=False, HTTP_HOST=host)
+            browser.force_login(user)
+            mine, errors, number = [], 0, 0
+            while time.perf_counter() < deadline:
+                number += 1
+                began = time.perf_counter()
+                response = browser.post(url, {"content": f"Comment {number} from {user.username}"})
+                if response.status_code == 302:
+                    mine.append(time.perf_counter() - began)
+                else:
+                    errors += 1
+            with lock:
+                latencies.extend(mine)
+                failed[0] += errors
+            connection.close()
+
+        stop = threading.Event()
+
+        def flusher():
+            while not stop.is_set():
+                if not comment_queue.flush(batch_size=batch_size)["created"]:
+                    time.sleep(0.05)
+            while comment_queue.flush(batch_size=batch_size)["created"]:
+                pass
+            connection.close()
+
+        try:
+            with override_settings(BLOG_COMMENT_QUEUE_DIR=queue_dir):
+                workers = [threading.Thread(target=client, args=(user,)) for user in users]
+                if queue_dir:
+                    background = threading.Thread(target=flusher)
+                    background.start()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                accepted_in = time.perf_counter() - start
+                if queue_dir:
+                    stop.set()
+                    background.join()
+            stored_in = time.perf_counter() - start
+        finally:
+            if queue_dir:
+                shutil.rmtree(queue_dir, ignore_errors=True)
+            close_old_connections()
+
+        stored = Comment.objects.filter(post=post).count()
+        latencies.sort()
+
+        def percentile(fraction):
+            if not latencies:
+                return float("nan")
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {
+            "rps": len(latencies) / accepted_in,
+            "p50": percentile(0.50),
+            "p99": percentile(0.99),
+            "failed": failed[0],
+            "stored": stored / stored_in,
+        }
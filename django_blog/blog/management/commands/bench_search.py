@@ -0,0 +1,79 @@
+# blog/management/commands/bench_search.py
+"""
+Benchmark the search backend against the original icontains query:
+`python manage.py bench_search --posts 100000` (rolled back at the end).
+"""
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import DatabaseSearchBackend, get_search_backend
+
+WORDS = (
+    "django python orm query index cache search signal template view model "
+    "migration admin form middleware request response static media deploy "
+    "sqlite postgres redis celery async test fixture serializer router"
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare the search index with the icontains scan used before it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--queries", default="django,cache template,term1234,term77 term4242,zzz")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, repeat, queries, **options):
+        rng = random.Random(42)
+        # A handful of very common words plus a long tail of rare ones.
+        vocabulary = WORDS + [f"term{i}" for i in range(50_000)]
+        author = User.objects.create(username="bench-search-author")
+        self.stdout.write(f"Seeding {posts} posts...")
+        Post.objects.bulk_create(
+            (
+                Post(
+                    author=author,
+                    title=" ".join(rng.choices(WORDS, k=3) + rng.choices(vocabulary, k=2)),
+                    content=" ".join(rng.choices(WORDS, k=40) + rng.choices(vocabulary, k=80)),
+                )
+                for _ in range(posts)
+            ),
+            batch_size=2000,
+        )
+        backend = get_search_backend()
+        start = time.perf_counter()
+        backend.rebuild()
+        self.stdout.write(f"Index rebuilt in {time.perf_counter() - start:.2f}s ({type(backend).__name__})")
+
+        scan = DatabaseSearchBackend()
+        self.stdout.write(f"{'query':<24} {'index ms':>10} {'icontains ms':>14}")
+        for query in queries.split(","):
+            index_ms = self.time(repeat, lambda: backend.search(query, limit=20))
+            scan_ms = self.time(repeat, lambda: scan.search(query, limit=20))
+            self.stdout.write(f"{query:<24} {index_ms:>10.2f} {scan_ms:>14.2f}")
+
+    @staticmethod
+    def time(repeat, func):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
@@ -0,0 +1,38 @@
+# blog/management/commands/flush_comment_queue.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import comment_queue
+
+
+class Command(BaseCommand):
+    help = "Write the queued comments (BLOG_COMMENT_QUEUE_DIR) to the database in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running, polling the queue every --interval seconds once it is empty.")
+        parser.add_argument("--interval", type=float, default=0.5)
+
+    def handle(self, *args, batch_size, loop, interval, **options):
+        if not comment_queue.enabled():
+            raise CommandError("BLOG_COMMENT_QUEUE_DIR is not set.")
+        totals = {"created": 0, "duplicates": 0, "dropped": 0}
+        try:
+            while True:
+                stats = comment_queue.flush(batch_size=batch_size)
+                for name in totals:
+                    totals[name] += stats[name]
+                if stats["created"] and loop:
+                    self.stdout.write(f"Flushed {stats['created']} comments, {comment_queue.backlog()} queued")
+                if sum(stats.values()) < batch_size:
+                    if not loop:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['created']} comments "
+            f"({totals['duplicates']} already written, {totals['dropped']} dropped)"
+        ))
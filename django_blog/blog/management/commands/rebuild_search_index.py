@@ -0,0 +1,24 @@
+# blog/management/commands/rebuild_search_index.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the blog post search index from the Post and Tag tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        backend = get_search_backend()
+        start = time.perf_counter()
+        with transaction.atomic():
+            count = backend.rebuild(batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} posts with {type(backend).__name__} in {elapsed:.2f}s"
+        ))
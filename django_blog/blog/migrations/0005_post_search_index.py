@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-17 09:00
+
+from django.db import migrations
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+        "USING fts5(title, content, tags, tokenize='porter unicode61')"
+    )
+    Post = apps.get_model("blog", "Post")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    post_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    for post in Post.objects.iterator():
+        tags = ""
+        if post_type is not None:
+            tags = " ".join(
+                TaggedItem.objects.filter(content_type=post_type, object_id=post.pk)
+                .values_list("tag__name", flat=True)
+            )
+        schema_editor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content, tags) VALUES (%s, %s, %s, %s)",
+            [post.pk, post.title, post.content, tags],
+        )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_tags'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_tag_index(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    Post = apps.get_model('blog', 'Post')
+    TagPost = apps.get_model('blog', 'TagPost')
+    TagStat = apps.get_model('blog', 'TagStat')
+    content_type = ContentType.objects.filter(app_label='blog', model='post').first()
+    if content_type is None:
+        return
+    tagged = (
+        TaggedItem.objects.filter(content_type=content_type)
+        .annotate(created_at=Subquery(Post.objects.filter(pk=OuterRef('object_id')).values('created_at')))
+        .filter(created_at__isnull=False)
+        .values_list('tag_id', 'object_id', 'created_at')
+        .order_by()
+        .distinct()
+    )
+    TagPost.objects.bulk_create(
+        (TagPost(tag_id=tag_id, post_id=post_id, created_at=created_at) for tag_id, post_id, created_at in tagged),
+        batch_size=1000,
+    )
+    counts = TagPost.objects.order_by().values_list('tag').annotate(n=Count('*'))
+    TagStat.objects.bulk_create((TagStat(tag_id=tag_id, post_count=n) for tag_id, n in counts), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStat',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='blog_stat', serialize=False, to='taggit.tag')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-post_count', 'tag'], name='blog_tagstat_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TagPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taggit.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', '-created_at', '-post'], name='blog_tagpost_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'post'), name='blog_tagpost_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_tag_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_thread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='queue_key',
+            field=models.CharField(editable=False, max_length=32, null=True, unique=True),
+        ),
+    ]
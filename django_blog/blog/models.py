@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth.models import User
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
 class Post(models.Model):
     title = models.CharField(max_length=200)
@@ -15,17 +16,25 @@ class Post(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     published_date = models.DateTimeField(null=True, blank=True)
+    # Denormalized post.comments.count(), kept current by blog/counters.py
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
 
     tags = TaggableManager(blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Newest-first listings; the admin adds -pk as the tie-breaker
+            models.Index(fields=["-created_at", "-id"], name="blog_post_created_idx"),
+            # Admin list_filter on published_date (a date range)
+            models.Index(fields=["published_date"], name="blog_post_published_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def get_absolute_url(self):
-        return reverse("blog:post-detail", kwargs={"pk": self.pk})
+        return reverse("blog:post_detail", kwargs={"pk": self.pk})
 
 class Comment(models.Model):
     post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name='comments')
@@ -33,6 +42,52 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set on comments written through the write-behind queue (blog/comment_queue.py)
+    queue_key = models.CharField(max_length=32, unique=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Comment threads, read a keyset page at a time (blog/comments.py)
+            models.Index(fields=["post", "created_at", "id"], name="blog_comment_thread_idx"),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author} on "{self.post}"'
+
+
+class TagStat(models.Model):
+    """Number of posts carrying a tag, maintained by blog/tagindex.py."""
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name="blog_stat")
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # The tag cloud: most used tags first
+            models.Index(fields=["-post_count", "tag"], name="blog_tagstat_count_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id}: {self.post_count}"
+
+
+class TagPost(models.Model):
+    """
+    One row per (tag, post), with the post's created_at copied so a tag page
+    is read newest first straight from the index. Maintained by blog/tagindex.py.
+    """
+    # Both indexes below start with the tag; it needs none of its own.
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="+", db_index=False)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "post"], name="blog_tagpost_unique"),
+        ]
+        indexes = [
+            # Tag pages, newest first; covers the post ids so the page needs no table lookups
+            models.Index(fields=["tag", "-created_at", "-post"], name="blog_tagpost_recent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id} -> {self.post_id}"
@@ -0,0 +1,149 @@
+# blog/search.py
+"""
+Full-text search for blog posts: an FTS5 index of title, tags and content on
+SQLite (bm25-ranked), or plain icontains elsewhere. BLOG_SEARCH_BACKEND selects
+the backend; blog/signals.py keeps the index current.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class BaseSearchBackend:
+    """Interface every search backend implements."""
+
+    def index_posts(self, posts):
+        """Add or replace the index entries for the given posts."""
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        """Drop the index entries for the given post ids."""
+        raise NotImplementedError
+
+    def search(self, query, limit=100):
+        """Return up to `limit` post ids matching `query`, best match first."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=1000):
+        """Re-index every post. Returns the number of posts indexed."""
+        from .models import Post
+
+        self.clear()
+        count = 0
+        queryset = Post.objects.order_by("pk").prefetch_related("tags")
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return count
+            self.index_posts(batch)
+            count += len(batch)
+            last_pk = batch[-1].pk
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Index-free fallback: the original `icontains` scan, newest posts first.
+    """
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, batch_size=1000):
+        return 0
+
+    def search(self, query, limit=100):
+        from .models import Post
+
+        query = query.strip()
+        if not query:
+            return []
+        ids = (
+            Post.objects.filter(
+                Q(title__icontains=query) |
+                Q(content__icontains=query) |
+                Q(tags__name__icontains=query)
+            )
+            .order_by("-created_at", "-pk")
+            .values_list("pk", flat=True)
+            .distinct()
+        )
+        return list(ids[:limit])
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Inverted index in an SQLite FTS5 virtual table keyed by post id (rowid).
+    Queries match every word of the input as a prefix ("djan tut" finds
+    "Django tutorial") and are ranked with bm25.
+    """
+    table = "blog_post_fts"
+    # bm25 column weights: title, content, tags
+    weights = (10.0, 1.0, 5.0)
+
+    def index_posts(self, posts):
+        rows = [
+            (post.pk, post.title, post.content, " ".join(tag.name for tag in post.tags.all()))
+            for post in posts
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(r[0],) for r in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)", rows
+            )
+
+    def remove_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in post_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, limit=100):
+        match = self.build_match(query)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def build_match(query):
+        # Quote every word so user input can never be parsed as FTS5 syntax.
+        words = WORD_RE.findall(query)
+        return " ".join(f'"{word}"*' for word in words)
+
+
+def get_search_backend():
+    path = getattr(settings, "BLOG_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTS5Backend()
+    return DatabaseSearchBackend()
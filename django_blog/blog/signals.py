@@ -0,0 +1,133 @@
+# blog/signals.py
+"""
+Keeps the search index (blog/search.py), the tag index (blog/tagindex.py)
+and the post version stamps (blog/cache.py) in step with the Post, Tag,
+Comment and User tables. Connected in BlogConfig.ready().
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from . import cache as blog_cache
+from . import tagindex
+from .models import Comment, Post
+from .search import get_search_backend
+
+
+def invalidate_cached_posts(post_ids, list_changed=True):
+    # After commit, so a concurrent request cannot re-cache the old rows
+    # under the new version stamps.
+    post_ids = list(post_ids)
+    transaction.on_commit(lambda: blog_cache.invalidate_posts(post_ids, list_changed))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index_posts([instance])
+        invalidate_cached_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def redate_tagged_post(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        tagindex.redate_post(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    # The TagPost rows go with the post by cascade; their tags lose a post.
+    instance._indexed_tag_ids = tagindex.indexed_tag_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove_posts([instance.pk])
+    invalidate_cached_posts([instance.pk])
+    tag_ids = getattr(instance, "_indexed_tag_ids", None)
+    if tag_ids:
+        tagindex.decrement(tag_ids)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def reindex_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, Post):
+        if action == "post_add":
+            tagindex.add_tags(instance, pk_set)
+        else:
+            tagindex.remove_tags(instance.pk, pk_set)  # pk_set is None on clear: every tag
+        get_search_backend().index_posts([instance])
+        invalidate_cached_posts([instance.pk])
+
+
+def _posts_tagged(tag):
+    return Post.objects.filter(tags=tag).prefetch_related("tags")
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        posts = list(_posts_tagged(instance))
+        get_search_backend().index_posts(posts)
+        invalidate_cached_posts(post.pk for post in posts)
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    # The tagged items are gone by post_delete, so collect the posts now.
+    instance._search_post_ids = list(_posts_tagged(instance).values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_deleted_tag(sender, instance, **kwargs):
+    post_ids = getattr(instance, "_search_post_ids", [])
+    if post_ids:
+        get_search_backend().index_posts(Post.objects.filter(pk__in=post_ids).prefetch_related("tags"))
+        invalidate_cached_posts(post_ids)
+
+
+@receiver(post_init, sender=Comment)
+def remember_loaded_post(sender, instance, **kwargs):
+    # The post the comment was loaded with, unless post_id was deferred.
+    if "post_id" in instance.__dict__:
+        instance._loaded_post_id = instance.post_id
+
+
+@receiver(pre_save, sender=Comment)
+def remember_commented_post(sender, instance, raw=False, **kwargs):
+    # A comment moved to another post leaves the old post's page too.
+    if not raw and not instance._state.adding:
+        if "_loaded_post_id" in instance.__dict__:
+            instance._previous_post_id = instance._loaded_post_id
+        else:
+            instance._previous_post_id = (
+                Comment.objects.filter(pk=instance.pk).values_list("post_id", flat=True).first()
+            )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Comments only show on the post detail page, not in the list fragments.
+    if not raw:
+        post_ids = {instance.post_id, instance.__dict__.pop("_previous_post_id", None)} - {None}
+        invalidate_cached_posts(post_ids, list_changed=False)
+        if update_fields is None or {"post", "post_id"} & set(update_fields):
+            instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_posts(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Posts show the username of their author and commenters; last_login updates don't matter.
+    if created or raw or (update_fields is not None and "username" not in update_fields):
+        return
+    post_ids = set(instance.posts.values_list("pk", flat=True))
+    if post_ids:
+        invalidate_cached_posts(post_ids)
+    commented = set(instance.comments.values_list("post_id", flat=True)) - post_ids
+    if commented:
+        invalidate_cached_posts(commented, list_changed=False)
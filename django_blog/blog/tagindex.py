@@ -0,0 +1,129 @@
+# blog/tagindex.py
+"""
+Materialized tag index (TagStat counts, TagPost rows in display order) kept by
+blog/signals.py; run `manage.py rebuild_tag_index` after bulk or raw writes.
+"""
+import math
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.paginator import Paginator
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from taggit.models import Tag
+
+from .models import Post, TagPost, TagStat
+
+
+# ---------------- Maintenance ----------------
+
+def indexed_tag_ids(post_id, tag_ids=None):
+    rows = TagPost.objects.filter(post_id=post_id)
+    if tag_ids is not None:
+        rows = rows.filter(tag_id__in=tag_ids)
+    return set(rows.values_list("tag_id", flat=True))
+
+
+def add_tags(post, tag_ids):
+    new_ids = set(tag_ids) - indexed_tag_ids(post.pk, tag_ids)
+    if not new_ids:
+        return
+    TagPost.objects.bulk_create(
+        [TagPost(tag_id=tag_id, post_id=post.pk, created_at=post.created_at) for tag_id in new_ids],
+        ignore_conflicts=True,
+    )
+    TagStat.objects.bulk_create([TagStat(tag_id=tag_id) for tag_id in new_ids], ignore_conflicts=True)
+    TagStat.objects.filter(tag_id__in=new_ids).update(post_count=F("post_count") + 1)
+
+
+def remove_tags(post_id, tag_ids=None):
+    """Drop the post from these tags (all of its tags when tag_ids is None)."""
+    old_ids = indexed_tag_ids(post_id, tag_ids)
+    if old_ids:
+        TagPost.objects.filter(post_id=post_id, tag_id__in=old_ids).delete()
+        decrement(old_ids)
+
+
+def decrement(tag_ids):
+    TagStat.objects.filter(tag_id__in=tag_ids).update(post_count=Greatest(F("post_count") - 1, 0))
+
+
+def redate_post(post):
+    TagPost.objects.filter(post_id=post.pk).exclude(created_at=post.created_at).update(
+        created_at=post.created_at
+    )
+
+
+def rebuild(batch_size=1000):
+    """Recompute both tables from taggit's rows. Returns (tags, tagged posts)."""
+    TagPost.objects.all().delete()
+    TagStat.objects.all().delete()
+    tagged = (
+        Post.tags.through.objects.filter(content_type=ContentType.objects.get_for_model(Post))
+        .annotate(created_at=Subquery(Post.objects.filter(pk=OuterRef("object_id")).values("created_at")))
+        .filter(created_at__isnull=False)
+        .values_list("tag_id", "object_id", "created_at")
+        .order_by()
+        .distinct()
+    )
+    batch, rows = [], 0
+    for tag_id, post_id, created_at in tagged.iterator(chunk_size=batch_size):
+        batch.append(TagPost(tag_id=tag_id, post_id=post_id, created_at=created_at))
+        if len(batch) >= batch_size:
+            rows += len(TagPost.objects.bulk_create(batch))
+            batch = []
+    rows += len(TagPost.objects.bulk_create(batch))
+    counts = TagPost.objects.order_by().values_list("tag").annotate(n=Count("*"))
+    stats = TagStat.objects.bulk_create(
+        (TagStat(tag_id=tag_id, post_count=n) for tag_id, n in counts.iterator()),
+        batch_size=batch_size,
+    )
+    return len(stats), rows
+
+
+# ---------------- Reading ----------------
+
+def get_tag(slug):
+    """The tag with its post count as `tag.post_count`, or None."""
+    tag = Tag.objects.filter(slug=slug).annotate(post_count=F("blog_stat__post_count")).first()
+    if tag is not None and tag.post_count is None:
+        tag.post_count = 0  # never tagged on a post
+    return tag
+
+
+def tag_post_ids(tag):
+    """The tag's post ids, newest post first, as a lazily sliced queryset."""
+    return (
+        TagPost.objects.filter(tag=tag)
+        .order_by("-created_at", "-post")
+        .values_list("post_id", flat=True)
+    )
+
+
+class TagPostPaginator(Paginator):
+    """Paginates tag_post_ids() with the count from TagStat instead of a COUNT(*)."""
+
+    def __init__(self, object_list, per_page, *, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+def tag_cloud(limit=30, steps=5):
+    """
+    The `limit` most used tags, alphabetically, each with `post_count` and a
+    `weight` from 1 to `steps` on a logarithmic scale of the counts.
+    """
+    stats = list(
+        TagStat.objects.filter(post_count__gt=0).select_related("tag").order_by("-post_count", "tag")[:limit]
+    )
+    if not stats:
+        return []
+    low = math.log(stats[-1].post_count)
+    spread = math.log(stats[0].post_count) - low
+    tags = []
+    for stat in stats:
+        tag = stat.tag
+        tag.post_count = stat.post_count
+        tag.weight = 1 + round((steps - 1) * (math.log(stat.post_count) - low) / spread) if spread else 1
+        tags.append(tag)
+    tags.sort(key=lambda tag: tag.name.lower())
+    return tags
@@ -0,0 +1,46 @@
+# blog/templatetags/blog_cache.py
+"""
+{% cachefragment "name" part1 part2 ... %} ... {% endcachefragment %}: caches
+the block through blog.cache; pass the version stamps it depends on as parts.
+"""
+from django import template
+
+from blog import cache
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, name, parts):
+        self.nodelist = nodelist
+        self.name = name
+        self.parts = parts
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        parts = [part.resolve(context) for part in self.parts]
+        html = cache.get_fragment(name, parts)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set_fragment(name, parts, html)
+        return html
+
+
+@register.tag
+def cachefragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse(("endcachefragment",))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
+
+
+@register.filter
+def version_of(versions, key):
+    """{{ post_versions|version_of:post.pk }}"""
+    return versions.get(key)
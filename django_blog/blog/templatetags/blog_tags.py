@@ -0,0 +1,12 @@
+# blog/templatetags/blog_tags.py
+"""{% tag_cloud [limit] %}: the most used tags from the tag index, in one query."""
+from django import template
+
+from blog import tagindex
+
+register = template.Library()
+
+
+@register.inclusion_tag("blog/tag_cloud.html")
+def tag_cloud(limit=30):
+    return {"tags": tagindex.tag_cloud(limit)}
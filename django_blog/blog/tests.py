@@ -1,3 +1,491 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from taggit.models import Tag
+
+from . import cache as blog_cache
+from . import comment_queue
+from . import comments as blog_comments
+from . import tagindex
+from .models import Comment, Post, TagPost, TagStat
+from .search import get_search_backend
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.title_hit = Post.objects.create(
+            author=self.author, title="Django caching", content="Notes on performance."
+        )
+        self.content_hit = Post.objects.create(
+            author=self.author, title="Weekly notes", content="Some words about django and more."
+        )
+        self.other = Post.objects.create(author=self.author, title="Gardening", content="Tomatoes.")
+
+    def search(self, query):
+        return get_search_backend().search(query)
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search("django"), [self.title_hit.pk, self.content_hit.pk])
+
+    def test_prefix_and_multiword_queries(self):
+        self.assertEqual(self.search("cach djan"), [self.title_hit.pk])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('django"*)(:^'), [self.title_hit.pk, self.content_hit.pk])
+        self.assertEqual(self.search("!!!"), [])
+
+    def test_index_follows_post_updates_and_deletes(self):
+        self.other.title = "Django gardening"
+        self.other.save()
+        self.assertIn(self.other.pk, self.search("gardening django"))
+        self.other.delete()
+        self.assertEqual(self.search("gardening"), [])
+
+    def test_index_follows_tag_changes(self):
+        self.other.tags.add("orm")
+        self.assertEqual(self.search("orm"), [self.other.pk])
+
+        tag = Tag.objects.get(name="orm")
+        tag.name = "querysets"
+        tag.save()
+        self.assertEqual(self.search("orm"), [])
+        self.assertEqual(self.search("querysets"), [self.other.pk])
+
+        tag.delete()
+        self.assertEqual(self.search("querysets"), [])
+
+        self.other.tags.add("compost")
+        self.other.tags.clear()
+        self.assertEqual(self.search("compost"), [])
+
+    def test_rebuild_command(self):
+        get_search_backend().clear()
+        self.assertEqual(self.search("django"), [])
+        call_command("rebuild_search_index", stdout=open("/dev/null", "w"))
+        self.assertEqual(self.search("django"), [self.title_hit.pk, self.content_hit.pk])
+
+    @override_settings(BLOG_SEARCH_BACKEND="blog.search.DatabaseSearchBackend")
+    def test_database_backend_fallback(self):
+        self.assertEqual(set(self.search("django")), {self.title_hit.pk, self.content_hit.pk})
+
+    def test_search_view(self):
+        response = self.client.get(reverse("blog:search"), {"q": "django"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["posts"]), [self.title_hit, self.content_hit])
+        self.assertContains(response, "Django caching")
+
+        response = self.client.get(reverse("blog:search"))
+        self.assertContains(response, "Type something to search.")
+
+
+class PostViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(author=self.author, title="Hello", content="World")
+        self.post.tags.add("intro")
+
+    def test_list_and_detail_render(self):
+        response = self.client.get(reverse("blog:post_list"))
+        self.assertContains(response, "Hello")
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, "intro")
+
+    def test_only_author_can_edit(self):
+        User.objects.create_user(username="other", password="pass12345")
+        self.client.login(username="other", password="pass12345")
+        response = self.client.get(reverse("blog:post_update", args=[self.post.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+class PostListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blog_cache.reset_cache_stats()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts = [
+                Post.objects.create(author=self.author, title=f"Post {i}", content="Body")
+                for i in range(12)
+            ]
+            self.posts[-1].tags.add("news")
+
+    def get_list(self, page=1):
+        return self.client.get(reverse("blog:post_list"), {"page": page})
+
+    def test_warm_page_does_not_query_the_database(self):
+        with self.assertNumQueries(4):  # tag cloud, count, page of posts, their tags
+            self.get_list()
+        with self.assertNumQueries(0):
+            response = self.get_list()
+        self.assertContains(response, "Post 11")
+        self.assertContains(response, "#news")
+        stats = blog_cache.cache_stats()
+        self.assertEqual(stats["fragments"]["post_list"], {"hits": 1, "misses": 1})
+        self.assertEqual(stats["fragments"]["tag_cloud"], {"hits": 1, "misses": 1})
+        self.assertEqual(stats["hit_ratio"], 2 / 14)
+
+    def test_pages_are_cached_separately(self):
+        self.get_list(1)
+        response = self.get_list(2)
+        self.assertContains(response, "Post 0")
+        self.assertNotContains(response, "Post 11")
+
+    def test_post_change_invalidates_page_but_reuses_other_fragments(self):
+        self.get_list()
+        post = self.posts[-1]
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = "Renamed"
+            post.save()
+        blog_cache.reset_cache_stats()
+        response = self.get_list()
+        self.assertContains(response, "Renamed")
+        fragments = blog_cache.cache_stats()["fragments"]
+        self.assertEqual(fragments["post_list"], {"hits": 0, "misses": 1})
+        self.assertEqual(fragments["post"], {"hits": 9, "misses": 1})
+
+    def test_tag_and_author_changes_invalidate(self):
+        self.get_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[-1].tags.add("fresh")
+        self.assertContains(self.get_list(), "#fresh")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = self.posts[-1].tags.get(name="news")
+            tag.name = "headlines"
+            tag.save()
+        self.assertContains(self.get_list(), "#headlines")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.username = "novelist"
+            self.author.save()
+        self.assertContains(self.get_list(), "by novelist")
+
+    def test_delete_invalidates(self):
+        self.get_list()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[-1].delete()
+        self.assertNotContains(self.get_list(), "Post 11")
+
+    def test_instrumentation_signal(self):
+        seen = []
+
+        def receiver(sender, hit, **kwargs):
+            seen.append((sender, hit))
+
+        blog_cache.fragment_cache_accessed.connect(receiver)
+        self.addCleanup(blog_cache.fragment_cache_accessed.disconnect, receiver)
+        self.get_list()
+        self.get_list()
+        self.assertEqual(seen[:2], [("tag_cloud", False), ("post_list", False)])
+        self.assertEqual(seen[-1], ("post_list", True))
+
+
+class TagIndexTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.posts = [
+            Post.objects.create(author=self.author, title=f"Post {i}", content="Body")
+            for i in range(3)
+        ]
+        for post in self.posts:
+            post.tags.add("python")
+        self.posts[0].tags.add("django", "orm")
+
+    def counts(self):
+        return {stat.tag.name: stat.post_count for stat in TagStat.objects.select_related("tag")}
+
+    def test_follows_tag_changes(self):
+        self.assertEqual(self.counts(), {"python": 3, "django": 1, "orm": 1})
+        self.posts[1].tags.add("django")
+        self.posts[0].tags.remove("orm")
+        self.posts[2].tags.clear()
+        self.assertEqual(self.counts(), {"python": 2, "django": 2, "orm": 0})
+        self.posts[0].tags.set(["django"])
+        self.assertEqual(self.counts(), {"python": 1, "django": 2, "orm": 0})
+        self.posts[1].delete()
+        Tag.objects.get(name="orm").delete()
+        self.assertEqual(self.counts(), {"python": 0, "django": 1})
+        self.assertEqual(TagPost.objects.count(), 1)
+
+    def test_tag_pages_are_newest_first_and_paginated(self):
+        python = Tag.objects.get(name="python")
+        self.assertEqual(list(tagindex.tag_post_ids(python)), [post.pk for post in reversed(self.posts)])
+        oldest = self.posts[0]
+        oldest.created_at = self.posts[2].created_at + timedelta(days=1)
+        oldest.save()
+        self.assertEqual(list(tagindex.tag_post_ids(python))[0], oldest.pk)
+
+        with self.assertNumQueries(3):  # tag and count, page of ids, the posts
+            response = self.client.get(reverse("blog:tag_posts", args=["python"]))
+        self.assertEqual(response.context["paginator"].count, 3)
+        self.assertEqual([post.pk for post in response.context["posts"]][0], oldest.pk)
+        response = self.client.get(reverse("blog:tag_posts", args=["python"]), {"page": 2})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse("blog:tag_posts", args=["missing"])).status_code, 404)
+
+    def test_tag_cloud(self):
+        tags = tagindex.tag_cloud()
+        self.assertEqual([tag.name for tag in tags], ["django", "orm", "python"])
+        self.assertEqual([(tag.post_count, tag.weight) for tag in tags], [(1, 1), (1, 1), (3, 5)])
+        self.assertContains(self.client.get(reverse("blog:post_list")), "#python")
+
+    def test_rebuild_command(self):
+        TagPost.objects.all().delete()
+        TagStat.objects.update(post_count=42)
+        out = StringIO()
+        call_command("rebuild_tag_index", stdout=out)
+        self.assertIn("Indexed 5 tagged posts under 3 tags", out.getvalue())
+        self.assertEqual(self.counts(), {"python": 3, "django": 1, "orm": 1})
+
+
+class CommentCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("writer", password="pass12345")
+        self.post = Post.objects.create(title="Counted", content="...", author=self.user)
+        self.other = Post.objects.create(title="Other", content="...", author=self.user)
+
+    def count(self, post):
+        return Post.objects.values_list("comments_count", flat=True).get(pk=post.pk)
+
+    def test_counter_follows_comment_writes(self):
+        self.client.force_login(self.user)
+        for text in ("first", "second"):
+            self.client.post(reverse("blog:comment_create", args=[self.post.pk]), {"content": text})
+        self.assertEqual(self.count(self.post), 2)
+
+        comment = Comment.objects.filter(post=self.post).first()
+        comment.post = self.other
+        comment.save()
+        self.assertEqual((self.count(self.post), self.count(self.other)), (1, 1))
+
+        self.client.post(reverse("blog:comment_delete", args=[comment.pk]))
+        self.assertEqual(self.count(self.other), 0)
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, "Comments (1)")
+
+    def test_saving_a_loaded_comment_reads_no_previous_post(self):
+        Comment.objects.create(post=self.post, author=self.user, content="Stays")
+        comment = Comment.objects.get(post=self.post)
+        with self.assertNumQueries(1):  # the UPDATE only
+            comment.save()
+        comment.post = self.other
+        with self.assertNumQueries(3):  # the UPDATE and one counter update per post
+            comment.save()
+        comment.post = self.post
+        comment.save()
+        deferred = Comment.objects.only("content").get(pk=comment.pk)
+        deferred.post = self.other
+        deferred.save()  # the post it had is read back from the database
+        self.assertEqual((self.count(self.post), self.count(self.other)), (0, 1))
+
+    def test_reconcile_counters(self):
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, content=str(i)) for i in range(3)
+        )
+        Post.objects.filter(pk=self.other.pk).update(comments_count=7)
+        call_command("reconcile_counters", "blog.Post.comments_count", stdout=StringIO())
+        self.assertEqual((self.count(self.post), self.count(self.other)), (3, 0))
+
+
+class PostDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user("writer", password="pass12345")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = Post.objects.create(author=self.author, title="Polled", content="Body")
+        self.url = self.post.get_absolute_url()
+
+    def test_unchanged_post_answers_304_without_queries(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_comment_changes_the_etag_but_not_the_list(self):
+        etag = self.client.get(self.url)["ETag"]
+        list_version = blog_cache.list_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.author, content="First!")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "First!")
+        self.assertEqual(blog_cache.list_version(), list_version)
+
+    def test_moved_comment_changes_both_posts(self):
+        other = Post.objects.create(author=self.author, title="Other", content="Body")
+        comment = Comment.objects.create(post=self.post, author=self.author, content="Moving")
+        before = blog_cache.post_versions([self.post.pk, other.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.post = other
+            comment.save()
+        after = blog_cache.post_versions([self.post.pk, other.pk])
+        self.assertNotEqual(before[self.post.pk], after[self.post.pk])
+        self.assertNotEqual(before[other.pk], after[other.pk])
+
+    def test_etag_is_per_user(self):
+        anonymous = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.author)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Edit")
+
+    def test_etag_changes_with_the_csrf_token(self):
+        self.client.force_login(self.author)
+        self.client.get(self.url)  # sets the CSRF cookie
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Logging in again rotates the CSRF token embedded in the page.
+        self.client.logout()
+        self.client.login(username="writer", password="pass12345")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("writer", password="pass12345")
+        self.reader = User.objects.create_user("reader", password="pass12345")
+        self.post = Post.objects.create(title="Viral", content="...", author=self.user)
+        self.comments = [
+            Comment.objects.create(post=self.post, author=(self.user, self.reader)[i % 2], content=f"Comment {i}")
+            for i in range(7)
+        ]
+        # Two comments with the same timestamp: the id breaks the tie.
+        Comment.objects.filter(pk=self.comments[4].pk).update(created_at=self.comments[3].created_at)
+
+    def contents(self, page):
+        return [comment.content for comment in page.comments]
+
+    def test_keyset_pages(self):
+        with self.assertNumQueries(1):
+            page = blog_comments.latest(self.post.pk, size=3)
+            self.assertEqual([comment.author.username for comment in page.comments], ["writer", "reader", "writer"])
+        self.assertEqual(self.contents(page), ["Comment 4", "Comment 5", "Comment 6"])
+        self.assertTrue(page.has_more)
+        page = blog_comments.before(self.post.pk, page.first_cursor, size=3)
+        self.assertEqual(self.contents(page), ["Comment 1", "Comment 2", "Comment 3"])
+        page = blog_comments.before(self.post.pk, page.first_cursor, size=3)
+        self.assertEqual((self.contents(page), page.has_more), (["Comment 0"], False))
+
+        page = blog_comments.since(self.post.pk, blog_comments.make_cursor(self.comments[3]), size=2)
+        self.assertEqual((self.contents(page), page.has_more), (["Comment 4", "Comment 5"], True))
+        with self.assertRaises(blog_comments.InvalidCursor):
+            blog_comments.since(self.post.pk, "yesterday")
+
+    def test_detail_page_shows_the_latest_page(self):
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, "Comment 6")
+        self.assertEqual(len(response.context["comments"].comments), 7)
+        self.assertContains(response, "Comments (7)")
+        response = self.client.get(self.post.get_absolute_url(), {"comments_before": "bad"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_returns_deltas(self):
+        url = reverse("blog:comment_feed", args=[self.post.pk])
+        data = self.client.get(url, {"limit": 5}).json()
+        self.assertEqual([comment["content"] for comment in data["comments"]][-1], "Comment 4")
+        self.assertTrue(data["has_more"])
+        data = self.client.get(url, {"since": data["cursor"]}).json()
+        self.assertEqual([comment["content"] for comment in data["comments"]], ["Comment 5", "Comment 6"])
+        self.assertEqual(data["comments"][0]["author"], "reader")
+
+        cursor = data["cursor"]
+        response = self.client.get(url, {"since": cursor})
+        self.assertEqual(response.json(), {"comments": [], "cursor": cursor, "has_more": False})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"since": cursor}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=self.post, author=self.reader, content="Fresh")
+        data = self.client.get(url, {"since": cursor}, HTTP_IF_NONE_MATCH=response["ETag"]).json()
+        self.assertEqual([comment["content"] for comment in data["comments"]], ["Fresh"])
+
+    def test_feed_errors(self):
+        url = reverse("blog:comment_feed", args=[self.post.pk])
+        self.assertEqual(self.client.get(url, {"since": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"limit": "0"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("blog:comment_feed", args=[999])).status_code, 404)
+
+
+class CommentQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.queue_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.queue_dir)
+        overrides = self.settings(BLOG_COMMENT_QUEUE_DIR=self.queue_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user("writer", password="pass12345")
+        self.reader = User.objects.create_user("reader", password="pass12345")
+        self.post = Post.objects.create(title="Busy", content="...", author=self.user)
+
+    def comment(self, user, text):
+        self.client.force_login(user)
+        return self.client.post(reverse("blog:comment_create", args=[self.post.pk]), {"content": text})
+
+    def test_queued_comment_is_visible_to_its_author_only(self):
+        response = self.comment(self.reader, "Queued")
+        self.assertRedirects(response, self.post.get_absolute_url())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(comment_queue.backlog(), 1)
+
+        self.assertContains(self.client.get(self.post.get_absolute_url()), "Queued")
+        self.client.force_login(self.user)
+        self.assertNotContains(self.client.get(self.post.get_absolute_url()), "Queued")
+
+    def test_flush_writes_batches_and_keeps_the_counter(self):
+        for i in range(5):
+            self.comment(self.reader, f"Comment {i}")
+        self.assertEqual(comment_queue.flush(batch_size=3)["created"], 3)
+        out = StringIO()
+        call_command("flush_comment_queue", stdout=out)
+        self.assertIn("Created 2 comments", out.getvalue())
+        self.assertEqual(comment_queue.backlog(), 0)
+        self.assertEqual(
+            list(Comment.objects.order_by("id").values_list("content", flat=True)),
+            [f"Comment {i}" for i in range(5)],
+        )
+        self.assertEqual(Post.objects.get(pk=self.post.pk).comments_count, 5)
+
+        # Once flushed, the comments come from the thread, not the overlay.
+        self.client.force_login(self.reader)
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertEqual(response.context["pending_comments"], [])
+        self.assertContains(response, "Comment 4", count=1)
+
+    def test_replayed_entries_are_not_written_twice(self):
+        entry = comment_queue.enqueue(self.post.pk, self.reader.pk, "Once")
+        comment_queue.flush()
+        with open(os.path.join(self.queue_dir, f"0-{entry['key']}.json"), "w") as file:
+            json.dump(entry, file)  # as if the flusher died before deleting it
+        comment_queue.enqueue(self.post.pk + 1, self.reader.pk, "Orphan")
+        stats = comment_queue.flush()
+        self.assertEqual((stats["created"], stats["duplicates"], stats["dropped"]), (0, 1, 1))
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_pending_comments_bypass_the_etag(self):
+        self.client.force_login(self.reader)
+        etag = self.client.get(self.post.get_absolute_url())["ETag"]
+        self.comment(self.reader, "Fresh")
+        response = self.client.get(self.post.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Fresh")
+
+
+class IndexAdvisorTests(TestCase):
+    def test_project_has_no_missing_indexes(self):
+        out = StringIO()
+        call_command("index_advisor", "--check", stdout=out)
+        self.assertIn("No missing indexes.", out.getvalue())
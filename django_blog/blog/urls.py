@@ -9,6 +9,7 @@ from .views import (
     PostUpdateView,
     PostDeleteView,
     CommentCreateView,
+    comment_feed,
     CommentUpdateView,
     CommentDeleteView,
     SearchResultsView,
@@ -27,6 +28,7 @@ urlpatterns = [
 
     # Comment URLs
     path('post/<int:pk>/comments/new/', CommentCreateView.as_view(), name='comment_create'),
+    path('post/<int:pk>/comments/', comment_feed, name='comment_feed'),
     path('comment/<int:pk>/update/', CommentUpdateView.as_view(), name='comment_update'),
     path('comment/<int:pk>/delete/', CommentDeleteView.as_view(), name='comment_delete'),
 
@@ -1,36 +1,293 @@
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
-from taggit.models import Tag
-from django.views.generic import ListView
-from .models import Post
+import hashlib
 
+from django.contrib import messages
+from django.contrib.auth import login
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from .forms import RegistrationForm, ProfileForm, PostForm, CommentForm
+from .models import Post, Comment
+from .search import get_search_backend
+from . import cache as blog_cache
+from . import comment_queue
+from . import comments as blog_comments
+from . import tagindex
 
-class SearchResultsView(ListView):
+
+# ---------------- Authentication ----------------
+
+def register_view(request):
+    if request.method == "POST":
+        form = RegistrationForm(request.POST)
+        if form.is_valid():
+            user = form.save()
+            login(request, user)
+            messages.success(request, "Welcome! Your account has been created.")
+            return redirect("blog:profile")
+    else:
+        form = RegistrationForm()
+    return render(request, "blog/register.html", {"form": form})
+
+
+@login_required
+def profile_view(request):
+    if request.method == "POST":
+        form = ProfileForm(request.POST, instance=request.user)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Profile updated.")
+            return redirect("blog:profile")
+    else:
+        form = ProfileForm(instance=request.user)
+    return render(request, "blog/profile.html", {"form": form})
+
+
+# ---------------- Posts ----------------
+
+class AuthorRequiredMixin(UserPassesTestMixin):
+    """Only the author of the object may change or delete it."""
+    def test_func(self):
+        return self.get_object().author == self.request.user
+
+
+class PostListView(ListView):
+    """
+    Paginated post list. The page and each post are cached as rendered HTML
+    fragments keyed on version stamps (see blog/cache.py); on a cache miss the
+    page is loaded with its authors and tags in three queries.
+    """
     model = Post
+    template_name = "blog/post_list.html"
+    context_object_name = "posts"
+    paginate_by = 10
+    paginator_class = blog_cache.CachedCountPaginator
+
+    def get_queryset(self):
+        return Post.objects.select_related("author").prefetch_related("tags")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context["page_obj"]
+        context["list_version"] = blog_cache.list_version()
+        # Only evaluated when the page fragment misses and the posts are rendered.
+        context["post_versions"] = SimpleLazyObject(
+            lambda: blog_cache.post_versions([post.pk for post in page.object_list])
+        )
+        return context
+
+
+def post_detail_etag(request, pk):
+    """
+    ETag of the post detail page, taken from the post's version stamp in the
+    cache (blog/cache.py) without a query. The page embeds the CSRF token, so
+    the CSRF secret is part of the tag: a new one (e.g. after logging in again)
+    must not revalidate a page carrying the old token. None while flash
+    messages are pending: the page shows them once, so it must be rendered.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    user = request.user.pk if request.user.is_authenticated else ""
+    if user and comment_queue.enabled() and comment_queue.has_pending(pk, user):
+        return None  # the page shows the user's queued comments
+    version = blog_cache.post_versions([pk])[pk]
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    raw = f"{version}|{user}|{csrf_secret}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+@method_decorator(condition(etag_func=post_detail_etag), name="get")
+class PostDetailView(DetailView):
+    model = Post
+    template_name = "blog/post_detail.html"
+    context_object_name = "post"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comment_form"] = CommentForm()
+        cursor = self.request.GET.get("comments_before")
+        try:
+            if cursor:
+                context["comments"] = blog_comments.before(self.object.pk, cursor)
+            else:
+                context["comments"] = blog_comments.latest(self.object.pk)
+        except blog_comments.InvalidCursor:
+            raise Http404("Invalid comment cursor.")
+        if comment_queue.enabled() and self.request.user.is_authenticated and not cursor:
+            context["pending_comments"] = comment_queue.pending(self.object.pk, self.request.user)
+        return context
+
+
+class PostCreateView(LoginRequiredMixin, CreateView):
+    model = Post
+    form_class = PostForm
+    template_name = "blog/post_form.html"
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
+        return super().form_valid(form)
+
+
+class PostUpdateView(LoginRequiredMixin, AuthorRequiredMixin, UpdateView):
+    model = Post
+    form_class = PostForm
+    template_name = "blog/post_form.html"
+
+
+class PostDeleteView(LoginRequiredMixin, AuthorRequiredMixin, DeleteView):
+    model = Post
+    template_name = "blog/post_confirm_delete.html"
+    success_url = reverse_lazy("blog:post_list")
+
+
+# ---------------- Comments ----------------
+
+class CommentCreateView(LoginRequiredMixin, CreateView):
+    """
+    Saves the comment, or with BLOG_COMMENT_QUEUE_DIR set queues it for the
+    write-behind flusher (blog/comment_queue.py); the author sees it at once.
+    """
+    model = Comment
+    form_class = CommentForm
+    template_name = "blog/comment_form.html"
+
+    def form_valid(self, form):
+        form.instance.post = get_object_or_404(Post, pk=self.kwargs["pk"])
+        form.instance.author = self.request.user
+        if comment_queue.enabled():
+            comment_queue.enqueue(self.kwargs["pk"], self.request.user.pk, form.cleaned_data["content"])
+            return redirect(self.get_success_url())
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse("blog:post_detail", kwargs={"pk": self.kwargs["pk"]})
+
+
+def comment_feed_etag(request, pk):
+    """The post's version stamp with the query: polling an unchanged thread costs no query."""
+    version = blog_cache.post_versions([pk])[pk]
+    raw = f"{version}|{request.GET.urlencode()}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+@condition(etag_func=comment_feed_etag)
+def comment_feed(request, pk):
+    """
+    JSON feed of a post's comments after `?since=<cursor>` (from the start
+    without one), oldest first, at most `?limit=` (default 50). Clients poll
+    it with the returned `cursor` to receive only the comments they have not
+    seen; `has_more` asks them to come back at once.
+    """
+    try:
+        limit = min(int(request.GET.get("limit", blog_comments.DEFAULT_PAGE_SIZE)), blog_comments.MAX_PAGE_SIZE)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return JsonResponse({"detail": "limit must be a positive integer."}, status=400)
+    since = request.GET.get("since")
+    try:
+        page = blog_comments.since(pk, since, limit)
+    except blog_comments.InvalidCursor as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+    if not page.comments and not Post.objects.filter(pk=pk).exists():
+        raise Http404("No such post.")
+    return JsonResponse({
+        "comments": [
+            {
+                "id": comment.pk,
+                "author": comment.author.username,
+                "content": comment.content,
+                "created_at": comment.created_at,
+                "cursor": blog_comments.make_cursor(comment),
+            }
+            for comment in page.comments
+        ],
+        "cursor": page.last_cursor or since,
+        "has_more": page.has_more,
+    })
+
+
+class CommentUpdateView(LoginRequiredMixin, AuthorRequiredMixin, UpdateView):
+    model = Comment
+    form_class = CommentForm
+    template_name = "blog/comment_form.html"
+
+    def get_success_url(self):
+        return reverse("blog:post_detail", kwargs={"pk": self.object.post_id})
+
+
+class CommentDeleteView(LoginRequiredMixin, AuthorRequiredMixin, DeleteView):
+    model = Comment
+    template_name = "blog/comment_confirm_delete.html"
+
+    def get_success_url(self):
+        return reverse("blog:post_detail", kwargs={"pk": self.object.post_id})
+
+
+# ---------------- Search & Tags ----------------
+
+class SearchResultsView(ListView):
+    """
+    Ranked full-text search over post title, content and tags.
+    The search backend (blog/search.py) returns post ids best match first;
+    only the posts on the current page are loaded from the Post table.
+    """
     template_name = "blog/search_results.html"
     context_object_name = "posts"
+    paginate_by = 20
+    max_results = 1000
 
     def get_queryset(self):
-        query = self.request.GET.get("q")
-        if query:
-            return Post.objects.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__name__icontains=query)
-            ).distinct()
-        return Post.objects.none()
+        self.query = self.request.GET.get("q", "").strip()
+        if not self.query:
+            return []
+        return get_search_backend().search(self.query, limit=self.max_results)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        ids = list(context["object_list"])
+        posts = (
+            Post.objects.filter(pk__in=ids)
+            .select_related("author")
+            .prefetch_related("tags")
+            .in_bulk()
+        )
+        context["posts"] = [posts[pk] for pk in ids if pk in posts]
+        context["query"] = self.query
+        return context
 
 
 class PostByTagListView(ListView):
-    model = Post
+    """
+    Posts carrying a tag, newest first. The page of post ids comes from the
+    tag index (blog/tagindex.py) and its count from TagStat, so no query goes
+    through taggit's generic relation; only the posts on the page are loaded.
+    """
     template_name = "blog/tag_posts.html"
     context_object_name = "posts"
+    paginate_by = 20
 
     def get_queryset(self):
-        self.tag = get_object_or_404(Tag, slug=self.kwargs["tag_slug"])
-        return Post.objects.filter(tags__in=[self.tag]).distinct()
+        self.tag = tagindex.get_tag(self.kwargs["tag_slug"])
+        if self.tag is None:
+            raise Http404("No such tag.")
+        return tagindex.tag_post_ids(self.tag)
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return tagindex.TagPostPaginator(
+            queryset, per_page, count=self.tag.post_count, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page, **kwargs,
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        ids = list(context["object_list"])
+        posts = Post.objects.in_bulk(ids)
+        context["posts"] = [posts[pk] for pk in ids if pk in posts]
         context["tag"] = self.tag
         return context
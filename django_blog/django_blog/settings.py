@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from perf.sqlite import sqlite_profile
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,9 +42,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'taggit',
     'blog',
+    'perf',
 ]
 
 MIDDLEWARE = [
+    'perf.middleware.PerfMiddleware',
+    'perf.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,17 +80,28 @@ WSGI_APPLICATION = 'django_blog.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite with a busy timeout, immediate transactions and persistent,
+# health-checked connections (see perf.sqlite). On a server, run
+# `manage.py enable_sqlite_wal` once to switch the database file to WAL;
+# synchronous is then relaxed from FULL to NORMAL.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',  # or 'django.db.backends.postgresql', etc.
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'USER': '',
-        'PASSWORD': '',
-        'HOST': '',
-        'PORT': '',
-    }
+    'default': sqlite_profile(BASE_DIR / 'db.sqlite3'),
 }
 
+# Read replicas (see perf.replicas): reads go to the aliases listed in
+# REPLICA_DATABASES, writes and a client's reads for REPLICA_STICKY_SECONDS
+# after a write go to 'default'. SQLITE_REPLICAS="/path/a.sqlite3,/path/b.sqlite3"
+# adds local SQLite copies of the database as stand-in replicas.
+REPLICA_DATABASES = []
+for index, path in enumerate(filter(None, os.environ.get('SQLITE_REPLICAS', '').split(','))):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': path, 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(alias)
+REPLICA_STICKY_SECONDS = 10
+REPLICA_HEALTH_INTERVAL = 5
+REPLICA_RETRY_AFTER = 30
+DATABASE_ROUTERS = ['perf.replicas.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -147,3 +164,55 @@ TEMPLATES = [
         },
     },
 ]
+
+# Full-text search backend for posts (see blog/search.py). Leave unset to use
+# SQLite FTS5 on SQLite and the icontains scan elsewhere.
+# BLOG_SEARCH_BACKEND = 'blog.search.SQLiteFTS5Backend'
+
+# Cache used for the post list fragments (see blog/cache.py). Swap the backend
+# for a shared one in production, e.g.
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': BASE_DIR / 'cache'
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-blog',
+    }
+}
+BLOG_CACHE_ALIAS = 'default'
+BLOG_CACHE_TIMEOUT = 600
+
+# Write-behind comments (see blog/comment_queue.py): set a directory to queue
+# new comments there instead of inserting them in the request, and run
+# `manage.py flush_comment_queue --loop` to write them in batches.
+BLOG_COMMENT_QUEUE_DIR = os.environ.get('BLOG_COMMENT_QUEUE_DIR') or None
+
+# Per-request performance metrics (see django-perf/ at the repository root).
+# PerfMiddleware records query count, DB time, duplicate queries and render
+# time per view; /metrics/ serves them in Prometheus format to staff users and
+# to requests with "Authorization: Bearer $PERF_METRICS_TOKEN". The test
+# runner switches it off; perf's own tests live in django-perf.
+PERF_ENABLED = True
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN')
+TEST_RUNNER = 'perf.testing.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'perf_file': {
+            'class': 'perf.logs.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs' / 'perf.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'perf.requests': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
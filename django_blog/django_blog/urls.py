@@ -20,4 +20,5 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('posts/', include('blog.urls', namespace='blog')),
+    path('', include('perf.urls')),
 ]